@@ -0,0 +1,210 @@
+from Learners import LearnerPlayer, ReinforcementTicTacToeLearner
+from TicTacToe import TicTacToe
+
+from collections import namedtuple
+from functools import partial
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Tuple
+import asyncio
+
+
+MatchResult = namedtuple('MatchResult', ['first', 'second', 'result', 'moves'])
+MatchResult.__doc__ = """
+Result of one game: first played X and moved first, result is 'w', 'd' or 'l' for first
+"""
+
+
+class Policy:
+    """
+    A Player (or learner) served as an awaitable move provider.
+
+    Every move asked for in one pass of the event loop is answered together, in batches of up to max_batch:
+    players with a move_many (e.g. LearnerPlayer) choose all the moves of a batch in one call,
+    others move board by board. move_many must check every board before moving any, so when it raises
+    the batch is retried board by board and only the games with bad boards fail.
+    """
+
+    def __init__(self, name: str, make_player: Callable[..., object], max_batch: int = 1024) -> None:
+        """
+        :param name: name of the policy in results
+        :param make_player: called with player='X' and player='O' to make the player of each seat,
+            e.g. a Player class
+        :param max_batch: most boards handed to one move_many call
+        """
+        self.name = name
+        self.players = {symbol: make_player(player=symbol) for symbol in ('X', 'O')}
+        self.max_batch = max_batch
+
+        self._pending = []
+        self.requests = 0
+        self.batches = 0
+
+    @classmethod
+    def from_learner(cls, learner: ReinforcementTicTacToeLearner, name: str = None,
+                     max_batch: int = 1024) -> 'Policy':
+        """
+        Greedy policy of a learner, see LearnerPlayer
+        """
+        return cls(name or type(learner).__name__, partial(LearnerPlayer, learner), max_batch=max_batch)
+
+    @property
+    def mean_batch(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+    def move(self, board: TicTacToe, player: str) -> asyncio.Future:
+        """
+        Make a move on board as player, once the batch it joins is answered
+
+        :param board: Current board in play
+        :param player: Symbol to play with
+        :returns: future resolved with the board after the move has been made
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            # runs after every task already scheduled this pass has asked for its move
+            loop.call_soon(self._flush)
+        self._pending.append((board, player, future))
+        return future
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.max_batch):
+            batch = [request for request in pending[start:start + self.max_batch]
+                     if not request[2].cancelled()]
+            if batch:
+                self._answer(batch)
+
+    def _answer(self, batch: List[Tuple[TicTacToe, str, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.requests += len(batch)
+        for symbol in ('X', 'O'):
+            requests = [request for request in batch if request[1] == symbol]
+            if not requests:
+                continue
+
+            player = self.players[symbol]
+            if not hasattr(player, 'move_many'):
+                for board, _, future in requests:
+                    self._resolve(future, player.move, board)
+                continue
+
+            try:
+                player.move_many([board for board, _, _ in requests])
+            except Exception:
+                # move_many raises before moving, so find the bad boards one by one and fail only their games
+                for board, _, future in requests:
+                    self._resolve(future, lambda board: player.move_many([board]), board)
+                continue
+
+            for board, _, future in requests:
+                future.set_result(board)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, move: Callable, board: TicTacToe) -> None:
+        try:
+            move(board)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(board)
+
+
+class MatchScheduler:
+    """
+    Plays many games at once in one event loop.
+
+    Each game is a coroutine awaiting its policies' moves, so with concurrency games in flight a policy
+    is asked for up to concurrency moves per pass and answers them in a batch.
+    """
+
+    def __init__(self, concurrency: int = 1024, board_cls: type = TicTacToe) -> None:
+        """
+        :param concurrency: number of games in flight at once
+        :param board_cls: board class to play on
+        """
+        self.concurrency = concurrency
+        self.board_cls = board_cls
+
+    async def play(self, first: Policy, second: Policy) -> MatchResult:
+        """
+        Play one game, first plays X and moves first
+        """
+        board = self.board_cls()
+        seats = {'X': first, 'O': second}
+        turn = 'X'
+        moves = 0
+        while not board.terminal:
+            await seats[turn].move(board, turn)
+            turn = 'O' if turn == 'X' else 'X'
+            moves += 1
+
+        winner = board.winner()
+        result = 'd' if not winner else ('w' if winner == 'X' else 'l')
+        return MatchResult(first.name, second.name, result, moves)
+
+    async def stream(self, matches: Iterable[Tuple[Policy, Policy]]) -> AsyncIterator[MatchResult]:
+        """
+        Play matches, yielding results as games finish.
+        matches is only drawn from as games free up, so it can be a lazy generator that reacts to the
+        results already yielded. Stopping iteration early cancels the games in flight.
+
+        :param matches: pairs (first, second) of policies
+        """
+        matches = iter(matches)
+        queue = asyncio.Queue()
+
+        async def worker():
+            for first, second in matches:
+                queue.put_nowait(await self.play(first, second))
+
+        def finished(future):
+            # retrieved here too, as a stream left unclosed has its workers cancelled from outside
+            if not future.cancelled():
+                future.exception()
+            queue.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        done = asyncio.gather(*workers)
+        done.add_done_callback(finished)
+        try:
+            while True:
+                result = await queue.get()
+                if result is None:
+                    break
+                yield result
+            # raises the first error of a worker
+            await done
+        finally:
+            for task in workers:
+                task.cancel()
+
+    def run(self, matches: Iterable[Tuple[Policy, Policy]], on_result: Callable[[MatchResult], None] = None
+            ) -> List[MatchResult]:
+        """
+        Play matches to completion from synchronous code
+
+        :param matches: pairs (first, second) of policies
+        :param on_result: called with each result as its game finishes
+        :return: results in the order games finished
+        """
+        async def collect():
+            results = []
+            async for result in self.stream(matches):
+                if on_result is not None:
+                    on_result(result)
+                results.append(result)
+            return results
+
+        return asyncio.run(collect())
+
+
+def round_robin(policies: List[Policy], games: int) -> Iterator[Tuple[Policy, Policy]]:
+    """
+    games games of every pairing in each seat order, interleaved so every pairing progresses together
+
+    :param policies: policies to pair up
+    :param games: games per pairing and seat order
+    """
+    pairings = [(first, second) for first in policies for second in policies if first is not second]
+    for _ in range(games):
+        yield from pairings
@@ -0,0 +1,270 @@
+from Players import Player, RandomPlayer, RandomWinner, RandomWinnerBlocker
+from Learners import StateArrayX
+from Results import ResultLog
+from StateIndex import DIGITS, NUM_CODES, POWERS, StateIndex, get_index
+from TicTacToe import LINES
+
+from functools import lru_cache
+from typing import List, Tuple, Union
+import numpy as np
+
+
+OPPONENTS = {
+    RandomPlayer: 'random',
+    RandomWinner: 'winner',
+    RandomWinnerBlocker: 'blocker',
+}
+
+
+@lru_cache(maxsize=None)
+def code_winners() -> np.ndarray:
+    """
+    Winner digit of every base 3 code, reachable or not.
+    The StateIndex only knows reachable boards, but a block is found by placing the other player's piece,
+    which is a board no game reaches when that player moved last.
+    """
+    digits = np.arange(NUM_CODES)[:, None] // np.array(POWERS) % 3
+    lines = digits[:, np.array(LINES)]
+    won = (lines[:, :, 0] != 0) & (lines[:, :, 0] == lines[:, :, 1]) & (lines[:, :, 1] == lines[:, :, 2])
+    return np.where(won.any(axis=1), lines[np.arange(NUM_CODES), won.argmax(axis=1), 0], 0).astype(np.int8)
+
+
+class BatchTicTacToeLearner:
+    """
+    Plays batch_size games of tic tac toe side by side against one of the Players.py opponents.
+
+    Boards are held as a (batch_size, 9) array of digits (0 empty, 1 'O', 2 'X') together with their base 3
+    codes, so move masking, epsilon greedy choices, opponent moves and the sample average backups
+    of ReinforcementTicTacToeLearner are all array operations over the batch.
+    As soon as a game finishes its slot is refilled with a new game, until n games have been started.
+    """
+
+    def __init__(self, n: int, epsilon: float, opponent: Union[Player, type, str], player: str = 'X',
+                 batch_size: int = 1024, state_dict: StateArrayX = None, seed: int = None,
+                 index: StateIndex = None) -> None:
+        """
+        :param n: number of games to learn over
+        :param epsilon: Probability to make a non greedy move
+        :param opponent: Player instance or class from Players.py, or one of 'random', 'winner', 'blocker'
+        :param player: Symbol to play with
+        :param batch_size: number of games played at once
+        :param state_dict: StateArrayX to learn into
+        :param seed: seed of the random generator
+        :param index: StateIndex to take ids from, defaults to the shared index
+        """
+        if isinstance(opponent, str):
+            policy = opponent
+        else:
+            policy = OPPONENTS.get(opponent if isinstance(
+                opponent, type) else type(opponent))
+
+        if policy not in OPPONENTS.values():
+            raise ValueError(
+                f'Opponent must be one of {list(OPPONENTS.values())} or their Player, not {opponent}')
+
+        self.n = n
+        self.epsilon = epsilon
+        self.opponent = policy
+        self.player = player
+        self.batch_size = batch_size
+
+        self.index = get_index() if index is None else index
+        self.state_dict = StateArrayX(
+            player=player, index=self.index) if state_dict is None else state_dict
+        self.rng = np.random.default_rng(seed)
+        self.games_played = 0
+
+        self.me = DIGITS[player]
+        self.them = 3 - self.me
+        self.powers = np.array(POWERS, dtype=np.int64)
+
+        table = self.index.table
+        self.canonical = np.asarray(table['canonical'], dtype=np.intp)
+        self.winners = code_winners()
+        self.terminal = np.asarray(table['terminal'])
+
+        return
+
+    def afterstates(self, codes: np.ndarray, legal: np.ndarray, digit: int) -> np.ndarray:
+        """
+        Codes of the board after digit is placed in each cell, illegal cells keep the current code
+
+        :param codes: (k,) codes of the boards
+        :param legal: (k, 9) mask of empty cells
+        :param digit: piece to place
+        :return: (k, 9) codes
+        """
+        return np.where(legal, codes[:, None] + digit*self.powers, codes[:, None])
+
+    def pick(self, candidates: np.ndarray) -> np.ndarray:
+        """
+        Pick uniformly at random among the candidate cells of each board
+
+        :param candidates: (k, 9) mask, every row has at least one candidate
+        :return: (k,) cells
+        """
+        noise = self.rng.random(candidates.shape)
+        return np.argmax(np.where(candidates, noise, -1), axis=1)
+
+    def greedy_moves(self, codes: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        """
+        Best cell of each board based on the current state_dict, ties are broken randomly
+        """
+        after = self.canonical[self.afterstates(codes, legal, self.me)]
+        outcomes = np.where(legal, self.state_dict.values[after], -np.inf)
+        best = outcomes.max(axis=1, keepdims=True)
+        return self.pick(legal & (outcomes == best))
+
+    def opponent_moves(self, codes: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        """
+        Vectorised RandomPlayer, RandomWinner and RandomWinnerBlocker.
+        Like the Players they take the first winning (then blocking) cell, else a random cell.
+        """
+        moves = self.pick(legal)
+
+        if self.opponent == 'random':
+            return moves
+
+        if self.opponent == 'blocker':
+            blocks = legal & (self.winners[self.afterstates(
+                codes, legal, self.me)] == self.me)
+            can_block = blocks.any(axis=1)
+            moves = np.where(can_block, np.argmax(blocks, axis=1), moves)
+
+        wins = legal & (self.winners[self.afterstates(
+            codes, legal, self.them)] == self.them)
+        can_win = wins.any(axis=1)
+        return np.where(can_win, np.argmax(wins, axis=1), moves)
+
+    def learner_moves(self, boards: np.ndarray, codes: np.ndarray, slots: np.ndarray,
+                      epsilon: float) -> np.ndarray:
+        """
+        Epsilon greedy move in each of the slots
+
+        :return: mask of the slots that moved greedy
+        """
+        legal = boards[slots] == 0
+        greedy = self.rng.random(len(slots)) >= epsilon
+
+        moves = np.where(greedy, self.greedy_moves(
+            codes[slots], legal), self.pick(legal))
+        self.place(boards, codes, slots, moves, self.me)
+
+        return greedy
+
+    def place(self, boards: np.ndarray, codes: np.ndarray, slots: np.ndarray, moves: np.ndarray,
+              digit: int) -> None:
+        boards[slots, moves] = digit
+        codes[slots] += digit*self.powers[moves]
+
+    def get_result(self, winner: int) -> str:
+        """
+        Convert winner digit to result (w, l, d)
+        """
+        if winner == self.me:
+            return 'w'
+        elif winner == 0:
+            return 'd'
+        else:
+            return 'l'
+
+    def run(self, n: int, epsilon: float, learn: bool,
+            recorder: ResultLog = None) -> Union[List[Tuple[str, bool]], ResultLog]:
+        """
+        Play n games, batch_size at a time
+
+        :param n: number of games to play
+        :param epsilon: Probability to make a non greedy move
+        :param learn: back up values into state_dict as in ReinforcementTicTacToeLearner.learn_one_game
+        :param recorder: ResultLog to record results in, rather than a list
+
+        :return: list of tuples (result, played_first) in the order the games finished, or recorder
+        """
+        k = min(self.batch_size, n)
+
+        boards = np.zeros((k, 9), dtype=np.int8)
+        codes = np.zeros(k, dtype=np.int64)
+        active = np.zeros(k, dtype=bool)
+        played_first = np.zeros(k, dtype=bool)
+
+        wld = [] if recorder is None else recorder
+        started = 0
+
+        def finish(slots):
+            winners = self.winners[codes[slots]]
+            if recorder is None:
+                for slot, winner in zip(slots.tolist(), winners.tolist()):
+                    wld.append([self.get_result(winner),
+                               bool(played_first[slot])])
+            else:
+                # result codes 0 'w', 1 'd', 2 'l'
+                recorder.extend(np.where(winners == self.me, 0, np.where(winners == 0, 1, 2)).astype(np.int8),
+                                played_first[slots])
+            active[slots] = False
+
+        while True:
+            # start new games in the free slots
+            free = np.flatnonzero(~active)[:n - started]
+            if len(free):
+                boards[free] = 0
+                codes[free] = 0
+                active[free] = True
+                played_first[free] = self.rng.random(len(free)) < 0.5
+                started += len(free)
+
+                first = free[played_first[free]]
+                self.learner_moves(boards, codes, first, epsilon)
+
+            slots = np.flatnonzero(active)
+            if not len(slots):
+                break
+
+            old_ids = self.canonical[codes[slots]]
+
+            # they move
+            moves = self.opponent_moves(codes[slots], boards[slots] == 0)
+            self.place(boards, codes, slots, moves, self.them)
+
+            # they won or drew
+            lost = self.terminal[codes[slots]]
+            old_backup = [old_ids[lost]]
+            new_backup = [self.canonical[codes[slots[lost]]]]
+            finish(slots[lost])
+
+            # we move
+            slots, old_ids = slots[~lost], old_ids[~lost]
+            greedy = self.learner_moves(boards, codes, slots, epsilon)
+
+            old_backup.append(old_ids[greedy])
+            new_backup.append(self.canonical[codes[slots[greedy]]])
+            finish(slots[self.terminal[codes[slots]]])
+
+            if learn:
+                self.state_dict.update_many(
+                    np.concatenate(old_backup), np.concatenate(new_backup))
+
+        if recorder is not None:
+            recorder.flush()
+        if learn:
+            self.games_played += n
+        return wld
+
+    def learn(self, recorder: ResultLog = None) -> Union[List[Tuple[str, bool]], ResultLog]:
+        """
+        Learn n games of tic tac toe.
+
+        :param recorder: ResultLog to record results in, rather than a list
+        :return: List of tuples of (winner, if we played first), or recorder
+        """
+        return self.run(self.n, self.epsilon, learn=True, recorder=recorder)
+
+    def play_n_games(self, n: int, recorder: ResultLog = None) -> Union[List[Tuple[str, bool]], ResultLog]:
+        """
+        Play n games against opponent, don't learn and always take greedy actions.
+
+        :param n: number of games to play
+        :param recorder: ResultLog to record results in, rather than a list
+
+        :return: list of tuples (result, played_first), or recorder
+        """
+        return self.run(n, 0, learn=False, recorder=recorder)
@@ -0,0 +1,308 @@
+from TicTacToe import DIGITS, POWERS, SYMMETRIES
+
+from functools import lru_cache
+from typing import List, Tuple, Union
+
+
+# every line of three, as a 9-bit mask with bit i set for cell i
+WIN_MASKS = (
+    # right
+    0b000000111,
+    0b000111000,
+    0b111000000,
+    # down
+    0b001001001,
+    0b010010010,
+    0b100100100,
+    # diag
+    0b100010001,
+    0b001010100,
+)
+
+FULL_MASK = 0b111111111
+
+
+def _permute_bits(bits: int, perm: str) -> int:
+    """
+    Apply a cell permutation to a 9-bit mask, new cell j takes the value of old cell perm[j]
+    """
+    return sum(1 << j for j, s in enumerate(perm) if bits >> int(s) & 1)
+
+
+# lookup tables over all 512 masks, so the hot path is a single index
+HAS_LINE = tuple(any(bits & mask == mask for mask in WIN_MASKS)
+                 for bits in range(FULL_MASK + 1))
+EMPTY_CELLS = tuple(tuple(i for i in range(9) if bits >> i & 1)
+                    for bits in range(FULL_MASK + 1))
+SYMMETRY_TABLES = tuple(tuple(_permute_bits(bits, perm) for bits in range(FULL_MASK + 1))
+                        for perm in SYMMETRIES)
+
+
+@lru_cache(maxsize=None)
+def render(x_bits: int, o_bits: int) -> str:
+    """
+    Convert the pair of masks to the 9 character string used by TicTacToe
+
+    :param x_bits: mask of cells held by X
+    :param o_bits: mask of cells held by O
+    :return: string state of board
+    """
+    return ''.join('X' if x_bits >> i & 1 else 'O' if o_bits >> i & 1 else ' '
+                   for i in range(9))
+
+
+@lru_cache(maxsize=None)
+def parse(curr_state: str) -> Tuple[int, int]:
+    """
+    Convert a string state of the board to a pair of masks
+
+    :param curr_state: string state of board
+    :return: X mask, O mask
+    """
+    x_bits = o_bits = 0
+    for i, go in enumerate(curr_state):
+        if go == 'X':
+            x_bits |= 1 << i
+        elif go == 'O':
+            o_bits |= 1 << i
+    return x_bits, o_bits
+
+
+class BitTicTacToe:
+    """
+    Drop in replacement for TicTacToe which stores each side as a 9-bit integer.
+
+    Wins are found by ANDing a side against the eight line masks (tabulated over all 512 masks),
+    and make_move/unmake_move let a search walk the game tree without copying the board.
+    """
+    players = {'O', 'X'}
+
+    def __init__(self) -> None:
+
+        self.last_turn = None
+
+        self.x_bits = 0
+        self.o_bits = 0
+        self.moves = 0
+        self.code = 0
+
+    @property
+    def state(self) -> List[str]:
+        return list(render(self.x_bits, self.o_bits))
+
+    def str_state(self):
+
+        return render(self.x_bits, self.o_bits)
+
+    def print_board(self):
+        """
+        Print current state of the board
+        """
+        curr_state = self.str_state()
+        for i in range(3):
+            print(f"|{curr_state[i*3:(i+1)*3:]}|")
+        print('\n')
+
+    def verify_move(self, player: str, index: int):
+        """
+        Verify if the move is a legal move via the criteria
+        - It is that players turn
+        - Player is currently playing the game
+        - Space is not alreay taken
+
+        :raises: ValueError
+        """
+        if player not in self.players:
+            raise ValueError(f'Player must be in {self.players}, not {player}')
+
+        if self.last_turn is not None and player == self.last_turn:
+            raise ValueError(f"Not the turn of {player}, they went last go.")
+
+        if (self.x_bits | self.o_bits) >> index & 1:
+            raise ValueError(f'Index {index} is already taken')
+
+    def make_move(self, player: str, index: int):
+        """
+        Place a piece without verifying the move, to be undone with unmake_move
+
+        :param player: player making the move
+        :param index: index of the move
+        """
+        if player == 'X':
+            self.x_bits |= 1 << index
+        else:
+            self.o_bits |= 1 << index
+        self.moves += 1
+        self.last_turn = player
+        self.code += DIGITS[player]*POWERS[index]
+
+    def unmake_move(self, index: int):
+        """
+        Take back the piece at index, players alternate so the other player becomes the last to go
+
+        :param index: index of the move to undo
+        """
+        bit = 1 << index
+        if self.x_bits & bit:
+            self.x_bits ^= bit
+            player = 'X'
+        else:
+            self.o_bits ^= bit
+            player = 'O'
+        self.moves -= 1
+        self.code -= DIGITS[player]*POWERS[index]
+        self.last_turn = None if self.moves == 0 else (
+            'O' if player == 'X' else 'X')
+
+    def wins_with(self, player: str, index: int) -> bool:
+        """
+        Would player win by playing at index, without copying the board
+
+        :param player: player making the move
+        :param index: index of the move, assumed to be empty
+        :return: True if the move completes a line
+        """
+        bits = self.x_bits if player == 'X' else self.o_bits
+        return HAS_LINE[bits | 1 << index]
+
+    def winning_moves(self, player: str) -> List[int]:
+        """
+        Every empty cell where player would win, in cell order
+
+        :param player: player making the move
+        """
+        bits = self.x_bits if player == 'X' else self.o_bits
+        return [move for move in EMPTY_CELLS[FULL_MASK ^ (self.x_bits | self.o_bits)]
+                if HAS_LINE[bits | 1 << move]]
+
+    def afterstate_ids(self, player: str, index) -> Tuple[List[int], List[int]]:
+        """
+        Every legal move and the canonical id of the board after it, see TicTacToe.afterstate_ids
+
+        :param player: player making the move
+        :param index: StateIndex to take ids from
+        :return: moves, ids
+        """
+        moves = list(EMPTY_CELLS[FULL_MASK ^ (self.x_bits | self.o_bits)])
+        code, digit = self.code, DIGITS[player]
+        return moves, index.canonical_ids([code + digit*POWERS[move] for move in moves])
+
+    @property
+    def terminal(self) -> bool:
+        """
+        True if the game has been won or the board is full
+        """
+        return self.moves == 9 or HAS_LINE[self.x_bits] or HAS_LINE[self.o_bits]
+
+    def add_move(self, player: str, index: int):
+        """
+        Add a move to the board
+
+        :param player: player making the move
+        :param index: index of the move
+        """
+        self.verify_move(player, index)
+        self.make_move(player, index)
+
+    def fake_move(self, player: str, index: int, verify: bool = True) -> str:
+        """
+        Mimic a move without actually making it, return the state of the board after the move
+
+        :param player: player making the move
+        :param index: index of the move
+        :param verify: verify the move is legal
+
+        :return: state of the board after the move
+        """
+        if verify:
+            self.verify_move(player, index)
+
+        if player == 'X':
+            return render(self.x_bits | 1 << index, self.o_bits)
+        return render(self.x_bits, self.o_bits | 1 << index)
+
+    def game_over(self) -> bool:
+        """
+        Checks to see if the game is over via all spaces being taken up
+
+        :return: True if game is over, False otherwise
+        """
+        return self.moves == 9
+
+    @staticmethod
+    def board_full(curr_state: str):
+        """
+        Checks to see if the board is full
+
+        :param curr_state: state of the board
+        :return: True if the board is full, False otherwise
+        """
+        return curr_state.count(' ') == 0
+
+    @staticmethod
+    def _bits_winner(x_bits: int, o_bits: int) -> Union[str, bool]:
+        if HAS_LINE[x_bits]:
+            return 'X'
+        if HAS_LINE[o_bits]:
+            return 'O'
+        return False
+
+    @staticmethod
+    def _winner(curr_state: str) -> Union[str, bool]:
+        """
+        Checks to see if there is a winner
+
+        :param curr_state: state of the board
+        :return: player who won, False if no winner
+        """
+        if not isinstance(curr_state, str):
+            curr_state = ''.join(curr_state)
+        return BitTicTacToe._bits_winner(*parse(curr_state))
+
+    def winner(self, curr_state=None):
+
+        if curr_state is None:
+            if self.moves < 5:
+                # too little moves to have a winner
+                return False
+
+            return self._bits_winner(self.x_bits, self.o_bits)
+
+        return self._winner(curr_state)
+
+    def similar_states(self, curr_state: str = None) -> Tuple[str]:
+        """
+        Returns a tuple of all the possible states that are similar to the current state (via symmetry)
+
+        :param curr_state: state of the board
+        :return: tuple of all the possible states
+        """
+        if curr_state is None:
+            x_bits, o_bits = self.x_bits, self.o_bits
+        else:
+            if not isinstance(curr_state, str):
+                curr_state = ''.join(curr_state)
+            x_bits, o_bits = parse(curr_state)
+
+        ss = [render(x_bits, o_bits)]
+        for table in SYMMETRY_TABLES:
+            ss.append(render(table[x_bits], table[o_bits]))
+
+        return tuple(ss)
+
+    def possible_moves(self, curr_state=None):
+        """
+        List of all possible moves
+
+        :param curr_state: state of the board
+        :return: list of possible moves
+        """
+        if curr_state is None:
+            taken = self.x_bits | self.o_bits
+        else:
+            if not isinstance(curr_state, str):
+                curr_state = ''.join(curr_state)
+            x_bits, o_bits = parse(curr_state)
+            taken = x_bits | o_bits
+
+        return list(EMPTY_CELLS[FULL_MASK ^ taken])
@@ -0,0 +1,245 @@
+import Players
+from Learners import ConstantStep, DecayingStep, ReinforcementTicTacToeLearner, StateArrayX, StateDictX
+from Players import Player
+from StateIndex import StateIndex, get_index
+
+from typing import Union
+import json
+import struct
+import numpy as np
+
+
+MAGIC = b'TTTCKPT1'
+VERSION = 1
+ALIGN = 64
+ARRAYS = (('ids', np.int32), ('values', np.float64), ('counts', np.int32))
+OPPONENT_NAMES = {'random': 'RandomPlayer',
+                  'winner': 'RandomWinner', 'blocker': 'RandomWinnerBlocker'}
+# step size schedules that can be saved, by name
+SCHEDULES = {schedule.__name__: schedule for schedule in (ConstantStep, DecayingStep)}
+
+
+def schedule_to_json(alpha) -> Union[dict, None]:
+    """
+    Step size schedule of a value table as JSON, None for the sample average
+
+    :raises: ValueError if the schedule is not one of SCHEDULES, e.g. a lambda
+    """
+    if alpha is None:
+        return None
+    if type(alpha) not in SCHEDULES.values():
+        raise ValueError(f'Step size schedule {alpha!r} can not be saved, use one of {list(SCHEDULES)}')
+    return {'schedule': type(alpha).__name__, **vars(alpha)}
+
+
+def schedule_from_json(alpha: Union[dict, None]):
+    """
+    Step size schedule saved by schedule_to_json
+    """
+    if alpha is None:
+        return None
+    params = dict(alpha)
+    return SCHEDULES[params.pop('schedule')](**params)
+
+
+class Checkpoint:
+    """
+    Learned value table with its metadata, in a compact binary file.
+
+    Layout: 8 byte magic, little endian uint64 header length, a JSON header, then the
+    ids (int32), values (float64) and counts (int32) arrays, each starting on a 64 byte boundary
+    at the offset recorded in the header. ids are dense canonical ids from the StateIndex.
+    Loading memory maps the arrays, so nothing is copied until it is used.
+    """
+
+    def __init__(self, ids: np.ndarray, values: np.ndarray, counts: np.ndarray, metadata: dict) -> None:
+        self.ids = ids
+        self.values = values
+        self.counts = counts
+        self.metadata = metadata
+
+    @classmethod
+    def from_learner(cls, learner, index: StateIndex = None, **metadata) -> 'Checkpoint':
+        """
+        Checkpoint of a ReinforcementTicTacToeLearner or BatchTicTacToeLearner
+
+        :param learner: learner to checkpoint
+        :param index: StateIndex the ids are taken from, defaults to the shared index
+        :param metadata: anything else to record
+        """
+        index = get_index() if index is None else index
+        state_dict = learner.state_dict
+
+        if isinstance(state_dict, StateArrayX):
+            ids = np.arange(len(state_dict.values), dtype=np.int32)
+            values = np.asarray(state_dict.values, dtype=np.float64)
+            counts = np.asarray(state_dict.counts, dtype=np.int32)
+        elif isinstance(state_dict, StateDictX) and state_dict.board is None:
+            ids = np.array([index.canonical_id(key)
+                           for key in state_dict], dtype=np.int32)
+            values = np.array([v for v, _ in state_dict.values()],
+                              dtype=np.float64)
+            counts = np.array([n for _, n in state_dict.values()],
+                              dtype=np.int32)
+        else:
+            raise ValueError(
+                'Only 3x3 StateDictX and StateArrayX tables can be checkpointed')
+
+        if np.any(ids < 0):
+            raise ValueError('State table holds states that are not reachable')
+
+        opponent = learner.opponent
+        if isinstance(opponent, Player):
+            opponent = type(opponent).__name__
+        else:
+            opponent = OPPONENT_NAMES.get(opponent, opponent)
+
+        metadata = {
+            'epsilon': learner.epsilon,
+            'opponent': opponent,
+            'player': learner.player,
+            'games_played': learner.games_played,
+            'zobrist': getattr(learner, 'zobrist', False),
+            'alpha': schedule_to_json(state_dict.alpha),
+            'lam': getattr(learner, 'lam', None),
+            'n_canonical': index.n_canonical,
+            **metadata,
+        }
+        return cls(ids, values, counts, metadata)
+
+    def save(self, path: str) -> None:
+        n = len(self.ids)
+
+        # offsets depend on the header length, which depends on the offsets, so settle them first
+        offsets = {}
+        header_len = 0
+        while True:
+            start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+            for name, dtype in ARRAYS:
+                offsets[name] = start
+                start += -(-n*np.dtype(dtype).itemsize // ALIGN) * ALIGN
+
+            header = json.dumps({'version': VERSION, 'n': n, 'offsets': offsets,
+                                 'metadata': self.metadata}).encode()
+            if len(header) <= header_len:
+                break
+            header_len = len(header) + ALIGN
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', header_len))
+            f.write(header.ljust(header_len))
+
+            for name, dtype in ARRAYS:
+                f.write(b'\0' * (offsets[name] - f.tell()))
+                f.write(np.ascontiguousarray(
+                    getattr(self, name), dtype=np.dtype(dtype).newbyteorder('<')).tobytes())
+
+    @classmethod
+    def load(cls, path: str, mode: str = 'r') -> 'Checkpoint':
+        """
+        Memory map a checkpoint
+
+        :param path: path of the checkpoint
+        :param mode: 'r' read only, or 'c' copy on write so the arrays can be learned into
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path} is not a TicTacToe checkpoint')
+            header_len, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len))
+
+        if header['version'] != VERSION:
+            raise ValueError(
+                f"Checkpoint version {header['version']} is not supported")
+
+        n = header['n']
+        arrays = {}
+        for name, dtype in ARRAYS:
+            if n:
+                arrays[name] = np.memmap(path, dtype=np.dtype(dtype).newbyteorder('<'), mode=mode,
+                                         offset=header['offsets'][name], shape=(n,))
+            else:
+                arrays[name] = np.zeros(0, dtype=dtype)
+
+        return cls(metadata=header['metadata'], **arrays)
+
+    def to_state_array(self, index: StateIndex = None) -> StateArrayX:
+        """
+        StateArrayX of the checkpoint, sharing the memory mapped arrays when the checkpoint holds every state
+        """
+        index = get_index() if index is None else index
+        player = self.metadata['player']
+        alpha = schedule_from_json(self.metadata.get('alpha'))
+
+        if len(self.ids) == index.n_canonical and np.array_equal(self.ids, np.arange(index.n_canonical)):
+            return StateArrayX(player=player, index=index, values=self.values, counts=self.counts, alpha=alpha)
+
+        state_array = StateArrayX(player=player, index=index, alpha=alpha)
+        state_array.values[self.ids] = self.values
+        state_array.counts[self.ids] = self.counts
+        return state_array
+
+    def to_state_dict(self, index: StateIndex = None) -> StateDictX:
+        """
+        StateDictX of the checkpoint, keyed by zobrist hash if the learner was
+        """
+        index = get_index() if index is None else index
+
+        if self.metadata.get('zobrist'):
+            keys = {canonical_id: h for h, canonical_id in index.zobrist_ids.items()}
+        else:
+            keys = {canonical_id: index.key_of(canonical_id)
+                    for canonical_id in self.ids.tolist()}
+
+        return StateDictX({keys[canonical_id]: [value, count] for canonical_id, value, count in zip(
+            self.ids.tolist(), self.values.tolist(), self.counts.tolist())},
+            alpha=schedule_from_json(self.metadata.get('alpha')))
+
+
+def save_checkpoint(learner, path: str, **metadata) -> Checkpoint:
+    """
+    Save the value table and settings of a learner
+
+    :param learner: ReinforcementTicTacToeLearner or BatchTicTacToeLearner
+    :param path: file to write
+    :param metadata: anything else to record
+    """
+    checkpoint = Checkpoint.from_learner(learner, **metadata)
+    checkpoint.save(path)
+    return checkpoint
+
+
+def load_learner(path: str, n: int = 0, opponent: Player = None, table: str = 'array',
+                 evaluate: bool = False) -> ReinforcementTicTacToeLearner:
+    """
+    ReinforcementTicTacToeLearner warm started from a checkpoint, with the step size schedule and lam it was saved with.
+
+    :param path: checkpoint to load
+    :param n: number of further games for learn
+    :param opponent: Player to play against, defaults to a new one of the checkpointed type
+    :param table: 'array' for a StateArrayX, 'dict' for a StateDictX
+    :param evaluate: only play greedy games, the value table is then the read only memory map itself
+    :return: learner, with games_played carried over
+    """
+    checkpoint = Checkpoint.load(path, mode='r' if evaluate else 'c')
+    metadata = checkpoint.metadata
+
+    if opponent is None:
+        other = 'O' if metadata['player'] == 'X' else 'X'
+        opponent = getattr(Players, metadata['opponent'])(player=other)
+
+    if table == 'array':
+        state_dict: Union[StateArrayX,
+                          StateDictX] = checkpoint.to_state_array()
+    elif table == 'dict':
+        state_dict = checkpoint.to_state_dict()
+    else:
+        raise ValueError(f"Table must be 'array' or 'dict', not {table}")
+
+    learner = ReinforcementTicTacToeLearner(n, metadata['epsilon'], opponent, player=metadata['player'],
+                                            state_dict=state_dict,
+                                            zobrist=metadata.get('zobrist', False) and table == 'dict',
+                                            lam=metadata.get('lam'))
+    learner.games_played = metadata['games_played']
+    return learner
@@ -0,0 +1,93 @@
+import Players
+from Checkpoint import load_learner, save_checkpoint
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+import os
+import random
+import tempfile
+import numpy as np
+
+
+def _play_shard(path: str, n: int, seed: int, opponent: str, aggregate: bool):
+    """
+    Play one shard of greedy games in a worker, against the memory mapped checkpoint
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+
+    learner = load_learner(path, evaluate=True)
+    if opponent is not None:
+        learner.opponent = getattr(Players, opponent)(
+            player=learner.opponent.player)
+
+    wld = learner.play_n_games(n)
+    return count_wld(wld) if aggregate else wld
+
+
+def count_wld(wld: List[Tuple[str, bool]]) -> Dict[bool, Dict[str, int]]:
+    """
+    Count results split by whether we played first
+
+    :param wld: list of tuples (result, played_first)
+    :return: {played_first: {'w': wins, 'd': draws, 'l': losses}}
+    """
+    counts = {True: {'w': 0, 'd': 0, 'l': 0}, False: {'w': 0, 'd': 0, 'l': 0}}
+    for result, played_first in wld:
+        counts[played_first][result] += 1
+    return counts
+
+
+def merge_counts(shards: List[Dict[bool, Dict[str, int]]]) -> Dict[bool, Dict[str, int]]:
+    """
+    Sum the counts (see count_wld) of several shards
+    """
+    counts = count_wld([])
+    for shard in shards:
+        for played_first, shard_counts in shard.items():
+            for result, count in shard_counts.items():
+                counts[played_first][result] += count
+    return counts
+
+
+def parallel_play_n_games(learner, n: int, workers: int = None, seed: int = 0, opponent: str = None,
+                          aggregate: bool = False) -> Union[List[Tuple[str, bool]], Dict[bool, Dict[str, int]]]:
+    """
+    play_n_games split across processes.
+    The value table is frozen into a checkpoint which every worker memory maps read only, so it is
+    shared rather than copied. Each worker plays its shard with its own random stream.
+
+    :param learner: learner to evaluate, or the path of a checkpoint
+    :param n: number of games to play
+    :param workers: number of processes, defaults to the number of cores
+    :param seed: seed the worker streams are spawned from
+    :param opponent: name of a Players.py class to play against, defaults to the learner's opponent
+    :param aggregate: return merged counts (see count_wld) rather than the list of results
+
+    :return: list of tuples (result, played_first) in shard order, or the merged counts
+    """
+    workers = workers or os.cpu_count()
+
+    if isinstance(learner, str):
+        path, tmp = learner, None
+    else:
+        fd, tmp = tempfile.mkstemp(suffix='.ckpt')
+        os.close(fd)
+        save_checkpoint(learner, tmp)
+        path = tmp
+
+    shards = [n // workers + (i < n % workers) for i in range(workers)]
+    seeds = [int(s.generate_state(1, dtype=np.uint64)[0])
+             for s in np.random.SeedSequence(seed).spawn(workers)]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play_shard, [path]*workers, shards, seeds,
+                                    [opponent]*workers, [aggregate]*workers))
+    finally:
+        if tmp is not None:
+            os.remove(tmp)
+
+    if not aggregate:
+        return [game for shard in results for game in shard]
+    return merge_counts(results)
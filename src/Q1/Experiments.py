@@ -0,0 +1,56 @@
+from BatchLearner import BatchTicTacToeLearner
+from Learners import ReinforcementTicTacToeLearner, StateArrayX, StateDictX
+from Players import RandomPlayer, RandomWinner, RandomWinnerBlocker
+from Results import CODES, ResultLog
+
+import numpy as np
+
+
+OPPONENTS = {cls.__name__: cls for cls in [
+    RandomPlayer, RandomWinner, RandomWinnerBlocker]}
+
+
+def run_learner(config: dict, seed: int) -> dict:
+    """
+    Train and evaluate one learner, for use with sweep.run_sweep
+
+    config keys:
+    - epsilon: Probability to make a non greedy move
+    - opponent: name of the Players.py class to play against
+    - games: number of games to learn over
+    - play_games: number of greedy games to evaluate over (default 0)
+    - batch_size: play with BatchTicTacToeLearner when given
+    - alpha: constant step size of the value table, sample average when not given
+    - lam: TD(lambda) trace decay, one step backups when not given, not with batch_size
+
+    :param config: config of the run
+    :param seed: seed of the run
+    :return: learning and playing results as columns, results as int8 codes of Results.RESULTS
+    :raises: ValueError if lam is given with batch_size
+    """
+    opponent = OPPONENTS[config['opponent']](player='O')
+
+    if config.get('batch_size'):
+        if config.get('lam') is not None:
+            raise ValueError('BatchTicTacToeLearner only makes one step backups, '
+                             'lam can not be used with batch_size')
+        learner = BatchTicTacToeLearner(config['games'], config['epsilon'], opponent, player='X',
+                                        batch_size=config['batch_size'], seed=seed,
+                                        state_dict=StateArrayX(alpha=config.get('alpha')))
+    else:
+        learner = ReinforcementTicTacToeLearner(
+            config['games'], config['epsilon'], opponent, player='X',
+            state_dict=StateDictX(alpha=config.get('alpha')), lam=config.get('lam'))
+
+    play_games = config.get('play_games', 0)
+    logs = [('learn', learner.learn(recorder=ResultLog(config['games']))),
+            ('play', learner.play_n_games(play_games, recorder=ResultLog(play_games)))]
+
+    results = {}
+    for name, log in logs:
+        results[f'{name}_result'] = log.results
+        results[f'{name}_played_first'] = log.played_first
+        if log.n:
+            results[f'{name}_win_pct'] = 100 * float(np.mean(log.results == CODES['w']))
+
+    return results
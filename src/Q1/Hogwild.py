@@ -0,0 +1,223 @@
+from Evaluation import count_wld, merge_counts, parallel_play_n_games
+from Learners import ReinforcementTicTacToeLearner, StateArrayX, step_schedule
+from Players import Player
+from StateIndex import StateIndex, get_index
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Lock, shared_memory
+from typing import Dict, List, Tuple, Union
+import os
+import random
+import time
+import numpy as np
+
+
+# set in each worker by _init_worker, locks can only be handed to processes as they start
+_locks = None
+
+
+class SharedStateArrayX(StateArrayX):
+    """
+    StateArrayX whose values and counts live in shared memory, so every process attached
+    to the same blocks learns into one table.
+
+    Updates are Hogwild style, unsynchronised read-modify-writes, so concurrent backups of one state
+    can occasionally be lost. With locks each backup holds the lock of its state's shard instead.
+    """
+
+    def __init__(self, values_name: str, counts_name: str, player: str = 'X', index: StateIndex = None,
+                 alpha=None, locks: list = None) -> None:
+        """
+        :param values_name: name of the shared memory block of rewards
+        :param counts_name: name of the shared memory block of num_times_seen
+        :param player: Symbol whose wins are rewarded
+        :param index: StateIndex to take ids from, defaults to the shared index
+        :param alpha: step size schedule, see step_schedule
+        :param locks: one lock per shard, states are sharded by canonical id
+        """
+        index = get_index() if index is None else index
+        self._blocks = [shared_memory.SharedMemory(name=values_name),
+                        shared_memory.SharedMemory(name=counts_name)]
+        values = np.ndarray(index.n_canonical, dtype=np.float64, buffer=self._blocks[0].buf)
+        counts = np.ndarray(index.n_canonical, dtype=np.int32, buffer=self._blocks[1].buf)
+
+        super().__init__(player=player, index=index, values=values, counts=counts, alpha=alpha)
+        self.locks = locks
+
+    @classmethod
+    def create(cls, player: str = 'X', index: StateIndex = None, alpha=None,
+               locks: list = None, table: StateArrayX = None) -> 'SharedStateArrayX':
+        """
+        Allocate the shared blocks, filled with the default rewards or copied from table.
+        The creator owns the blocks and releases them with unlink.
+        """
+        index = get_index() if index is None else index
+        blocks = [shared_memory.SharedMemory(create=True, size=index.n_canonical*np.dtype(dtype).itemsize)
+                  for dtype in (np.float64, np.int32)]
+
+        shared = cls(blocks[0].name, blocks[1].name, player=player, index=index, alpha=alpha, locks=locks)
+        for block in blocks:
+            block.close()
+
+        if table is None:
+            shared.values[:] = shared.default_values()
+            shared.counts[:] = 0
+        else:
+            shared.values[:] = table.values
+            shared.counts[:] = table.counts
+        return shared
+
+    @property
+    def names(self) -> Tuple[str, str]:
+        return self._blocks[0].name, self._blocks[1].name
+
+    def back_up(self, state, target: float) -> None:
+        if self.locks is None:
+            return super().back_up(state, target)
+
+        state_id = self.state_id(state)
+        with self.locks[state_id % len(self.locks)]:
+            super().back_up(state_id, target)
+
+    def update_many(self, old_ids: np.ndarray, new_ids: np.ndarray) -> None:
+        if self.locks is None:
+            return super().update_many(old_ids, new_ids)
+
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            super().update_many(old_ids, new_ids)
+        finally:
+            for lock in self.locks:
+                lock.release()
+
+    def to_state_array(self) -> StateArrayX:
+        """
+        Private copy of the table
+        """
+        return StateArrayX(player=self.player, index=self.index, values=self.values.copy(),
+                           counts=self.counts.copy(), alpha=self.alpha)
+
+    def close(self) -> None:
+        # the arrays point into the blocks, they have to go first
+        self.values = self.counts = None
+        for block in self._blocks:
+            block.close()
+
+    def unlink(self) -> None:
+        for block in self._blocks:
+            block.unlink()
+
+
+def _init_worker(locks: list) -> None:
+    global _locks
+    _locks = locks
+
+
+def _learn_shard(names: Tuple[str, str], n: int, seed: int, epsilon: float, opponent: Player, player: str,
+                 alpha, lam: float, aggregate: bool):
+    """
+    Learn one shard of games in a worker, into the shared table
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+
+    table = SharedStateArrayX(*names, player=player, alpha=alpha, locks=_locks)
+    learner = ReinforcementTicTacToeLearner(n, epsilon, opponent, player=player, state_dict=table, lam=lam)
+
+    start = time.perf_counter()
+    wld = learner.learn()
+    elapsed = time.perf_counter() - start
+
+    table.close()
+    return (count_wld(wld) if aggregate else wld), elapsed
+
+
+class HogwildLearner:
+    """
+    Learns one policy with several processes at once.
+
+    Each worker plays its share of the n games with its own ReinforcementTicTacToeLearner and random stream,
+    all backing up into one SharedStateArrayX held in shared memory. After learn the table is copied
+    back into state_dict, so the learner can be played, checkpointed or learned further like the others.
+    """
+
+    def __init__(self, n: int, epsilon: float, opponent: Player, player: str = 'X', workers: int = None,
+                 locks: int = 0, state_dict: StateArrayX = None, alpha=None, lam: float = None,
+                 seed: int = 0) -> None:
+        """
+        :param n: number of games to learn over, across all workers
+        :param epsilon: Probability to make a non greedy move
+        :param opponent: Instance of Player (or child of) to play against
+        :param player: Symbol to play with
+        :param workers: number of processes, defaults to the number of cores
+        :param locks: number of lock shards, 0 for unsynchronised Hogwild updates
+        :param state_dict: StateArrayX to start from
+        :param alpha: step size schedule, see step_schedule, defaults to the schedule of state_dict
+        :param lam: TD(lambda) trace decay, see ReinforcementTicTacToeLearner
+        :param seed: seed the worker streams are spawned from
+        :raises: ValueError if alpha and the schedule of state_dict are both given and differ
+        """
+        if state_dict is None:
+            state_dict = StateArrayX(player=player, alpha=alpha)
+        elif alpha is None:
+            alpha = state_dict.alpha
+        elif repr(step_schedule(alpha)) != repr(state_dict.alpha):
+            raise ValueError(f'alpha {alpha!r} differs from the schedule of state_dict {state_dict.alpha!r}')
+
+        self.n = n
+        self.epsilon = epsilon
+        self.opponent = opponent
+        self.player = player
+        self.workers = workers or os.cpu_count()
+        self.locks = locks
+        self.alpha = step_schedule(alpha)
+        self.lam = lam
+        self.seed = seed
+
+        self.state_dict = state_dict
+        self.games_played = 0
+        self.elapsed = None
+        self.games_per_second = None
+
+    def learn(self, aggregate: bool = False) -> Union[List[Tuple[str, bool]], Dict[bool, Dict[str, int]]]:
+        """
+        Learn n games across the workers.
+        Sets elapsed (wall clock seconds) and games_per_second (aggregate over all workers).
+
+        :param aggregate: return merged counts (see Evaluation.count_wld) rather than the list of results
+        :return: list of tuples (result, played_first) in shard order, or the merged counts
+        """
+        locks = [Lock() for _ in range(self.locks)] or None
+        table = SharedStateArrayX.create(player=self.player, alpha=self.alpha, table=self.state_dict)
+
+        shards = [self.n // self.workers + (i < self.n % self.workers) for i in range(self.workers)]
+        seeds = [int(s.generate_state(1, dtype=np.uint64)[0])
+                 for s in np.random.SeedSequence([self.seed, self.games_played]).spawn(self.workers)]
+
+        try:
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(locks,)) as pool:
+                results = list(pool.map(_learn_shard, [table.names]*self.workers, shards, seeds,
+                                        [self.epsilon]*self.workers, [self.opponent]*self.workers,
+                                        [self.player]*self.workers, [self.alpha]*self.workers,
+                                        [self.lam]*self.workers, [aggregate]*self.workers))
+            self.elapsed = time.perf_counter() - start
+            self.state_dict = table.to_state_array()
+        finally:
+            table.close()
+            table.unlink()
+
+        self.games_played += self.n
+        self.games_per_second = self.n / self.elapsed
+
+        if not aggregate:
+            return [game for wld, _ in results for game in wld]
+        return merge_counts([shard for shard, _ in results])
+
+    def play_n_games(self, n: int, aggregate: bool = False):
+        """
+        Play n greedy games with the learned table, across the workers, see Evaluation.parallel_play_n_games
+        """
+        return parallel_play_n_games(self, n, workers=self.workers, seed=self.seed, aggregate=aggregate)
@@ -0,0 +1,86 @@
+from shared import profiling
+
+import BitBoard
+import MNKBoard
+from BatchLearner import BatchTicTacToeLearner
+from Learners import StateDictX
+from StateIndex import StateIndex, get_index
+
+import numpy as np
+
+
+# methods profiled on each part of a learner, where they exist
+LEARNER_STAGES = ('learn_one_move', 'greedy_move', 'random_move', 'game_lost', 'board_key', 'get_state_key')
+BATCH_STAGES = ('afterstates', 'greedy_moves', 'opponent_moves', 'learner_moves', 'place')
+BOARD_STAGES = ('add_move', 'fake_move', 'winner', 'game_over', 'possible_moves', 'similar_states',
+                'wins_with', 'terminal', 'zobrist_hash', 'afterstate_key', 'canonical_key')
+TABLE_STAGES = ('state_key', 'load_state', 'get_reward', 'get', 'update', 'state_id', 'update_many')
+INDEX_STAGES = ('canonical_id', 'outcome')
+CACHES = {'BitBoard.render': BitBoard.render, 'BitBoard.parse': BitBoard.parse,
+          'MNKBoard.geometry': MNKBoard.geometry, 'StateIndex.get_index': get_index}
+
+
+def _existing(cls: type, names: tuple) -> list:
+    return [name for name in names if hasattr(cls, name)]
+
+
+def states_seen(state_dict) -> int:
+    """
+    Number of distinct states in the value table backed up at least once
+    """
+    if isinstance(state_dict, StateDictX):
+        return sum(1 for _, seen_num in state_dict.values() if seen_num)
+    return int(np.count_nonzero(state_dict.counts))
+
+
+def profile_learner(learner, profiler: profiling.Profiler = None) -> profiling.Profiler:
+    """
+    Profiler of the learner, its board class, value table, opponent and the StateIndex.
+    Nothing is patched until it is enabled.
+
+    >>> profiler = profile_learner(learner)
+    >>> with profiler:
+    ...     learner.learn()
+    >>> learner_report(profiler, learner)
+
+    :param learner: ReinforcementTicTacToeLearner or BatchTicTacToeLearner
+    :param profiler: Profiler to add to, defaults to a new one
+    """
+    profiler = profiling.Profiler() if profiler is None else profiler
+    cls = type(learner)
+
+    if isinstance(learner, BatchTicTacToeLearner):
+        profiler.instrument(cls, 'run', units=lambda self, n, *args, **kwargs: n, unit='games')
+        profiler.instrument(cls, *BATCH_STAGES)
+    else:
+        profiler.instrument(cls, 'learn_one_game', 'play_one_game', unit='games')
+        profiler.instrument(cls, *_existing(cls, LEARNER_STAGES))
+        profiler.instrument(learner.board_cls, *_existing(learner.board_cls, BOARD_STAGES), stage='board')
+        profiler.instrument(type(learner.opponent), 'move', stage='opponent')
+
+    table = type(learner.state_dict)
+    profiler.instrument(table, *_existing(table, TABLE_STAGES), stage='table')
+    profiler.instrument(StateIndex, *INDEX_STAGES, stage='index')
+
+    for name, fn in CACHES.items():
+        profiler.watch_cache(name, fn)
+
+    profiler.gauge('table_size', lambda: len(learner.state_dict))
+    profiler.gauge('states_seen', lambda: states_seen(learner.state_dict))
+    return profiler
+
+
+def learner_report(profiler: profiling.Profiler, learner, **extra) -> dict:
+    """
+    Profiler report with the hit rate of the value table, i.e. lookups of states already in it
+
+    :param extra: anything else to record
+    """
+    report = profiler.report(**extra)
+
+    lookups = report['stages'].get('table.load_state', {}).get('calls', 0)
+    size = report['gauges']['table_size']
+    added = size['end'] - size['start'] if isinstance(learner.state_dict, StateDictX) else 0
+    report['value_table'] = {'lookups': lookups, 'added': added,
+                             'hit_rate': 1 - added / lookups if lookups else None}
+    return report
@@ -1,12 +1,59 @@
 from TicTacToe import TicTacToe
+from MNKBoard import MNKBoard
 from Players import Player
-from functools import lru_cache
+from Results import ResultLog
+from StateIndex import DIGITS, POWERS, StateIndex, encode, get_index
 
-from typing import List, Tuple
+from typing import List, Tuple, Union
 import numpy as np
 import random
 
 
+class ConstantStep:
+    """
+    Constant step size alpha, weighting recent backups more, as GreedyLearner in Q2 with alpha
+    """
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+
+    def __call__(self, n):
+        return self.alpha
+
+    def __repr__(self) -> str:
+        return f'ConstantStep({self.alpha})'
+
+
+class DecayingStep:
+    """
+    Step size (offset + 1)**power / (n + offset)**power for the n-th backup of a state.
+    power 1 and offset 0 is the sample average, power in (0.5, 1] still converges, and a larger offset
+    keeps early steps from being dominated by the default values.
+    """
+
+    def __init__(self, power: float = 1.0, offset: float = 0.0) -> None:
+        self.power = power
+        self.offset = offset
+
+    def __call__(self, n):
+        return ((self.offset + 1) / (n + self.offset))**self.power
+
+    def __repr__(self) -> str:
+        return f'DecayingStep({self.power}, {self.offset})'
+
+
+def step_schedule(alpha):
+    """
+    Step size schedule from the alpha given to a value table
+
+    :param alpha: None for the sample average, a number for a constant step size, or a callable of the
+        number of times a state has been backed up (including this one) giving the step size
+    """
+    if alpha is None or callable(alpha):
+        return alpha
+    return ConstantStep(alpha)
+
+
 class StateDictX(dict):
     """
     Data structure to hold state and rewards.
@@ -16,13 +63,20 @@ class StateDictX(dict):
         'state_key': [reward, num_times_seen]
     }
 
+    Keys are canonical strings from the StateIndex, canonical zobrist hashes (TicTacToe.zobrist_key),
+    or the canonical codes of board when an MNKBoard is given.
+
+    alpha swaps the sample average for another step size schedule, see step_schedule.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, board: MNKBoard = None, alpha=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.board = board
+        self.alpha = step_schedule(alpha)
 
-    @staticmethod
-    def state_key(state: str):
+    def state_key(self, state: str):
+        if self.board is not None:
+            return self.board.canonical_key(state)
         return ReinforcementTicTacToeLearner.get_state_key(state)
 
     def load_state(self, state: str):
@@ -37,8 +91,19 @@ class StateDictX(dict):
             return
 
         # not in dict, need to prepopulate
-        ttt_winner = TicTacToe._winner(state_key)
-        board_full = TicTacToe.board_full(state_key)
+        if self.board is not None:
+            curr_state = self.board.decode(state_key)
+            ttt_winner = self.board.winner(curr_state)
+            board_full = self.board.board_full(curr_state)
+        else:
+            try:
+                ttt_winner, board_full = get_index().outcome(state_key)
+            except KeyError:
+                if isinstance(state_key, int):
+                    raise
+                # not a reachable position, work it out from the board
+                ttt_winner = TicTacToe._winner(state_key)
+                board_full = TicTacToe.board_full(state_key)
 
         if ttt_winner == 'X':
             # this state is a winning state, reward is 1
@@ -62,6 +127,40 @@ class StateDictX(dict):
 
         return self[state_key][0]
 
+    def score_afterstates(self, board: TicTacToe, player: str) -> Tuple[List[int], List[float]]:
+        """
+        Reward of the board after each legal move of player, looked up together.
+        Canonical keys come from the board's afterstate ids, so no board is copied or keyed by string.
+
+        :param board: Current state of board
+        :param player: Player to move
+        :return: moves, rewards
+        """
+        if self.board is not None:
+            moves, keys = board.afterstate_ids(player)
+        else:
+            index = get_index()
+            moves, ids = board.afterstate_ids(player, index)
+            keys = [index.key_of(canonical_id) for canonical_id in ids]
+
+        return moves, self.get_rewards(keys)
+
+    def get_rewards(self, keys: List) -> List[float]:
+        """
+        Rewards of many canonical keys at once, initialising those not seen yet
+
+        :param keys: canonical keys, as state_key gives
+        """
+        rewards = [None]*len(keys)
+        for i, key in enumerate(keys):
+            entry = dict.get(self, key)
+            if entry is None:
+                self.load_state(state=key)
+                entry = self[key]
+            rewards[i] = entry[0]
+
+        return rewards
+
     def get(self, state: str):
         """
         Return reward and num_seen of current state. 
@@ -84,58 +183,336 @@ class StateDictX(dict):
         old_state_key = self.state_key(old_state)
         new_state_key_1 = self.state_key(new_state)
 
-        v, seen_num = self.get(old_state_key)
         v_1, _ = self.get(new_state_key_1)
+        self.back_up(old_state_key, v_1)
+
+    def back_up(self, state: str, target: float) -> None:
+        """
+        Move the reward of state towards target by the step size
+
+        :param state: Key of state
+        :param target: Value to move towards
+        """
+        state_key = self.state_key(state)
+        v, seen_num = self.get(state_key)
 
         seen_num += 1
-        v_new = v + (v_1 - v)/(seen_num)
+        if self.alpha is None:
+            v_new = v + (target - v)/(seen_num)
+        else:
+            v_new = v + self.alpha(seen_num)*(target - v)
+
+        self[state_key] = [v_new, seen_num]
+
+    def update_episode(self, backups: List[Tuple[str, str]], lam: float) -> None:
+        """
+        TD(lambda) backups of one episode, applied together at its end.
+
+        Each old state moves towards its lambda return, which mixes the values of all the later states of
+        the episode with weights decaying by lam per step, as eligibility traces would.
+        All values are read before any are written, so lam = 0 is the same as calling update on each pair.
+        The trace is cut where the pairs do not chain up, i.e. across exploratory moves.
+
+        :param backups: (old, new) keys in the order update would have been called
+        :param lam: trace decay, 0 for one step backups, 1 for Monte Carlo
+        """
+        keys = [(self.state_key(old), self.state_key(new)) for old, new in backups]
+        targets = lambda_returns(keys, [self.get_reward(new) for _, new in keys], lam)
+
+        for (old_key, _), target in zip(keys, targets):
+            self.back_up(old_key, target)
 
-        self[old_state_key] = [v_new, seen_num]
+
+def lambda_returns(keys: List[Tuple], new_values: List[float], lam: float) -> List[float]:
+    """
+    Lambda return targets of a chain of backups, worked backwards from the end of the episode
+
+    :param keys: (old, new) keys of each backup
+    :param new_values: value of each new state
+    :param lam: trace decay
+    :return: target of each old state
+    """
+    targets = [None]*len(keys)
+    for i in reversed(range(len(keys))):
+        if i + 1 < len(keys) and keys[i + 1][0] == keys[i][1]:
+            targets[i] = new_values[i] + lam*(targets[i + 1] - new_values[i])
+        else:
+            # last backup, or the next one starts elsewhere (an exploratory move), so the trace ends
+            targets[i] = new_values[i]
+    return targets
+
+
+class StateArrayX:
+    """
+    Array backed alternative to StateDictX.
+    States are stored by their dense canonical id from the StateIndex,
+    rewards in a float64 array and the number of times seen in an int32 array.
+
+    Keys can be string states (any symmetry) or canonical ids.
+    """
+
+    def __init__(self, player: str = 'X', index: StateIndex = None,
+                 values: np.ndarray = None, counts: np.ndarray = None, alpha=None) -> None:
+        """
+        :param player: Symbol whose wins are rewarded
+        :param index: StateIndex to take ids from, defaults to the shared index
+        :param values: existing rewards to use (not copied), e.g. memory mapped from a checkpoint
+        :param counts: existing num_times_seen to use (not copied)
+        :param alpha: step size schedule, sample average when not given, see step_schedule
+        """
+        self.index = get_index() if index is None else index
+        self.player = player
+        self.alpha = step_schedule(alpha)
+
+        self.values = self.default_values() if values is None else values
+        self.counts = np.zeros(self.index.n_canonical,
+                               dtype=np.int32) if counts is None else counts
+
+    def default_values(self) -> np.ndarray:
+        """
+        Same defaults as StateDictX.load_state: won 1, lost or draw 0, in play 0.5
+        """
+        won = self.index.canonical_winner == DIGITS[self.player]
+        return np.where(won, 1.0, np.where(self.index.canonical_terminal, 0.0, 0.5))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def state_id(self, state) -> int:
+        """
+        Dense id of state, ids are passed through unchanged
+
+        :raises: KeyError if state can not be reached
+        """
+        if isinstance(state, (int, np.integer)):
+            return state
+
+        state_id = self.index.canonical_id(state)
+        if state_id < 0:
+            raise KeyError(f'State {state!r} is not reachable')
+        return state_id
+
+    # same role as StateDictX.state_key
+    state_key = state_id
+
+    def get_reward(self, state) -> float:
+        """
+        Return reward of current state.
+        """
+        return self.values[self.state_id(state)]
+
+    def score_afterstates(self, board: TicTacToe, player: str) -> Tuple[List[int], np.ndarray]:
+        """
+        Reward of the board after each legal move of player, gathered in one indexing of values
+
+        :param board: Current state of board
+        :param player: Player to move
+        :return: moves, rewards
+        """
+        moves, ids = board.afterstate_ids(player, self.index)
+        return moves, self.values[ids]
+
+    def get_rewards(self, ids: List[int]) -> np.ndarray:
+        """
+        Rewards of many canonical ids at once
+        """
+        return self.values[ids]
+
+    def get(self, state) -> Tuple[float, int]:
+        """
+        Return reward and num_seen of current state.
+        """
+        state_id = self.state_id(state)
+        return self.values[state_id], self.counts[state_id]
+
+    def update(self, old_state, new_state) -> None:
+        """
+        Update the previous state reward with the new state value
+
+        :param old_state: Key of old state
+        :param new_state: Key of new state
+        """
+        self.back_up(old_state, self.values[self.state_id(new_state)])
+
+    def back_up(self, state, target: float) -> None:
+        """
+        Move the reward of state towards target by the step size
+        """
+        state_id = self.state_id(state)
+
+        self.counts[state_id] += 1
+        if self.alpha is None:
+            self.values[state_id] += (target -
+                                      self.values[state_id])/self.counts[state_id]
+        else:
+            self.values[state_id] += self.alpha(self.counts[state_id])*(target -
+                                                                        self.values[state_id])
+
+    def update_many(self, old_ids: np.ndarray, new_ids: np.ndarray) -> None:
+        """
+        Apply update(old, new) for every pair at once.
+
+        All new values are read before any are written, which is what update gives when the
+        pairs are consecutive backups from one episode.
+
+        :param old_ids: ids of old states
+        :param new_ids: ids of new states
+        """
+        self.back_up_many(old_ids, self.values[np.asarray(new_ids, dtype=np.intp)])
+
+    def update_episode(self, backups: List[Tuple], lam: float) -> None:
+        """
+        TD(lambda) backups of one episode, applied together at its end, see StateDictX.update_episode
+
+        :param backups: (old, new) keys in the order update would have been called
+        :param lam: trace decay, 0 for one step backups, 1 for Monte Carlo
+        """
+        ids = [(self.state_id(old), self.state_id(new)) for old, new in backups]
+        targets = lambda_returns(ids, [self.values[new] for _, new in ids], lam)
+
+        for (old_id, _), target in zip(ids, targets):
+            self.back_up(old_id, target)
+
+    def back_up_many(self, old_ids: np.ndarray, targets: np.ndarray) -> None:
+        """
+        Move the reward of each old state towards its target, as if one after another.
+
+        With the sample average repeated old ids are averaged exactly, since it only depends
+        on the sum of the targets seen. Other schedules take repeats in turn.
+
+        :param old_ids: ids of old states
+        :param targets: value each moves towards
+        """
+        old_ids = np.asarray(old_ids, dtype=np.intp)
+        targets = np.asarray(targets, dtype=np.float64)
+
+        if self.alpha is not None:
+            # occurrence number of each id, so every round of updates touches an id at most once
+            order = np.argsort(old_ids, kind='stable')
+            sorted_ids = old_ids[order]
+            first = np.searchsorted(sorted_ids, sorted_ids)
+            rank = np.empty(len(old_ids), dtype=np.intp)
+            rank[order] = np.arange(len(old_ids)) - first
+
+            for r in range(rank.max() + 1 if len(rank) else 0):
+                ids, t = old_ids[rank == r], targets[rank == r]
+                self.counts[ids] += 1
+                self.values[ids] += self.alpha(self.counts[ids])*(t - self.values[ids])
+            return
+
+        seen = np.bincount(old_ids, minlength=len(self.values))
+        totals = np.bincount(old_ids, weights=targets,
+                             minlength=len(self.values))
+
+        ids = np.flatnonzero(seen)
+        counts = self.counts[ids] + seen[ids]
+        self.values[ids] = (self.values[ids] *
+                            self.counts[ids] + totals[ids]) / counts
+        self.counts[ids] = counts
 
 
 class ReinforcementTicTacToeLearner:
 
-    def __init__(self, n: int, epsilon: float, opponent: Player, player: str = 'X') -> None:
+    def __init__(self, n: int, epsilon: float, opponent: Player, player: str = 'X',
+                 board_cls: type = TicTacToe, state_dict=None, zobrist: bool = False,
+                 lam: float = None) -> None:
         """
 
         :param n: number of iterations to learn over
         :param epsilon: Probability to make a non greedy move
         :param opponent: Instance of Player (or child of) to play against
         :param player: Symbol to play with
+        :param board_cls: Board implementation to play on, e.g. TicTacToe or BitTicTacToe
+        :param state_dict: Value table to learn into, StateDictX or StateArrayX (default StateDictX)
+        :param zobrist: Key states by TicTacToe.zobrist_key rather than by string, needs a TicTacToe board
+        :param lam: Back up with TD(lambda) at the end of each game rather than one step after each move
         """
-        self.state_dict = StateDictX()
+        if state_dict is None:
+            board = board_cls()
+            state_dict = StateDictX(
+                board=board if isinstance(board, MNKBoard) else None)
+
+        self.state_dict = state_dict
         self.epsilon = epsilon
         self.n = n
         self.player = player
         self.oppoent = opponent
+        self.board_cls = board_cls
+        self.zobrist = zobrist
+        self.lam = lam
+        self.games_played = 0
 
         return
 
+    @property
+    def opponent(self) -> Player:
+        # oppoent is kept as the attribute, the notebooks read it
+        return self.oppoent
+
+    @opponent.setter
+    def opponent(self, opponent: Player) -> None:
+        self.oppoent = opponent
+
+    def board_key(self, board: TicTacToe):
+        """
+        Key of the current board to back up values with: zobrist hash, canonical code on an MNKBoard
+        (kept up to date move by move), or string state
+        """
+        if self.zobrist:
+            return self.zobrist_table_key(board.zobrist_key())
+        if isinstance(board, MNKBoard):
+            return board.canonical_key()
+        return board.str_state()
+
+    def zobrist_table_key(self, key: int) -> int:
+        """
+        Key a zobrist hash is stored under in the value table.
+        A StateArrayX takes integer keys as dense ids, so the hash is looked up as its id.
+        """
+        if isinstance(self.state_dict, StateArrayX):
+            return self.state_dict.index.zobrist_ids[key]
+        return key
+
     @staticmethod
-    @lru_cache
     def get_state_key(state: str) -> str:
         """
         Given symetries in states of board, we return the state key from a list of different states.
-        We cache this function to speed up the learning process.
+        Reachable states are looked up in the precomputed StateIndex.
+        Integer zobrist keys are already canonical, so are returned as is.
 
-        :param state: String state of board
+        :param state: String state of board, or zobrist key
         :return: String state key
         """
-        similar_states = TicTacToe().similar_states(curr_state=state)
-        return sorted(similar_states)[0]
+        if isinstance(state, int):
+            return state
+
+        try:
+            return get_index().canonical_key(state)
+        except KeyError:
+            similar_states = TicTacToe().similar_states(curr_state=state)
+            return sorted(similar_states)[0]
 
-    def learn(self) -> List[Tuple[str, bool]]:
+    def learn(self, recorder: ResultLog = None) -> Union[List[Tuple[str, bool]], ResultLog]:
         """
         Learn n games of tic tac toe.
 
-        :return: List of tuples of (winner, if we played first)
+        :param recorder: ResultLog to record results in, rather than a list
+        :return: List of tuples of (winner, if we played first), or recorder
         """
-        wld = [None]*self.n
+        wld = [None]*self.n if recorder is None else recorder
 
         for game_num in range(self.n):
             winner, played_first = self.learn_one_game()
             result = self.get_result(winner)
-            wld[game_num] = [result, played_first]
+            if recorder is None:
+                wld[game_num] = [result, played_first]
+            else:
+                recorder.append(result, played_first)
+
+        if recorder is not None:
+            recorder.flush()
+
+        self.games_played += self.n
         return wld
 
     def learn_one_move(self, game: TicTacToe) -> Tuple[TicTacToe, bool]:
@@ -162,7 +539,7 @@ class ReinforcementTicTacToeLearner:
 
         :return: Winner of game, and if we played first
         """
-        game = TicTacToe()
+        game = self.board_cls()
 
         if random.randint(0, 1):
             game, _ = self.learn_one_move(game)
@@ -170,24 +547,39 @@ class ReinforcementTicTacToeLearner:
         else:
             played_first = False
 
+        # backups held back for TD(lambda) at the end of the game
+        episode = []
+
         while not game.game_over() and not game.winner():
-            old_state = game.str_state()
+            old_state = self.board_key(game)
 
             # they move
             game = self.oppoent.move(game)
 
             if self.game_lost(game):
-                self.state_dict.update(old_state, game.str_state())
+                self.back_up(episode, old_state, self.board_key(game))
                 break
 
             # we move
             game, did_greedy = self.learn_one_move(game=game)
 
             if did_greedy:
-                self.state_dict.update(old_state, game.str_state())
+                self.back_up(episode, old_state, self.board_key(game))
+
+        if episode:
+            self.state_dict.update_episode(episode, self.lam)
 
         return game.winner(), played_first
 
+    def back_up(self, episode: list, old_state, new_state) -> None:
+        """
+        Update the value of old_state now, or with TD(lambda) keep it for the end of the episode
+        """
+        if self.lam is None:
+            self.state_dict.update(old_state, new_state)
+        else:
+            episode.append((old_state, new_state))
+
     def game_lost(self, board: TicTacToe) -> bool:
         """
         Check if the game is lost (draw or opponent won)
@@ -224,18 +616,16 @@ class ReinforcementTicTacToeLearner:
 
         :return: New board with move made
         """
-        possible_moves = board.possible_moves()
-        outcomes = [None]*len(possible_moves)
-
-        for idx, move in enumerate(possible_moves):
-
-            hyp_state = board.fake_move(player=self.player, index=move)
-            hyp_key = self.get_state_key(''.join(hyp_state))
-
-            outcomes[idx] = self.state_dict.get_reward(hyp_key)
+        if self.zobrist:
+            possible_moves = board.possible_moves()
+            outcomes = [self.state_dict.get_reward(self.zobrist_table_key(board.afterstate_key(self.player, move)))
+                        for move in possible_moves]
+        else:
+            possible_moves, outcomes = self.state_dict.score_afterstates(
+                board, self.player)
 
         # if there are multiple optimal choices, we pick randomly from those
-        best_outcome = np.max(outcomes)
+        best_outcome = max(outcomes)
         best_indexes = [idx for idx, outcome in enumerate(
             outcomes) if outcome == best_outcome]
         best_index = random.choice(best_indexes)
@@ -268,7 +658,7 @@ class ReinforcementTicTacToeLearner:
 
         returns: winner, played_first
         """
-        game = TicTacToe()
+        game = self.board_cls()
 
         if random.randint(0, 1):
             played_first = True
@@ -276,12 +666,13 @@ class ReinforcementTicTacToeLearner:
         else:
             played_first = False
 
-        while not game.game_over() and not game.winner():
+        while not game.terminal:
 
             # they move
             game = self.oppoent.move(game)
 
-            if self.game_lost(game):
+            # our win ends the loop, so a finished game here is lost or drawn
+            if game.terminal:
                 break
 
             # we move
@@ -289,18 +680,107 @@ class ReinforcementTicTacToeLearner:
 
         return game.winner(), played_first
 
-    def play_n_games(self, n: int) -> List[Tuple[str, bool]]:
+    def play_n_games(self, n: int, recorder: ResultLog = None) -> Union[List[Tuple[str, bool]], ResultLog]:
         """
         Play n games against opponent, don't learn and always take greedy actions.
 
         :param n: number of games to play
+        :param recorder: ResultLog to record results in, rather than a list
 
-        :return: list of tuples (result, played_first)
+        :return: list of tuples (result, played_first), or recorder
         """
-        wld = [None]*n
+        wld = [None]*n if recorder is None else recorder
         for game_num in range(n):
             winner, played_first = self.play_one_game()
             result = self.get_result(winner)
-            wld[game_num] = [result, played_first]
+            if recorder is None:
+                wld[game_num] = [result, played_first]
+            else:
+                recorder.append(result, played_first)
 
+        if recorder is not None:
+            recorder.flush()
         return wld
+
+
+class LearnerPlayer(Player):
+    """
+    Greedy policy of a learner's value table as a Player, so learners can play each other
+    or be seated against any opponent.
+
+    Seated as the other symbol the board is mirrored (X and O swapped), so the table is always
+    read from the side it was learned for. move_many chooses the moves of many boards with one
+    lookup of the value table, for batched play.
+    """
+
+    # X and O swapped
+    _MIRROR = str.maketrans('XO', 'OX')
+
+    def __init__(self, learner: ReinforcementTicTacToeLearner, player: str = 'O') -> None:
+        """
+        :param learner: learner on a 3x3 board with a StateDictX or StateArrayX table
+        :param player: Symbol to play with
+        """
+        super().__init__(player)
+
+        if isinstance(learner.state_dict, StateDictX) and learner.state_dict.board is not None:
+            raise ValueError('Only learners of the 3x3 board can be seated as a LearnerPlayer')
+
+        self.learner = learner
+        self.index = get_index()
+
+    def move(self, board: TicTacToe) -> TicTacToe:
+        """
+        Greedy move of the learner, ties are broken randomly
+
+        :param board: Current board in play
+        :returns: Board after move has been made
+        """
+        self.move_many([board])
+        return board
+
+    def move_many(self, boards: List[TicTacToe]) -> None:
+        """
+        Make the greedy move on every board, scoring all their afterstates together
+
+        :param boards: boards where it is our turn
+        :raises: ValueError if a board is over or it is not our turn, before any move is made
+        """
+        learner = self.learner
+        mirror = self.player != learner.player
+        digit = DIGITS[learner.player]
+
+        moves, ids = [], []
+        for board in boards:
+            if board.terminal:
+                raise ValueError(f'Game is over on {board.str_state()!r}')
+            if board.last_turn == self.player:
+                raise ValueError(f'Not the turn of {self.player} on {board.str_state()!r}, they went last go.')
+
+            if mirror:
+                code = encode(board.str_state().translate(self._MIRROR))
+                board_moves = board.possible_moves()
+                board_ids = self.index.canonical_ids([code + digit*POWERS[move] for move in board_moves])
+            else:
+                board_moves, board_ids = board.afterstate_ids(self.player, self.index)
+            moves.append(board_moves)
+            ids.extend(board_ids)
+
+        table = learner.state_dict
+        if isinstance(table, StateArrayX):
+            rewards = table.get_rewards(ids).tolist()
+        elif learner.zobrist:
+            rewards = table.get_rewards([self.index.zobrist_key_of(i) for i in ids])
+        else:
+            rewards = table.get_rewards([self.index.key_of(i) for i in ids])
+
+        start = 0
+        for board, board_moves in zip(boards, moves):
+            outcomes = rewards[start:start + len(board_moves)]
+            start += len(board_moves)
+
+            best_outcome = max(outcomes)
+            best_indexes = [idx for idx, outcome in enumerate(
+                outcomes) if outcome == best_outcome]
+            board.add_move(player=self.player,
+                           index=board_moves[random.choice(best_indexes)])
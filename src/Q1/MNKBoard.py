@@ -0,0 +1,337 @@
+from TicTacToe import SYMBOLS, TO_DIGITS
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Tuple, Union
+import copy
+import re
+
+
+@lru_cache(maxsize=None)
+def geometry(m: int, n: int, k: int) -> Tuple[tuple, tuple, tuple]:
+    """
+    Win lines and symmetries of an m x n board with k in a row, cells numbered row by row.
+
+    :param m: number of rows
+    :param n: number of columns
+    :param k: number in a row to win
+    :return: lines (tuples of cells), the lines through each cell,
+        and the symmetries as permutations where new cell j takes old cell perm[j] (identity first)
+    """
+    if not 1 <= k <= max(m, n):
+        raise ValueError(f'Can not get {k} in a row on a {m}x{n} board')
+
+    lines = []
+    for r in range(m):
+        for c in range(n):
+            # right, down, down right, down left
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_r, end_c = r + (k - 1)*dr, c + (k - 1)*dc
+                if 0 <= end_r < m and 0 <= end_c < n:
+                    lines.append(tuple((r + i*dr)*n + c + i*dc
+                                 for i in range(k)))
+    lines = tuple(sorted(set(lines)))
+
+    lines_through = tuple(tuple(idx for idx, line in enumerate(lines) if cell in line)
+                          for cell in range(m*n))
+
+    # dihedral group of the rectangle, (row, col) -> (row, col, rows, cols) of the image
+    transforms = [
+        lambda r, c: (r, c, m, n),
+        lambda r, c: (r, n - 1 - c, m, n),
+        lambda r, c: (m - 1 - r, c, m, n),
+        lambda r, c: (m - 1 - r, n - 1 - c, m, n),
+    ]
+    if m == n:
+        transforms += [
+            lambda r, c: (c, r, n, m),
+            lambda r, c: (n - 1 - c, m - 1 - r, n, m),
+            lambda r, c: (c, m - 1 - r, n, m),
+            lambda r, c: (n - 1 - c, r, n, m),
+        ]
+
+    symmetries = []
+    for transform in transforms:
+        perm = [0]*(m*n)
+        for cell in range(m*n):
+            new_r, new_c, _, new_n = transform(*divmod(cell, n))
+            perm[new_r*new_n + new_c] = cell
+        symmetries.append(tuple(perm))
+
+    return lines, lines_through, tuple(symmetries)
+
+
+@lru_cache(maxsize=None)
+def symmetry_powers(m: int, n: int, k: int) -> Tuple[tuple, ...]:
+    """
+    For each symmetry (in geometry's order), the power of 3 each cell is worth in the code of the
+    transformed board, so the code of every symmetry can be kept up to date move by move
+    """
+    size = m*n
+    powers = []
+    for perm in geometry(m, n, k)[2]:
+        cell_powers = [0]*size
+        for new_cell, old_cell in enumerate(perm):
+            cell_powers[old_cell] = 3**(size - 1 - new_cell)
+        powers.append(tuple(cell_powers))
+    return tuple(powers)
+
+
+class MNKBoard:
+    """
+    m x n board where k in a row wins, with the same API as TicTacToe (which is the 3, 3, 3 board).
+
+    Win lines and the dihedral symmetries are generated from (m, n, k), pieces are counted on the lines
+    through each move so a win is seen as soon as a count reaches k, and the board keeps a base 3
+    integer code of its state, and of each of its symmetries, which give the canonical state keys.
+    """
+    players = {'O', 'X'}
+
+    def __init__(self, m: int = 3, n: int = 3, k: int = 3) -> None:
+
+        self.m, self.n, self.k = m, n, k
+        self.size = m*n
+        self.lines, self.lines_through, self.symmetries = geometry(m, n, k)
+        self._getters = [itemgetter(*perm) for perm in self.symmetries]
+
+        self.last_turn = None
+
+        self.state = [' ']*self.size
+        self.moves = 0
+        self.code = 0
+        # code of the board under each symmetry, the canonical key is the smallest
+        self._symmetry_powers = symmetry_powers(m, n, k)
+        self.symmetry_codes = [0]*len(self.symmetries)
+
+        # pieces of each player on each line, kept up to date by add_move
+        self.line_counts = {'O': [0]*len(self.lines), 'X': [0]*len(self.lines)}
+        self.winning_player = False
+
+    def str_state(self):
+
+        return ''.join(self.state)
+
+    def print_board(self):
+        """
+        Print current state of the board
+        """
+        for i in range(self.m):
+            print(f"|{''.join(self.state[i*self.n:(i+1)*self.n:])}|")
+        print('\n')
+
+    def verify_move(self, player: str, index: int):
+        """
+        Verify if the move is a legal move via the criteria
+        - It is that players turn
+        - Player is currently playing the game
+        - Space is not alreay taken
+
+        :raises: ValueError
+        """
+        if player not in self.players:
+            raise ValueError(f'Player must be in {self.players}, not {player}')
+
+        if self.last_turn is not None and player == self.last_turn:
+            raise ValueError(f"Not the turn of {player}, they went last go.")
+
+        if self.state[index] != ' ':
+            raise ValueError(f'Index {index} is already taken')
+
+    def add_move(self, player: str, index: int):
+        """
+        Add a move to the board, counting it on the lines through it
+
+        :param player: player making the move
+        :param index: index of the move
+        """
+        self.verify_move(player, index)
+
+        self.state[index] = player
+        self.moves += 1
+        self.last_turn = player
+        digit = SYMBOLS.index(player)
+        self.code += digit * 3**(self.size - 1 - index)
+        for i, powers in enumerate(self._symmetry_powers):
+            self.symmetry_codes[i] += digit * powers[index]
+
+        counts = self.line_counts[player]
+        for line in self.lines_through[index]:
+            counts[line] += 1
+            if counts[line] == self.k:
+                self.winning_player = player
+
+    def wins_with(self, player: str, index: int) -> bool:
+        """
+        Would player win by playing at index, without copying the board
+
+        :param player: player making the move
+        :param index: index of the move, assumed to be empty
+        :return: True if the move completes a line
+        """
+        counts = self.line_counts[player]
+        for line in self.lines_through[index]:
+            if counts[line] == self.k - 1:
+                return True
+        return False
+
+    def winning_moves(self, player: str) -> List[int]:
+        """
+        Every empty cell where player would win, in cell order
+
+        :param player: player making the move
+        """
+        counts = self.line_counts[player]
+        return [move for move in self.possible_moves()
+                if any(counts[line] == self.k - 1 for line in self.lines_through[move])]
+
+    def afterstate_ids(self, player: str, index=None) -> Tuple[List[int], List[int]]:
+        """
+        Every legal move and the canonical code of the board after it, the keys StateDictX uses
+        for this board. Taken from the symmetry codes of the board without copying it.
+        index is not used, it is there for the same call as TicTacToe.afterstate_ids
+
+        :param player: player making the move
+        :return: moves, canonical codes
+        """
+        moves = self.possible_moves()
+        digit = SYMBOLS.index(player)
+        pairs = list(zip(self.symmetry_codes, self._symmetry_powers))
+        return moves, [min(code + digit*powers[move] for code, powers in pairs) for move in moves]
+
+    @property
+    def terminal(self) -> bool:
+        """
+        True if the game has been won or the board is full
+        """
+        return bool(self.winning_player) or self.moves == self.size
+
+    def fake_move(self, player: str, index: int, verify: bool = True) -> List[str]:
+        """
+        Mimic a move without actually making it, return the state of the board after the move
+
+        :param player: player making the move
+        :param index: index of the move
+        :param verify: verify the move is legal
+
+        :return: state of the board after the move
+        """
+        if verify:
+            self.verify_move(player, index)
+
+        curr_state = copy.copy(self.state)
+        curr_state[index] = player
+
+        return curr_state
+
+    def game_over(self) -> bool:
+        """
+        Checks to see if the game is over via all spaces being taken up
+
+        :return: True if game is over, False otherwise
+        """
+        return self.moves == self.size
+
+    @staticmethod
+    def board_full(curr_state: str):
+        """
+        Checks to see if the board is full
+
+        :param curr_state: state of the board
+        :return: True if the board is full, False otherwise
+        """
+        return curr_state.count(' ') == 0
+
+    def winner(self, curr_state=None) -> Union[str, bool]:
+        """
+        Player who won, False if no winner.
+        The current board is tracked move by move, any other state is scanned in full.
+
+        :param curr_state: state of the board
+        """
+        if curr_state is None:
+            return self.winning_player
+
+        for line in self.lines:
+            first = curr_state[line[0]]
+            if first != ' ' and all(curr_state[cell] == first for cell in line[1:]):
+                return first
+        return False
+
+    def similar_states(self, curr_state: str = None) -> Tuple[str]:
+        """
+        Returns a tuple of all the possible states that are similar to the current state (via symmetry)
+
+        :param curr_state: state of the board
+        :return: tuple of all the possible states
+        """
+        if curr_state is None:
+            curr_state = self.state
+
+        ss = [''.join(curr_state)]
+        for getter in self._getters:
+            ss.append(''.join(getter(curr_state)))
+
+        return tuple(ss)
+
+    def canonical_key(self, curr_state: Union[str, int] = None) -> int:
+        """
+        Code of the symmetry canonical form of the state, the smallest code among its similar states.
+        Codes are passed through unchanged, as they are assumed to be canonical already.
+
+        :param curr_state: state of the board
+        :return: base 3 code
+        """
+        if isinstance(curr_state, int):
+            return curr_state
+        if curr_state is None:
+            return min(self.symmetry_codes)
+        return int(min(self.similar_states(curr_state)).translate(TO_DIGITS), 3)
+
+    def decode(self, code: int) -> str:
+        """
+        String state of the board from its code
+        """
+        cells = [' ']*self.size
+        for i in range(self.size - 1, -1, -1):
+            code, digit = divmod(code, 3)
+            cells[i] = SYMBOLS[digit]
+        return ''.join(cells)
+
+    def possible_moves(self, curr_state=None):
+        """
+        List of all possible moves
+
+        :param curr_state: state of the board
+        :return: list of possible moves
+        """
+        if curr_state is None:
+            curr_state = self.state
+
+        possible_moves = [idx for idx,
+                          go in enumerate(curr_state) if go == ' ']
+
+        return possible_moves
+
+
+@lru_cache(maxsize=None)
+def mnk_board(m: int, n: int, k: int) -> type:
+    """
+    MNKBoard class with its size fixed, to pass as board_cls to ReinforcementTicTacToeLearner.
+    The same (m, n, k) always gives the same class, which pickles by name (see __getattr__).
+
+    >>> learner = ReinforcementTicTacToeLearner(n, 0.05, RandomPlayer('O'), board_cls=mnk_board(4, 4, 3))
+    """
+    def __init__(self):
+        MNKBoard.__init__(self, m, n, k)
+
+    return type(f'MNKBoard{m}x{n}k{k}', (MNKBoard,), {'__init__': __init__, '__module__': __name__})
+
+
+def __getattr__(name: str) -> type:
+    """
+    Classes of mnk_board by name, so pickle finds them in a process that has not made them yet
+    """
+    match = re.fullmatch(r'MNKBoard(\d+)x(\d+)k(\d+)', name)
+    if match is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return mnk_board(*map(int, match.groups()))
@@ -43,19 +43,13 @@ class RandomWinner(Player):
         :returns: Board after move has been made
         """
 
-        possible_moves = board.possible_moves()
-
-        for move in possible_moves:
-
-            # consider hypothetical state
-            hyp_state = board.fake_move(player=self.player, index=move)
-
-            # if we can win with this move, play that move
-            if board.winner(hyp_state) == self.player:
-                board.add_move(player=self.player, index=move)
-                return board
+        # if we can win with a move, play the first of them
+        winning_moves = board.winning_moves(self.player)
+        if winning_moves:
+            board.add_move(player=self.player, index=winning_moves[0])
+            return board
 
-        move = random.choice(possible_moves)
+        move = random.choice(board.possible_moves())
         board.add_move(player=self.player, index=move)
 
         return board
@@ -77,27 +71,18 @@ class RandomWinnerBlocker(Player):
         :returns: Board after move has been made
         """
 
-        possible_moves = board.possible_moves()
-
         # see if we can win
-        for move in possible_moves:
-            hyp_state = board.fake_move(player=self.player, index=move)
-
-            # if we can win with this move, play that move
-            if board.winner(hyp_state) == self.player:
-                board.add_move(player=self.player, index=move)
-                return board
+        winning_moves = board.winning_moves(self.player)
+        if winning_moves:
+            board.add_move(player=self.player, index=winning_moves[0])
+            return board
 
         # block if they can win
-        for move in possible_moves:
-            hyp_state = board.fake_move(
-                player=self.other_player, index=move, verify=False)
-
-            # if other player wins with this move, we block
-            if board.winner(hyp_state) == self.other_player:
-                board.add_move(player=self.player, index=move)
-                return board
+        blocking_moves = board.winning_moves(self.other_player)
+        if blocking_moves:
+            board.add_move(player=self.player, index=blocking_moves[0])
+            return board
 
-        move = random.choice(possible_moves)
+        move = random.choice(board.possible_moves())
         board.add_move(player=self.player, index=move)
         return board
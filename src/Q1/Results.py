@@ -0,0 +1,187 @@
+from typing import Iterator, List, Tuple, Union
+import json
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+
+
+RESULTS = ('w', 'd', 'l')
+CODES = {result: code for code, result in enumerate(RESULTS)}
+PROGRESS_FILE = 'progress.json'
+
+
+class ResultLog:
+    """
+    Game results as int8 codes (0 'w', 1 'd', 2 'l') and a bool played_first mask in preallocated arrays,
+    instead of a list of [result, played_first] lists.
+
+    With a directory the arrays are .npy memory maps on disk, and progress.json records how many games
+    have been written each time the log is flushed, so other processes can open it while it is written.
+    """
+
+    def __init__(self, capacity: int, directory: str = None, flush_every: int = 100_000) -> None:
+        """
+        :param capacity: maximum number of games
+        :param directory: directory to write the log to, held in memory when not given
+        :param flush_every: games between flushes when on disk
+        """
+        self.capacity = capacity
+        self.directory = directory
+        self.flush_every = flush_every
+        self.n = 0
+
+        if directory is None:
+            self._results = np.zeros(capacity, dtype=np.int8)
+            self._played_first = np.zeros(capacity, dtype=bool)
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self._results = open_memmap(os.path.join(directory, 'results.npy'), mode='w+',
+                                        dtype=np.int8, shape=(capacity,))
+            self._played_first = open_memmap(os.path.join(directory, 'played_first.npy'), mode='w+',
+                                             dtype=bool, shape=(capacity,))
+            self.flush()
+
+    @classmethod
+    def from_wld(cls, wld: List[Tuple[str, bool]], directory: str = None) -> 'ResultLog':
+        """
+        Log holding a list of tuples (result, played_first)
+        """
+        log = cls(len(wld), directory)
+        log.extend(np.array([CODES[x[0]] for x in wld], dtype=np.int8),
+                   np.array([x[1] for x in wld], dtype=bool))
+        return log
+
+    @classmethod
+    def open(cls, directory: str) -> 'ResultLog':
+        """
+        Read only log of the games flushed to directory so far
+        """
+        with open(os.path.join(directory, PROGRESS_FILE)) as f:
+            progress = json.load(f)
+
+        log = cls.__new__(cls)
+        log.capacity = progress['capacity']
+        log.directory = directory
+        log.flush_every = None
+        log.n = progress['n']
+        log._results = np.load(os.path.join(
+            directory, 'results.npy'), mmap_mode='r')
+        log._played_first = np.load(os.path.join(
+            directory, 'played_first.npy'), mmap_mode='r')
+        return log
+
+    @property
+    def results(self) -> np.ndarray:
+        return self._results[:self.n]
+
+    @property
+    def played_first(self) -> np.ndarray:
+        return self._played_first[:self.n]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __iter__(self) -> Iterator[List[Union[str, bool]]]:
+        """
+        Results as [result, played_first], like the lists returned by learn
+        """
+        for code, played_first in zip(self.results.tolist(), self.played_first.tolist()):
+            yield [RESULTS[code], played_first]
+
+    def to_wld(self) -> List[List[Union[str, bool]]]:
+        return list(self)
+
+    def append(self, result: str, played_first: bool) -> None:
+        if self.n == self.capacity:
+            raise IndexError(f'Result log is full ({self.capacity} games)')
+
+        self._results[self.n] = CODES[result]
+        self._played_first[self.n] = played_first
+        self.n += 1
+
+        if self.directory is not None and self.n % self.flush_every == 0:
+            self.flush()
+
+    def extend(self, results: np.ndarray, played_first: np.ndarray) -> None:
+        """
+        Append many games at once
+
+        :param results: int8 result codes
+        :param played_first: bool mask
+        """
+        end = self.n + len(results)
+        if end > self.capacity:
+            raise IndexError(f'Result log is full ({self.capacity} games)')
+
+        flush = self.directory is not None and \
+            end // self.flush_every > self.n // self.flush_every
+
+        self._results[self.n:end] = results
+        self._played_first[self.n:end] = played_first
+        self.n = end
+
+        if flush:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.directory is None:
+            return
+
+        self._results.flush()
+        self._played_first.flush()
+
+        path = os.path.join(self.directory, PROGRESS_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'capacity': self.capacity, 'n': self.n}, f)
+        os.replace(path + '.tmp', path)
+
+    def chunks(self, chunk_size: int = 1_000_000) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Read the log chunk_size games at a time, e.g. for plotting.plot_wld_stream
+
+        :return: iterator of (result codes, played_first)
+        """
+        for start in range(0, self.n, chunk_size):
+            end = min(start + chunk_size, self.n)
+            yield np.asarray(self._results[start:end]), np.asarray(self._played_first[start:end])
+
+    def split(self, played_first: bool = True) -> np.ndarray:
+        """
+        Result codes of the games where we did (or did not) play first
+        """
+        return self.results[self.played_first == played_first]
+
+
+def as_log(wld: Union[ResultLog, List[Tuple[str, bool]]]) -> ResultLog:
+    """
+    ResultLog of wld, which may already be one
+    """
+    if isinstance(wld, ResultLog):
+        return wld
+    return ResultLog.from_wld(wld)
+
+
+def cumulative_counts(results: np.ndarray) -> np.ndarray:
+    """
+    Running number of wins, draws and losses
+
+    :param results: result codes
+    :return: (3, len(results)) counts for w, d, l
+    """
+    return np.cumsum(results[None, :] == np.arange(3, dtype=np.int8)[:, None], axis=1)
+
+
+def rolling_rates(results: np.ndarray, window: int) -> np.ndarray:
+    """
+    Win, draw and loss rates over the last window games (fewer at the start)
+
+    :param results: result codes
+    :param window: number of games to average over
+    :return: (3, len(results)) rates for w, d, l
+    """
+    counts = cumulative_counts(results)
+    lagged = np.zeros_like(counts)
+    lagged[:, window:] = counts[:, :-window]
+
+    games = np.minimum(np.arange(1, len(results) + 1), window)
+    return (counts - lagged) / games
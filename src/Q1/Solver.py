@@ -0,0 +1,217 @@
+from Players import Player
+from StateIndex import DIGITS, POWERS, SYMBOLS, StateIndex, get_index, encode, decode, winner_digit
+from TicTacToe import TicTacToe
+
+from functools import lru_cache
+from typing import Dict, List
+import numpy as np
+import random
+
+
+EXACT, LOWER, UPPER = 0, 1, 2
+UNREACHABLE = -128
+
+
+class Solver:
+    """
+    Exact values of every position via negamax with alpha-beta pruning.
+
+    The transposition table is keyed by the symmetry canonical state (the StateIndex id, the same state as
+    sorted(similar_states)[0]) and the player to move, as either player can move first.
+    A value is from the point of view of the player to move: 0 for a draw,
+    n for a win and -n for a loss, where n - 1 is the number of empty cells left when the game ends,
+    so quicker wins (and slower losses) score higher.
+    """
+
+    def __init__(self, index: StateIndex = None) -> None:
+        self.index = get_index() if index is None else index
+        self.table = {}
+        self.canonical = self.index.table['canonical'].tolist()
+
+        # values[canonical_id, to_move - 1]
+        self.values = np.full(
+            (self.index.n_canonical, 2), UNREACHABLE, dtype=np.int8)
+
+    def negamax(self, cells: List[int], code: int, empty: int, to_move: int, alpha: int, beta: int) -> int:
+        """
+        Value of the board for the player to move, walking the tree by making and unmaking moves in cells.
+
+        :param cells: digits of the board (0 empty, 1 'O', 2 'X'), restored before returning
+        :param code: base 3 code of cells
+        :param empty: number of empty cells
+        :param to_move: digit of the player to move
+        :param alpha: lower bound of the search window
+        :param beta: upper bound of the search window
+        :return: value of the board
+        """
+        if winner_digit(cells):
+            # the player who just moved won
+            return -(empty + 1)
+        if not empty:
+            return 0
+
+        key = (self.canonical[code], to_move)
+        alpha_0 = alpha
+
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            elif flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        best = -(empty + 1)
+        for i in range(9):
+            if cells[i]:
+                continue
+
+            cells[i] = to_move
+            value = -self.negamax(cells, code + to_move*POWERS[i], empty - 1, 3 - to_move,
+                                  -beta, -alpha)
+            cells[i] = 0
+
+            if value > best:
+                best = value
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= alpha_0:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (best, flag)
+
+        return best
+
+    def value(self, state: str, to_move: str) -> int:
+        """
+        Exact value of a board for the player to move
+        """
+        cells = [DIGITS[s] for s in state]
+        return self.negamax(cells, encode(state), cells.count(0), DIGITS[to_move], -10, 10)
+
+    def solve(self) -> np.ndarray:
+        """
+        Value of every reachable canonical position, for each player that can be the one to move
+
+        :return: (n_canonical, 2) array, column 0 with 'O' to move and column 1 with 'X' to move
+        """
+        for canonical_id, code in enumerate(self.index.canonical_codes.tolist()):
+            state = decode(code)
+            n_o, n_x = state.count('O'), state.count('X')
+            winner = winner_digit([DIGITS[s] for s in state])
+
+            for to_move in (1, 2):
+                mover, other = (n_o, n_x) if to_move == 1 else (n_x, n_o)
+                # the mover can't have just moved, nor have won already
+                if mover in (other, other - 1) and winner != to_move:
+                    self.values[canonical_id, to_move -
+                                1] = self.value(state, SYMBOLS[to_move])
+
+        return self.values
+
+
+class Solution:
+    """
+    Solved values of every position, see Solver.
+    """
+
+    def __init__(self, values: np.ndarray, index: StateIndex = None) -> None:
+        self.index = get_index() if index is None else index
+        self.values = values
+
+    @classmethod
+    def solve(cls, index: StateIndex = None) -> 'Solution':
+        return cls(Solver(index).solve(), index)
+
+    @classmethod
+    def load(cls, path: str, index: StateIndex = None) -> 'Solution':
+        """
+        Memory map values written by save
+        """
+        return cls(np.load(path, mmap_mode='r'), index)
+
+    def save(self, path: str) -> None:
+        np.save(path, np.asarray(self.values))
+
+    def value(self, state: str, to_move: str) -> int:
+        """
+        Value of the board for the player to move, see Solver
+        """
+        canonical_id = self.index.canonical_id(state)
+        if canonical_id < 0:
+            raise KeyError(f'State {state!r} is not reachable')
+        return int(self.values[canonical_id, DIGITS[to_move] - 1])
+
+    def state_values(self, player: str = 'X') -> Dict[str, int]:
+        """
+        Outcome under perfect play for player of every position where the other player is to move,
+        i.e. the afterstates valued by ReinforcementTicTacToeLearner.
+        1 win, 0 draw, -1 loss, keyed by canonical state.
+
+        :param player: player the outcome is for
+        :return: canonical state -> outcome
+        """
+        other = 3 - DIGITS[player]
+        column = np.asarray(self.values[:, other - 1])
+
+        return {self.index.key_of(canonical_id): -int(np.sign(value))
+                for canonical_id, value in enumerate(column.tolist()) if value != UNREACHABLE}
+
+
+@lru_cache(maxsize=None)
+def get_solution(path: str = None) -> Solution:
+    """
+    Solution shared by the whole process, solved on first use.
+
+    :param path: optional .npy file to memory map, it is written first if it does not exist
+    """
+    if path is None:
+        return Solution.solve()
+
+    try:
+        return Solution.load(path)
+    except FileNotFoundError:
+        solution = Solution.solve()
+        solution.save(path)
+        return solution
+
+
+class PerfectPlayer(Player):
+    def __init__(self, player='O', solution: Solution = None) -> None:
+        super().__init__(player)
+        self.solution = get_solution() if solution is None else solution
+
+    def move(self, board: TicTacToe) -> TicTacToe:
+        """
+        Play the move with the best solved value, picking randomly between equally good moves.
+
+        :param board: Current board in play
+        :returns: Board after move has been made
+        """
+        possible_moves = board.possible_moves()
+        outcomes = [None]*len(possible_moves)
+
+        for idx, move in enumerate(possible_moves):
+            hyp_state = ''.join(board.fake_move(
+                player=self.player, index=move, verify=False))
+            # value for the other player, who moves next
+            outcomes[idx] = -self.solution.value(hyp_state,
+                                                 self.other_player)
+
+        best_outcome = max(outcomes)
+        best_indexes = [idx for idx, outcome in enumerate(
+            outcomes) if outcome == best_outcome]
+        move = possible_moves[random.choice(best_indexes)]
+
+        board.add_move(player=self.player, index=move)
+        return board
@@ -0,0 +1,268 @@
+from TicTacToe import DIGITS, LINES, POWERS, SYMBOLS, SYMMETRIES, TO_DIGITS, TicTacToe
+
+from functools import lru_cache
+from typing import List, Tuple, Union
+import numpy as np
+
+
+# Boards are encoded base 3 with cell 0 as the most significant digit (DIGITS, POWERS and SYMBOLS,
+# shared with TicTacToe which keeps the code of its board, as are LINES and SYMMETRIES).
+# ' ' < 'O' < 'X' both as characters and as digits, so the smallest code among the
+# symmetries of a board is the same state as sorted(similar_states)[0].
+NUM_CODES = 3**9
+
+INDEX_DTYPE = np.dtype([
+    ('position', np.int16),        # dense id of the reachable position, -1 if unreachable
+    ('canonical', np.int16),       # dense id of the symmetry canonical position, -1 if unreachable
+    ('canonical_code', np.int32),  # code of the symmetry canonical position
+    ('winner', np.int8),           # 0 no winner, 1 'O', 2 'X'
+    ('terminal', np.bool_),        # won or board full
+    ('moves', np.uint16),          # bitmask of legal moves, 0 when terminal
+])
+
+
+def encode(state: Union[str, List[str]]) -> int:
+    """
+    Encode a board as a base 3 integer
+
+    :param state: string (or list) state of board
+    :return: code of board
+    """
+    if not isinstance(state, str):
+        state = ''.join(state)
+    return int(state.translate(TO_DIGITS), 3)
+
+
+def decode(code: int) -> str:
+    """
+    Decode a base 3 integer back to a string state of board
+
+    :param code: code of board
+    :return: string state of board
+    """
+    cells = [' ']*9
+    for i in range(8, -1, -1):
+        code, digit = divmod(code, 3)
+        cells[i] = SYMBOLS[digit]
+    return ''.join(cells)
+
+
+def winner_digit(cells: List[int]) -> int:
+    for a, b, c in LINES:
+        if cells[a] and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return 0
+
+
+def _build_table() -> np.ndarray:
+    """
+    Walk every game from the empty board, with either player moving first, and tabulate each position.
+    """
+    reachable = set()
+    stack = [([0]*9, 1), ([0]*9, 2)]
+
+    while stack:
+        cells, to_move = stack.pop()
+        code = sum(d*p for d, p in zip(cells, POWERS))
+        if (code, to_move) in reachable:
+            continue
+        reachable.add((code, to_move))
+
+        if winner_digit(cells) or all(cells):
+            continue
+
+        for i in range(9):
+            if not cells[i]:
+                child = cells.copy()
+                child[i] = to_move
+                stack.append((child, 3 - to_move))
+
+    table = np.zeros(NUM_CODES, dtype=INDEX_DTYPE)
+    table['position'] = -1
+    table['canonical'] = -1
+
+    codes = sorted({code for code, _ in reachable})
+    canonical_ids = {}
+
+    for position_id, code in enumerate(codes):
+        cells = [DIGITS[s] for s in decode(code)]
+        canonical_code = min(
+            sum(cells[int(s)]*p for s, p in zip(perm, POWERS)) for perm in SYMMETRIES)
+        winner = winner_digit(cells)
+        terminal = bool(winner) or all(cells)
+
+        table['position'][code] = position_id
+        table['canonical_code'][code] = canonical_code
+        table['winner'][code] = winner
+        table['terminal'][code] = terminal
+        table['moves'][code] = 0 if terminal else sum(
+            1 << i for i in range(9) if not cells[i])
+
+    # canonical codes are themselves reachable, so number them in code order as well
+    for code in codes:
+        canonical_code = int(table['canonical_code'][code])
+        if canonical_code not in canonical_ids:
+            canonical_ids[canonical_code] = len(canonical_ids)
+        table['canonical'][code] = canonical_ids[canonical_code]
+
+    return table
+
+
+class StateIndex:
+    """
+    Build once table of every reachable board, indexed by the base 3 code of the board.
+
+    Each row holds the dense position id, the dense id of the symmetry canonical position,
+    the winner, whether the game is over and the legal moves.
+    The table is a single structured array, so it can be saved and memory mapped with numpy.
+    """
+
+    def __init__(self, table: np.ndarray) -> None:
+        if table.dtype != INDEX_DTYPE or table.shape != (NUM_CODES,):
+            raise ValueError(
+                f'Index table must have shape {(NUM_CODES,)} and dtype {INDEX_DTYPE}')
+
+        self.table = table
+
+        reachable = np.flatnonzero(table['position'] >= 0)
+        self.n_positions = len(reachable)
+        self.n_canonical = int(table['canonical'][reachable].max()) + 1
+
+        self.canonical_codes = np.empty(self.n_canonical, dtype=np.int32)
+        self.canonical_codes[table['canonical'][reachable]
+                             ] = table['canonical_code'][reachable]
+
+        self.canonical_winner = np.asarray(table['winner'][self.canonical_codes])
+        self.canonical_terminal = np.asarray(
+            table['terminal'][self.canonical_codes])
+
+        # plain python lists for the per move lookups, numpy scalar access is slow
+        self._canonical_id = table['canonical'].tolist()
+        self._canonical_keys = [decode(int(code))
+                                for code in self.canonical_codes]
+        self._outcomes = [(SYMBOLS[w] if w else False, t) for w, t in zip(
+            self.canonical_winner.tolist(), self.canonical_terminal.tolist())]
+        self._zobrist_ids = None
+        self._zobrist_keys = None
+
+    @classmethod
+    def build(cls) -> 'StateIndex':
+        return cls(_build_table())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'StateIndex':
+        """
+        Load an index written by save
+
+        :param path: path of the .npy file
+        :param mmap: memory map the file rather than reading it
+        """
+        return cls(np.load(path, mmap_mode='r' if mmap else None))
+
+    def save(self, path: str) -> None:
+        np.save(path, np.asarray(self.table))
+
+    @property
+    def zobrist_ids(self) -> dict:
+        """
+        Canonical zobrist hash (TicTacToe.zobrist_key) -> dense canonical id, built on first use
+        """
+        if self._zobrist_ids is None:
+            self._zobrist_ids = {TicTacToe.zobrist_hash(key): canonical_id
+                                 for canonical_id, key in enumerate(self._canonical_keys)}
+        return self._zobrist_ids
+
+    def canonical_id(self, state: Union[str, List[str], int]) -> int:
+        """
+        Dense id of the symmetry canonical form of state, -1 if state can not be reached
+
+        :param state: string (or list) state of board, or its canonical zobrist hash
+        """
+        if isinstance(state, int):
+            return self.zobrist_ids.get(state, -1)
+        return self._canonical_id[encode(state)]
+
+    def canonical_ids(self, codes: List[int]) -> List[int]:
+        """
+        Dense canonical ids of many boards at once, e.g. the afterstates of a move
+
+        :param codes: base 3 codes of the boards
+        :return: ids
+        :raises: ValueError if a board can not be reached, e.g. a move out of turn
+        """
+        canonical_id = self._canonical_id
+        ids = [canonical_id[code] for code in codes]
+        if ids and min(ids) < 0:
+            code = codes[ids.index(min(ids))]
+            raise ValueError(f'Board {decode(code)!r} can not be reached')
+        return ids
+
+    def canonical_key(self, state: Union[str, List[str], int]) -> str:
+        """
+        String of the symmetry canonical form of state, same as sorted(similar_states)[0]
+
+        :raises: KeyError if state can not be reached
+        """
+        canonical_id = self.canonical_id(state)
+        if canonical_id < 0:
+            raise KeyError(f'State {state!r} is not reachable')
+        return self._canonical_keys[canonical_id]
+
+    def key_of(self, canonical_id: int) -> str:
+        return self._canonical_keys[canonical_id]
+
+    def zobrist_key_of(self, canonical_id: int) -> int:
+        """
+        Canonical zobrist hash of a canonical id, the key a zobrist learner stores it under
+        """
+        if self._zobrist_keys is None:
+            self._zobrist_keys = [None]*self.n_canonical
+            for h, i in self.zobrist_ids.items():
+                self._zobrist_keys[i] = h
+        return self._zobrist_keys[canonical_id]
+
+    def outcome(self, state: Union[str, List[str], int]) -> Tuple[Union[str, bool], bool]:
+        """
+        Winner (as TicTacToe.winner) and whether the game is over for state
+
+        :raises: KeyError if state can not be reached
+        """
+        canonical_id = self.canonical_id(state)
+        if canonical_id < 0:
+            raise KeyError(f'State {state!r} is not reachable')
+        return self._outcomes[canonical_id]
+
+    def lookup(self, state: Union[str, List[str]]) -> np.void:
+        """
+        Row of the table for state
+        """
+        return self.table[encode(state)]
+
+    def winner(self, state: Union[str, List[str]]) -> Union[str, bool]:
+        """
+        Winner of state in the same form as TicTacToe.winner
+        """
+        digit = self.table['winner'][encode(state)]
+        return SYMBOLS[digit] if digit else False
+
+    def possible_moves(self, state: Union[str, List[str]]) -> List[int]:
+        moves = int(self.table['moves'][encode(state)])
+        return [i for i in range(9) if moves >> i & 1]
+
+
+@lru_cache(maxsize=None)
+def get_index(path: str = None) -> StateIndex:
+    """
+    Index shared by the whole process, built on first use.
+
+    :param path: optional .npy file to memory map, it is written first if it does not exist
+    """
+    if path is None:
+        return StateIndex.build()
+
+    try:
+        return StateIndex.load(path)
+    except FileNotFoundError:
+        index = StateIndex.build()
+        index.save(path)
+        return index
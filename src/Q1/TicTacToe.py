@@ -1,5 +1,58 @@
 from typing import List, Tuple, Union
 import copy
+import random
+
+
+# every line of three, and the lines through each cell
+LINES = (
+    # right
+    (0, 1, 2),
+    (3, 4, 5),
+    (6, 7, 8),
+    # down
+    (0, 3, 6),
+    (1, 4, 7),
+    (2, 5, 8),
+    # diag
+    (0, 4, 8),
+    (2, 4, 6)
+)
+LINES_THROUGH = tuple(tuple(idx for idx, line in enumerate(LINES) if cell in line)
+                      for cell in range(9))
+
+# base 3 code of a board, sum of DIGITS[cell] * POWERS[index], see StateIndex
+DIGITS = {' ': 0, 'O': 1, 'X': 2}
+POWERS = tuple(3**(8 - i) for i in range(9))
+SYMBOLS = ' OX'
+TO_DIGITS = str.maketrans({symbol: str(digit) for symbol, digit in DIGITS.items()})
+
+# symmetries of the board, new cell j takes old cell int(state[j])
+SYMMETRIES = (
+    '012345678',
+    '210543876',
+    '678345012',
+    '036147258',
+    '852741630',
+    '630741852',
+    '876543210',
+    '258147036'
+)
+
+
+def _zobrist_keys(seed: int = 0) -> Tuple[Tuple[dict, ...], ...]:
+    """
+    Random 64-bit key for each player on each cell, and the same keys moved by each symmetry:
+    keys[g][i][player] is the key of player on cell i after symmetry g is applied to the board.
+    """
+    rng = random.Random(seed)
+    cell_keys = [{'O': rng.getrandbits(64), 'X': rng.getrandbits(64)}
+                 for _ in range(9)]
+
+    return tuple(tuple(cell_keys[perm.index(str(i))] for i in range(9))
+                 for perm in SYMMETRIES)
+
+
+ZOBRIST = _zobrist_keys()
 
 
 class TicTacToe:
@@ -11,6 +64,14 @@ class TicTacToe:
 
         self.state = [' ']*9
         self.moves = 0
+        self.code = 0
+
+        # pieces of each player on each line, kept up to date by add_move
+        self.line_counts = {'O': [0]*8, 'X': [0]*8}
+        self.winning_player = False
+
+        # zobrist hash of the board under each symmetry, kept up to date by add_move
+        self.hashes = [0]*8
 
     def str_state(self):
 
@@ -54,6 +115,93 @@ class TicTacToe:
         self.state[index] = player
         self.moves += 1
         self.last_turn = player
+        self.code += DIGITS[player]*POWERS[index]
+
+        counts = self.line_counts[player]
+        for line in LINES_THROUGH[index]:
+            counts[line] += 1
+            if counts[line] == 3:
+                self.winning_player = player
+
+        for g, keys in enumerate(ZOBRIST):
+            self.hashes[g] ^= keys[index][player]
+
+    def zobrist_key(self) -> int:
+        """
+        Symmetry canonical zobrist hash of the board, the smallest hash among its similar states
+
+        :return: 64-bit integer key
+        """
+        return min(self.hashes)
+
+    def afterstate_key(self, player: str, index: int) -> int:
+        """
+        Symmetry canonical zobrist hash of the board after a move, without making it
+
+        :param player: player making the move
+        :param index: index of the move
+        :return: 64-bit integer key
+        """
+        return min(h ^ keys[index][player] for h, keys in zip(self.hashes, ZOBRIST))
+
+    @staticmethod
+    def zobrist_hash(curr_state: str) -> int:
+        """
+        Symmetry canonical zobrist hash of any state of the board
+
+        :param curr_state: state of the board
+        :return: 64-bit integer key
+        """
+        hashes = [0]*8
+        for index, go in enumerate(curr_state):
+            if go != ' ':
+                for g, keys in enumerate(ZOBRIST):
+                    hashes[g] ^= keys[index][go]
+        return min(hashes)
+
+    def wins_with(self, player: str, index: int) -> bool:
+        """
+        Would player win by playing at index, without copying the board
+
+        :param player: player making the move
+        :param index: index of the move, assumed to be empty
+        :return: True if the move completes a line
+        """
+        counts = self.line_counts[player]
+        for line in LINES_THROUGH[index]:
+            if counts[line] == 2:
+                return True
+        return False
+
+    def winning_moves(self, player: str) -> List[int]:
+        """
+        Every empty cell where player would win, in cell order
+
+        :param player: player making the move
+        """
+        counts = self.line_counts[player]
+        return [move for move in self.possible_moves()
+                if any(counts[line] == 2 for line in LINES_THROUGH[move])]
+
+    def afterstate_ids(self, player: str, index) -> Tuple[List[int], List[int]]:
+        """
+        Every legal move and the canonical id of the board after it, from the code of the board
+        without copying it
+
+        :param player: player making the move
+        :param index: StateIndex to take ids from
+        :return: moves, ids
+        """
+        moves = self.possible_moves()
+        code, digit = self.code, DIGITS[player]
+        return moves, index.canonical_ids([code + digit*POWERS[move] for move in moves])
+
+    @property
+    def terminal(self) -> bool:
+        """
+        True if the game has been won or the board is full
+        """
+        return bool(self.winning_player) or self.moves == 9
 
     def fake_move(self, player: str, index: int, verify: bool = True) -> List[str]:
         """
@@ -119,21 +267,7 @@ class TicTacToe:
 
             return True
 
-        combs = [
-            # right
-            [0, 1, 2],
-            [3, 4, 5],
-            [6, 7, 8],
-            # down
-            [0, 3, 6],
-            [1, 4, 7],
-            [2, 5, 8],
-            # diag
-            [0, 4, 8],
-            [2, 4, 6]
-        ]
-
-        for comb in combs:
+        for comb in LINES:
             res = check_pos(pos=comb, curr_state=curr_state)
             if res:
                 # winner in this combination, return player who is in that position
@@ -141,13 +275,14 @@ class TicTacToe:
         return False
 
     def winner(self, curr_state=None):
+        """
+        Player who won, False if no winner.
+        The current board is tracked by add_move, any other state is checked in full.
 
+        :param curr_state: state of the board
+        """
         if curr_state is None:
-            if self.moves < 5:
-                # too little moves to have a winner
-                return False
-
-            curr_state = self.state
+            return self.winning_player
 
         return self._winner(curr_state)
 
@@ -163,18 +298,8 @@ class TicTacToe:
             curr_state = self.state
 
         ss = [''.join(curr_state)]
-        states = [
-            '012345678',
-            '210543876',
-            '678345012',
-            '036147258',
-            '852741630',
-            '630741852',
-            '876543210',
-            '258147036'
-        ]
-
-        for state in states:
+
+        for state in SYMMETRIES:
             new_state = [curr_state[int(s)] for s in state]
             ss.append(''.join(new_state))
 
@@ -0,0 +1,255 @@
+from Arena import MatchResult, MatchScheduler, Policy
+from Checkpoint import load_learner
+from Players import RandomPlayer, RandomWinner, RandomWinnerBlocker
+from TicTacToe import TicTacToe
+
+from statistics import NormalDist
+from typing import AsyncIterator, Dict, List, Tuple
+import asyncio
+import math
+import numpy as np
+
+
+PLAYERS = (RandomPlayer, RandomWinner, RandomWinnerBlocker)
+# points for the first player of a MatchResult
+SCORES = {'w': 1.0, 'd': 0.5, 'l': 0.0}
+ELO = 400 / math.log(10)
+
+
+def entrants(learners: dict = None, checkpoints: List[str] = None, players=PLAYERS) -> List[Policy]:
+    """
+    Policies for a tournament: the Players, trained learners and checkpointed learners
+
+    :param learners: name -> trained ReinforcementTicTacToeLearner
+    :param checkpoints: paths of checkpoints, named by their path
+    :param players: Player classes, named by their class
+    """
+    policies = [Policy(player.__name__, player) for player in players]
+    for name, learner in (learners or {}).items():
+        policies.append(Policy.from_learner(learner, name))
+    for path in checkpoints or []:
+        policies.append(Policy.from_learner(load_learner(path, evaluate=True), path))
+    return policies
+
+
+class Pairing:
+    """
+    Running score of two policies over games in both seat orders, scored for a
+    """
+
+    def __init__(self, a: Policy, b: Policy) -> None:
+        self.a = a
+        self.b = b
+        self.games = 0
+        self.score = 0.0
+        self.sum_squares = 0.0
+        # a's results by whether a played first
+        self.wld = {True: {'w': 0, 'd': 0, 'l': 0}, False: {'w': 0, 'd': 0, 'l': 0}}
+        self.settled = None
+
+    def add(self, result: MatchResult) -> None:
+        a_first = result.first == self.a.name
+        score = SCORES[result.result] if a_first else 1 - SCORES[result.result]
+        self.games += 1
+        self.score += score
+        self.sum_squares += score * score
+        self.wld[a_first]['wdl'[int(2 - 2*score)]] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.score / self.games if self.games else 0.5
+
+    def half_width(self, z: float) -> float:
+        """
+        z standard errors of the mean score
+        """
+        if self.games < 2:
+            return math.inf
+        variance = (self.sum_squares - self.games * self.mean**2) / (self.games - 1)
+        return z * math.sqrt(max(variance, 0.0) / self.games)
+
+
+class Tournament:
+    """
+    Round robin between policies, each pairing played in both seat orders until its result is settled.
+
+    Games are played in rounds of check_every games of every pairing still open, all rounds' games concurrently
+    through one MatchScheduler. After each round a pairing is settled once it has min_games and its confidence
+    interval of mean score excludes an even result ('decisive'), or is narrower than margin either side ('even'),
+    or it reaches max_games ('capped'). The interval is Bonferroni corrected for the number of looks, so
+    confidence holds for the whole sequence of checks rather than each one.
+    """
+
+    def __init__(self, policies: List[Policy], confidence: float = 0.95, margin: float = 0.05,
+                 min_games: int = 40, max_games: int = 2000, check_every: int = 40, concurrency: int = 4096,
+                 board_cls: type = TicTacToe) -> None:
+        """
+        :param policies: policies to play, names must be unique
+        :param confidence: confidence of each pairing's stopping decision
+        :param margin: half width of mean score below which a pairing is settled as even
+        :param min_games: fewest games of a pairing before it can be settled
+        :param max_games: most games of a pairing
+        :param check_every: games of each open pairing per round, half in each seat order
+        :param concurrency: most games in flight at once
+        :param board_cls: board class to play on
+        """
+        names = [policy.name for policy in policies]
+        if len(set(names)) != len(names):
+            raise ValueError(f'Policy names must be unique, got {names}')
+
+        self.policies = policies
+        self.pairings = {(a.name, b.name): Pairing(a, b)
+                         for i, a in enumerate(policies) for b in policies[i + 1:]}
+        self.margin = margin
+        self.min_games = min_games
+        self.max_games = max_games
+        self.check_every = max(2, check_every - check_every % 2)
+        self.scheduler = MatchScheduler(concurrency, board_cls=board_cls)
+
+        looks = math.ceil(max(max_games - min_games, 0) / self.check_every) + 1
+        self.z = NormalDist().inv_cdf(1 - (1 - confidence) / (2 * looks))
+
+    @property
+    def games_played(self) -> int:
+        return sum(pairing.games for pairing in self.pairings.values())
+
+    @property
+    def games_saved(self) -> int:
+        """
+        Games a fixed max_games per pairing would have played on top
+        """
+        return self.max_games * len(self.pairings) - self.games_played
+
+    def open_pairings(self) -> List[Pairing]:
+        return [pairing for pairing in self.pairings.values() if pairing.settled is None]
+
+    def _round(self, open_pairings: List[Pairing]) -> List[Tuple[Policy, Policy]]:
+        matches = []
+        for pairing in open_pairings:
+            games = min(self.check_every, self.max_games - pairing.games)
+            # alternate seats, a leads the odd game of an odd round
+            for game in range(games):
+                matches.append((pairing.a, pairing.b) if game % 2 == 0 else (pairing.b, pairing.a))
+        return matches
+
+    def _settle(self, pairing: Pairing) -> None:
+        if pairing.games < min(self.min_games, self.max_games):
+            return
+
+        half_width = pairing.half_width(self.z)
+        if abs(pairing.mean - 0.5) > half_width:
+            pairing.settled = 'decisive'
+        elif half_width < self.margin:
+            pairing.settled = 'even'
+        elif pairing.games >= self.max_games:
+            pairing.settled = 'capped'
+
+    def _pairing(self, result: MatchResult) -> Pairing:
+        return self.pairings.get((result.first, result.second)) or self.pairings[(result.second, result.first)]
+
+    async def stream(self) -> AsyncIterator[MatchResult]:
+        """
+        Play rounds until every pairing is settled, yielding results as games finish
+        """
+        open_pairings = self.open_pairings()
+        while open_pairings:
+            async for result in self.scheduler.stream(self._round(open_pairings)):
+                self._pairing(result).add(result)
+                yield result
+
+            for pairing in open_pairings:
+                self._settle(pairing)
+            open_pairings = self.open_pairings()
+
+    def run(self) -> Dict[str, dict]:
+        """
+        Play the tournament to completion
+
+        :return: ratings, see ratings
+        """
+        async def play():
+            async for _ in self.stream():
+                pass
+
+        asyncio.run(play())
+        return self.ratings()
+
+    def ratings(self, anchor: str = None, prior: float = 1.0, confidence: float = 0.95) -> Dict[str, dict]:
+        """
+        Bradley-Terry ratings on the Elo scale, fit to every game played (draws count half a win each way)
+
+        :param anchor: name of the policy rated 0, defaults to a mean rating of 0
+        :param prior: virtual drawn games added to every pairing, keeps ratings finite for unbeaten policies
+        :param confidence: confidence of the rating intervals
+        :return: name -> elo, low and high of its confidence interval, and games played
+        """
+        names = [policy.name for policy in self.policies]
+        position = {name: i for i, name in enumerate(names)}
+        n = len(names)
+
+        games = np.zeros((n, n))
+        wins = np.zeros((n, n))
+        for (a, b), pairing in self.pairings.items():
+            i, j = position[a], position[b]
+            games[i, j] = games[j, i] = pairing.games + prior
+            wins[i, j] = pairing.score + prior / 2
+            wins[j, i] = pairing.games - pairing.score + prior / 2
+
+        theta = bradley_terry(wins, games)
+        p = 1 / (1 + np.exp(theta[np.newaxis, :] - theta[:, np.newaxis]))
+        weights = games * p * p.T
+        information = np.diag(weights.sum(axis=1)) - weights
+        # ratings are only defined up to a shift, pinv takes the covariance of mean zero ratings
+        covariance = np.linalg.pinv(information)
+
+        if anchor is not None:
+            k = position[anchor]
+            theta = theta - theta[k]
+            # variance of theta_i - theta_k
+            variance = np.diag(covariance) + covariance[k, k] - 2 * covariance[:, k]
+        else:
+            variance = np.diag(covariance)
+
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        ratings = {}
+        for name, i in position.items():
+            half_width = z * math.sqrt(max(variance[i], 0.0)) * ELO
+            ratings[name] = {'elo': theta[i] * ELO, 'low': theta[i] * ELO - half_width,
+                             'high': theta[i] * ELO + half_width, 'games': int(games[i].sum() - prior * (n - 1))}
+        return ratings
+
+    def table(self, **kwargs) -> str:
+        """
+        Ratings, best first, and each pairing's result, as text
+        """
+        ratings = self.ratings(**kwargs)
+        width = max(len(name) for name in ratings)
+        lines = [f"{name:{width}s} {row['elo']:8.1f} [{row['low']:8.1f}, {row['high']:8.1f}] {row['games']:7d}"
+                 for name, row in sorted(ratings.items(), key=lambda item: -item[1]['elo'])]
+        lines.append('')
+        for (a, b), pairing in self.pairings.items():
+            lines.append(f'{a:{width}s} v {b:{width}s} {pairing.mean:.3f} '
+                         f'+-{pairing.half_width(self.z):.3f} {pairing.games:6d} {pairing.settled}')
+        return '\n'.join(lines)
+
+
+def bradley_terry(wins: np.ndarray, games: np.ndarray, iterations: int = 1000, tol: float = 1e-10) -> np.ndarray:
+    """
+    Maximum likelihood Bradley-Terry strengths, by the MM algorithm (Hunter 2004)
+
+    :param wins: wins[i, j] is the number of games i won against j
+    :param games: games[i, j] is the number of games between i and j, symmetric
+    :return: log strengths, mean 0
+    """
+    total_wins = wins.sum(axis=1)
+    strength = np.ones(len(wins))
+    for _ in range(iterations):
+        new = total_wins / (games / (strength[:, np.newaxis] + strength[np.newaxis, :])).sum(axis=1)
+        new /= np.exp(np.log(new).mean())
+        if np.abs(new - strength).max() < tol:
+            strength = new
+            break
+        strength = new
+
+    theta = np.log(strength)
+    return theta - theta.mean()
@@ -0,0 +1,140 @@
+from Instrumentation import states_seen
+from Learners import StateDictX
+from Results import ResultLog
+
+from typing import Dict, Sequence
+import numpy as np
+
+
+def value_snapshot(state_dict):
+    """
+    Copy of the rewards and times seen in a value table, to measure how far they move
+    """
+    if isinstance(state_dict, StateDictX):
+        return {key: tuple(entry) for key, entry in state_dict.items()}
+    return state_dict.values.copy(), state_dict.counts.copy()
+
+
+def value_change(before, state_dict) -> float:
+    """
+    Mean absolute change of reward since the snapshot before, over the states backed up at least once.
+    States first backed up since the snapshot count their change from the default reward.
+    """
+    if isinstance(state_dict, StateDictX):
+        initial = StateDictX(board=state_dict.board)
+        changes = []
+        for key, (reward, seen_num) in state_dict.items():
+            if not seen_num:
+                continue
+            if key not in before:
+                initial.load_state(state=key)
+            changes.append(abs(reward - (before[key] if key in before else initial[key])[0]))
+        return sum(changes) / len(changes) if changes else 0.0
+
+    values, _ = before
+    seen = state_dict.counts > 0
+    return float(np.abs(state_dict.values - values)[seen].mean()) if seen.any() else 0.0
+
+
+class ConvergenceDriver:
+    """
+    Learns in windows of games until the learner stops improving, rather than for a fixed n.
+
+    After each window it measures the mean change of reward over the states seen, the number of
+    states seen for the first time, and the change in win rate from the previous window. A window is
+    quiet when all three are within tolerance, the win rate's in standard errors of the difference
+    so window to window noise does not count as change. After patience quiet windows in a row the driver
+    moves to the next epsilon of the schedule, or stops when it is on the last one.
+
+    A constant step size (alpha) keeps the rewards moving by a noise floor that never shrinks,
+    value_tol has to sit above it.
+    """
+
+    def __init__(self, learner, window: int = 1000, max_games: int = 1_000_000, epsilons: Sequence[float] = None,
+                 value_tol: float = 2e-3, new_states_tol: int = 2, win_rate_z: float = 2.0,
+                 patience: int = 3) -> None:
+        """
+        :param learner: ReinforcementTicTacToeLearner or BatchTicTacToeLearner, its n is set to each window
+        :param window: games between checks
+        :param max_games: most games to learn over
+        :param epsilons: decreasing exploration rates to move through, defaults to the learner's epsilon only
+        :param value_tol: largest mean reward change of a quiet window
+        :param new_states_tol: most new states of a quiet window
+        :param win_rate_z: largest change in win rate of a quiet window, in standard errors
+        :param patience: quiet windows in a row before moving on
+        """
+        self.learner = learner
+        self.window = window
+        self.max_games = max_games
+        self.epsilons = list(epsilons) if epsilons is not None else [learner.epsilon]
+        self.value_tol = value_tol
+        self.new_states_tol = new_states_tol
+        self.win_rate_z = win_rate_z
+        self.patience = patience
+
+    def quiet(self, change: float, new_states: int, win_rate: float, last_win_rate: float, games: int) -> bool:
+        if last_win_rate is None or change > self.value_tol or new_states > self.new_states_tol:
+            return False
+
+        pooled = (win_rate + last_win_rate) / 2
+        standard_error = np.sqrt(2 * pooled * (1 - pooled) / games)
+        return abs(win_rate - last_win_rate) <= self.win_rate_z * standard_error
+
+    def learn(self) -> Dict[str, np.ndarray]:
+        """
+        Learn until converged on the last epsilon, or max_games
+
+        :return: learning curve, one row per window: games (learned so far), epsilon, w/d/l rates,
+            value_change, new_states and states_seen; with converged, stopped_at (games) and
+            epsilon_changes (games at which epsilon moved down)
+        """
+        learner = self.learner
+        n = learner.n
+        stage = 0
+        streak = 0
+        games = 0
+        last_win_rate = None
+        epsilon_changes = []
+        curve = {name: [] for name in ('games', 'epsilon', 'w', 'd', 'l', 'value_change', 'new_states',
+                                       'states_seen')}
+
+        learner.epsilon = self.epsilons[stage]
+        seen = states_seen(learner.state_dict)
+        converged = False
+        try:
+            while games < self.max_games:
+                learner.n = min(self.window, self.max_games - games)
+                before = value_snapshot(learner.state_dict)
+                log = learner.learn(recorder=ResultLog(learner.n))
+                games += learner.n
+
+                rates = np.bincount(log.results, minlength=3) / learner.n
+                change = value_change(before, learner.state_dict)
+                now_seen = states_seen(learner.state_dict)
+                new_states = now_seen - seen
+                seen = now_seen
+
+                for name, value in zip(curve, (games, learner.epsilon, *rates, change, new_states, seen)):
+                    curve[name].append(value)
+
+                streak = streak + 1 if self.quiet(change, new_states, rates[0], last_win_rate, learner.n) else 0
+                last_win_rate = rates[0]
+                if streak < self.patience:
+                    continue
+
+                if stage == len(self.epsilons) - 1:
+                    converged = True
+                    break
+
+                stage += 1
+                streak = 0
+                # the win rate moves with epsilon, compare only within a stage
+                last_win_rate = None
+                learner.epsilon = self.epsilons[stage]
+                epsilon_changes.append(games)
+        finally:
+            learner.n = n
+
+        summary = {name: np.array(values) for name, values in curve.items()}
+        summary.update(converged=converged, stopped_at=games, epsilon_changes=np.array(epsilon_changes, dtype=int))
+        return summary
@@ -0,0 +1,33 @@
+from TicTacToe import TicTacToe
+
+import random
+import numpy as np
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    random.seed(0)
+    np.random.seed(0)
+
+
+@pytest.fixture
+def random_boards():
+    """
+    Boards part way through n random games, either player moving first, with a move left to make
+    """
+    def make(n: int, board_cls: type = TicTacToe) -> list:
+        boards = []
+        while len(boards) < n:
+            board = board_cls()
+            player = random.choice('XO')
+            for _ in range(random.randint(0, 8)):
+                board.add_move(player, random.choice(board.possible_moves()))
+                player = 'O' if player == 'X' else 'X'
+                if board.terminal:
+                    break
+            if not board.terminal:
+                boards.append(board)
+        return boards
+
+    return make
@@ -1,47 +1,57 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import Tuple
+from typing import Iterable, List, Tuple, Union
 
+from shared import streamplot
 
-def parse_wld(wld: list, played_first: bool = True) -> Tuple[list, float]:
+from Results import RESULTS, ResultLog, as_log, cumulative_counts, rolling_rates
+
+
+def parse_wld(wld: Union[list, ResultLog], played_first: bool = True) -> Tuple[np.ndarray, float]:
     """
     Parse the wld list to get the win percentage for a given player
 
-    :param wld: list of tuples (result, played_first)
-    :param played_first: player to get win percentage for  
+    :param wld: list of tuples (result, played_first), or a ResultLog
+    :param played_first: player to get win percentage for
 
-    :return: list of results for given player, win percentage
+    :return: result codes (0 'w', 1 'd', 2 'l') for given player, win percentage
     """
-    turn_wld = [x[0] for x in wld if x[1] is played_first]
-    win_pct = 100 * \
-        np.sum([1 if x == 'w' else 0 for x in turn_wld]) / len(turn_wld)
+    turn_wld = as_log(wld).split(played_first)
+    win_pct = 100 * np.count_nonzero(turn_wld == 0) / len(turn_wld)
 
     return turn_wld, win_pct
 
 
-def plot_wld(wld: list) -> Tuple[plt.Figure, plt.Axes]:
+def plot_wld(wld: Union[List[Tuple[str, bool]], ResultLog], window: int = None,
+             budget: int = None) -> Tuple[plt.Figure, plt.Axes]:
     """
     Plot the win/loss/draw results for both players
 
-    
-    :param wld: list of tuples (result, played_first)
+
+    :param wld: list of tuples (result, played_first), or a ResultLog
+    :param window: plot rates over the last window games, rather than cumulative counts
+    :param budget: decimate each line to about this many points, see plot_wld_stream
 
     :return: figure, axes
     """
+    if budget is not None:
+        return plot_wld_stream(as_log(wld).chunks(), window=window, budget=budget)
+
     def subplot(wld_arr, ax):
 
-        ws = np.cumsum([1 if x == 'w' else 0 for x in wld_arr])
-        ds = np.cumsum([1 if x == 'l' else 0 for x in wld_arr])
-        ls = np.cumsum([1 if x == 'd' else 0 for x in wld_arr])
+        if window is None:
+            lines = cumulative_counts(wld_arr)
+        else:
+            lines = rolling_rates(wld_arr, window)
 
-        ax.plot(ws, label='w')
-        ax.plot(ds, label='d')
-        ax.plot(ls, label='l')
+        for result, line in zip(RESULTS, lines):
+            ax.plot(line, label=result)
 
         return ax
 
-    first_wld, first_win_pct = parse_wld(wld, played_first=True)
-    second_wld, second_win_pct = parse_wld(wld, played_first=False)
+    log = as_log(wld)
+    first_wld, first_win_pct = parse_wld(log, played_first=True)
+    second_wld, second_win_pct = parse_wld(log, played_first=False)
 
     fig, axs = plt.subplots(1, 2, sharey=True)
 
@@ -55,3 +65,40 @@ def plot_wld(wld: list) -> Tuple[plt.Figure, plt.Axes]:
     plt.legend()
 
     return fig, axs
+
+
+def plot_wld_stream(chunks: Iterable[Tuple[np.ndarray, np.ndarray]], window: int = None,
+                    budget: int = 2000) -> Tuple[plt.Figure, plt.Axes]:
+    """
+    plot_wld for runs too long to hold or draw in full.
+    Results are consumed a chunk at a time, only running counts and the last window results are kept,
+    and each line is min/max decimated to budget buckets before it is drawn.
+
+    >>> fig, axs = plot_wld_stream(ResultLog.open(directory).chunks())
+
+    :param chunks: iterable of (result codes, played_first), e.g. ResultLog.chunks
+    :param window: plot rates over the last window games, rather than cumulative counts
+    :param budget: number of buckets each line is reduced to
+
+    :return: figure, axes
+    """
+    counts = {played_first: streamplot.RunningCounts(len(RESULTS), window) for played_first in (True, False)}
+    lines = {played_first: [streamplot.MinMaxDecimator(budget) for _ in RESULTS] for played_first in (True, False)}
+
+    for results, played_first in chunks:
+        for side in (True, False):
+            cumulative, rates = counts[side].update(results[played_first == side])
+            for decimator, line in zip(lines[side], cumulative if window is None else rates):
+                decimator.update(line)
+
+    fig, axs = plt.subplots(1, 2, sharey=True)
+
+    for ax, side, title in zip(axs, (True, False), ('Played First', 'Played Second')):
+        streamplot.plot_decimated(ax, lines[side], RESULTS)
+        totals = counts[side].totals
+        ax.set_title(f'{title} - {100 * totals[0] / totals.sum():.2f}%')
+
+    axs[0].set_xlabel('Games')
+    plt.legend()
+
+    return fig, axs
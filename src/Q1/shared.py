@@ -0,0 +1 @@
+../shared.py
\ No newline at end of file
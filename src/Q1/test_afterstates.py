@@ -0,0 +1,53 @@
+from BitBoard import BitTicTacToe
+from Learners import LearnerPlayer, ReinforcementTicTacToeLearner, StateArrayX, StateDictX
+from Players import RandomPlayer
+from StateIndex import encode, get_index
+from TicTacToe import TicTacToe
+
+import pytest
+
+
+def to_move(board) -> str:
+    return 'O' if board.last_turn == 'X' else 'X'
+
+
+def test_canonical_ids_rejects_unreachable_boards():
+    index = get_index()
+    assert index.canonical_ids([]) == []
+    with pytest.raises(ValueError):
+        index.canonical_ids([encode('X        '), encode('XX       ')])
+
+
+@pytest.mark.parametrize('board_cls', [TicTacToe, BitTicTacToe])
+def test_afterstate_ids_rejects_moves_out_of_turn(board_cls):
+    board = board_cls()
+    board.add_move('X', 4)
+    with pytest.raises(ValueError):
+        board.afterstate_ids('X', get_index())
+    with pytest.raises(ValueError):
+        StateArrayX().score_afterstates(board, 'X')
+
+
+@pytest.mark.parametrize('board_cls', [TicTacToe, BitTicTacToe])
+def test_move_many_rejects_moves_out_of_turn(board_cls):
+    learner = ReinforcementTicTacToeLearner(0, 0, RandomPlayer(player='O'), state_dict=StateArrayX())
+    board = board_cls()
+    board.add_move('X', 4)
+
+    with pytest.raises(ValueError):
+        LearnerPlayer(learner, player='X').move_many([board_cls(), board])
+    # nothing is moved when one board is bad
+    assert board.str_state() == '    X    '
+
+
+@pytest.mark.parametrize('table', [StateDictX, StateArrayX])
+@pytest.mark.parametrize('board_cls', [TicTacToe, BitTicTacToe])
+def test_score_afterstates_matches_each_move(table, board_cls, random_boards):
+    state_dict = table()
+    for board in random_boards(200, board_cls=board_cls):
+        player = to_move(board)
+        moves, rewards = state_dict.score_afterstates(board, player)
+
+        assert moves == board.possible_moves()
+        assert list(rewards) == [state_dict.get_reward(''.join(board.fake_move(player, move)))
+                                 for move in moves]
@@ -0,0 +1,70 @@
+from Arena import MatchScheduler, Policy, round_robin
+from Learners import ReinforcementTicTacToeLearner, StateArrayX
+from Players import RandomPlayer, RandomWinnerBlocker
+from TicTacToe import TicTacToe
+
+from collections import Counter
+import asyncio
+import pytest
+
+
+@pytest.fixture(scope='module')
+def learner():
+    learner = ReinforcementTicTacToeLearner(500, 0.1, RandomWinnerBlocker(player='O'), state_dict=StateArrayX())
+    learner.learn()
+    return learner
+
+
+def test_round_robin_pairs_every_seat_order():
+    policies = [Policy(name, RandomPlayer) for name in 'abc']
+    pairings = [(first.name, second.name) for first, second in round_robin(policies, 2)]
+
+    assert len(pairings) == 12
+    assert set(Counter(pairings).values()) == {2}
+    assert all(first != second for first, second in pairings)
+
+
+def test_run_plays_every_match():
+    policies = [Policy('random', RandomPlayer), Policy('blocker', RandomWinnerBlocker)]
+    seen = []
+    results = MatchScheduler(concurrency=16).run(round_robin(policies, 50), on_result=seen.append)
+
+    assert results == seen
+    assert Counter((r.first, r.second) for r in results) == {('random', 'blocker'): 50, ('blocker', 'random'): 50}
+    assert all(r.result in 'wdl' and 5 <= r.moves <= 9 for r in results)
+
+    # the blocker takes wins and blocks, so beats the random player from either seat
+    wins = sum((r.first == 'blocker') == (r.result == 'w') for r in results if r.result != 'd')
+    assert wins > (len(results) - wins) * 2
+
+
+def test_learner_moves_are_batched(learner):
+    policy = Policy.from_learner(learner, name='learner')
+    results = MatchScheduler(concurrency=64).run([(policy, Policy('random', RandomPlayer))]*200)
+
+    assert len(results) == 200
+    assert policy.requests == sum((r.moves + 1) // 2 for r in results)
+    assert policy.mean_batch > 1
+
+
+def test_max_batch_caps_batches(learner):
+    policy = Policy.from_learner(learner, max_batch=4)
+    MatchScheduler(concurrency=32).run([(policy, policy)]*32)
+    assert 1 < policy.mean_batch <= 4
+
+
+def test_bad_board_fails_only_its_game(learner):
+    policy = Policy.from_learner(learner)
+
+    finished = TicTacToe()
+    for move, player in zip((0, 3, 1, 4, 2), 'XOXOX'):
+        finished.add_move(player, move)
+
+    async def move_both():
+        boards = [TicTacToe(), finished]
+        return await asyncio.gather(*(policy.move(board, 'X') for board in boards), return_exceptions=True)
+
+    fresh, error = asyncio.run(move_both())
+    assert isinstance(error, ValueError)
+    assert fresh.moves == 1
+    assert policy.batches == 1 and policy.requests == 2
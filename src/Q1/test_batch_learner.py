@@ -0,0 +1,83 @@
+from BatchLearner import BatchTicTacToeLearner, code_winners
+from Learners import ReinforcementTicTacToeLearner, StateArrayX
+from Players import RandomWinner, RandomWinnerBlocker
+from StateIndex import DIGITS, NUM_CODES, decode, get_index
+from TicTacToe import LINES
+
+import copy
+import random
+import numpy as np
+import pytest
+
+
+def arrays(boards: list):
+    codes = np.array([board.code for board in boards])
+    legal = np.array([[cell == ' ' for cell in board.str_state()] for board in boards])
+    return codes, legal
+
+
+def test_code_winners_cover_every_code():
+    winners = code_winners()
+    for code in range(NUM_CODES):
+        state = decode(code)
+        won = {state[a] for a, b, c in LINES if state[a] != ' ' and state[a] == state[b] == state[c]}
+        # boards where both players have a line can not be played to, either winner will do
+        assert winners[code] in {DIGITS[symbol] for symbol in won} or (not won and winners[code] == 0)
+
+
+def test_batch_opponents_match_players(random_boards):
+    boards = [board for board in random_boards(1000) if board.last_turn != 'O']
+    codes, legal = arrays(boards)
+
+    for name, player_cls in (('winner', RandomWinner), ('blocker', RandomWinnerBlocker)):
+        # the batch opponent plays O against a learner playing X
+        batch = BatchTicTacToeLearner(0, 0.1, name, player='X', seed=0)
+        moves = batch.opponent_moves(codes, legal)
+
+        for board, move in zip(boards, moves.tolist()):
+            assert board.state[move] == ' '
+            forced = board.winning_moves('O') or (name == 'blocker' and board.winning_moves('X'))
+            if forced:
+                played = player_cls(player='O').move(copy.deepcopy(board))
+                assert played.state[move] == 'O'
+
+
+def test_batch_greedy_moves_are_best_moves(random_boards):
+    learner = ReinforcementTicTacToeLearner(2000, 0.1, RandomWinnerBlocker(player='O'), state_dict=StateArrayX())
+    learner.learn()
+    batch = BatchTicTacToeLearner(0, 0.1, 'blocker', state_dict=learner.state_dict, seed=0)
+
+    boards = [board for board in random_boards(1000) if board.last_turn != 'X']
+    codes, legal = arrays(boards)
+
+    for board, move in zip(boards, batch.greedy_moves(codes, legal).tolist()):
+        moves, outcomes = learner.state_dict.score_afterstates(board, 'X')
+        assert outcomes[moves.index(move)] == max(outcomes)
+
+
+def test_batch_learn_results():
+    batch = BatchTicTacToeLearner(500, 0.1, 'blocker', seed=0)
+    wld = batch.learn()
+
+    assert len(wld) == 500 and batch.games_played == 500
+    assert {result for result, _ in wld} <= {'w', 'd', 'l'}
+    # states never backed up keep their default reward
+    unseen = batch.state_dict.counts == 0
+    assert not unseen.all()
+    assert np.array_equal(batch.state_dict.values[unseen], StateArrayX().values[unseen])
+
+
+@pytest.mark.parametrize('opponent', [RandomWinner, RandomWinnerBlocker])
+def test_batch_learner_reaches_scalar_win_rates(opponent):
+    games = 5000
+    random.seed(2)
+    scalar = ReinforcementTicTacToeLearner(games, 0.1, opponent(player='O'), state_dict=StateArrayX())
+    batch = BatchTicTacToeLearner(games, 0.1, opponent(player='O'), batch_size=64, seed=2)
+
+    rates = []
+    for learner in (scalar, batch):
+        learner.learn()
+        wld = learner.play_n_games(2000)
+        rates.append(np.mean([result == 'w' for result, _ in wld]))
+
+    assert abs(rates[0] - rates[1]) < 0.08
@@ -0,0 +1,59 @@
+from BitBoard import BitTicTacToe
+from Learners import ReinforcementTicTacToeLearner
+from Players import RandomWinnerBlocker
+from StateIndex import get_index
+from TicTacToe import TicTacToe
+
+import random
+
+
+def test_bitboard_matches_tictactoe():
+    index = get_index()
+    for _ in range(300):
+        board, bits = TicTacToe(), BitTicTacToe()
+        player = random.choice('XO')
+        while True:
+            assert bits.str_state() == board.str_state()
+            assert bits.code == board.code
+            assert bits.winner() == board.winner()
+            assert bits.game_over() == board.game_over()
+            assert bits.terminal == board.terminal
+            assert bits.possible_moves() == board.possible_moves()
+            assert sorted(bits.similar_states()) == sorted(board.similar_states())
+            if board.terminal:
+                break
+
+            assert bits.winning_moves(player) == board.winning_moves(player)
+            assert bits.afterstate_ids(player, index) == board.afterstate_ids(player, index)
+            for move in board.possible_moves():
+                assert ''.join(bits.fake_move(player, move)) == ''.join(board.fake_move(player, move))
+                assert bits.wins_with(player, move) == board.wins_with(player, move)
+
+            move = random.choice(board.possible_moves())
+            board.add_move(player, move)
+            bits.add_move(player, move)
+            player = 'O' if player == 'X' else 'X'
+
+
+def test_winner_of_any_state():
+    for state in ('XXX OO   ', 'O  O  O X', 'X O X O X', '  X X X O', 'XOXXOOOXX', '         '):
+        assert BitTicTacToe._winner(state) == TicTacToe._winner(state)
+
+
+def test_unmake_move_restores_board(random_boards):
+    for board in random_boards(200, BitTicTacToe):
+        state, code = board.str_state(), board.code
+        player = 'O' if board.last_turn == 'X' else 'X'
+        move = random.choice(board.possible_moves())
+        board.make_move(player, move)
+        board.unmake_move(move)
+        assert (board.str_state(), board.code, board.winner()) == (state, code, False)
+
+
+def test_learner_plays_the_same_games_on_bitboards():
+    def run(board_cls):
+        random.seed(1)
+        learner = ReinforcementTicTacToeLearner(1000, 0.1, RandomWinnerBlocker(player='O'), board_cls=board_cls)
+        return learner.learn(), learner.play_n_games(200)
+
+    assert run(BitTicTacToe) == run(TicTacToe)
@@ -0,0 +1,96 @@
+from BatchLearner import BatchTicTacToeLearner
+from Checkpoint import load_learner, save_checkpoint
+from Learners import DecayingStep, ReinforcementTicTacToeLearner, StateArrayX, StateDictX
+from Players import RandomWinner, RandomWinnerBlocker
+from StateIndex import get_index
+
+import random
+import numpy as np
+import pytest
+
+
+def entry(learner, canonical_id: int) -> tuple:
+    """
+    Reward and times seen of a state in the learner's table, whichever way it is keyed
+    """
+    table, index = learner.state_dict, get_index()
+    if isinstance(table, StateArrayX):
+        key = canonical_id
+    elif learner.zobrist:
+        key = index.zobrist_key_of(canonical_id)
+    else:
+        key = index.key_of(canonical_id)
+    return tuple(table.get(key))
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'zobrist': True}, {'state_dict': StateArrayX}])
+def test_checkpoint_round_trip(tmp_path, kwargs):
+    if 'state_dict' in kwargs:
+        kwargs['state_dict'] = kwargs['state_dict']()
+    learner = ReinforcementTicTacToeLearner(1000, 0.1, RandomWinnerBlocker(player='O'), **kwargs)
+    learner.learn()
+    path = str(tmp_path / 'learner.ckpt')
+    save_checkpoint(learner, path)
+
+    index = get_index()
+    for table in ('array', 'dict'):
+        loaded = load_learner(path, table=table)
+        assert loaded.games_played == learner.games_played
+        assert loaded.epsilon == learner.epsilon and loaded.player == learner.player
+        assert type(loaded.opponent) is type(learner.opponent)
+
+        for canonical_id in range(index.n_canonical):
+            assert entry(loaded, canonical_id) == pytest.approx(entry(learner, canonical_id))
+
+    random.seed(3)
+    expected = learner.play_n_games(200)
+    random.seed(3)
+    assert load_learner(path, evaluate=True).play_n_games(200) == expected
+
+
+def test_batch_checkpoint_round_trip(tmp_path):
+    learner = BatchTicTacToeLearner(2000, 0.1, RandomWinner(player='O'), seed=0)
+    learner.learn()
+    path = str(tmp_path / 'batch.ckpt')
+    save_checkpoint(learner, path)
+
+    loaded = load_learner(path)
+    assert np.array_equal(loaded.state_dict.values, learner.state_dict.values)
+    assert np.array_equal(loaded.state_dict.counts, learner.state_dict.counts)
+    assert type(loaded.opponent) is RandomWinner and loaded.games_played == 2000
+
+
+@pytest.mark.parametrize('table', ['array', 'dict'])
+def test_warm_start_keeps_step_sizes_and_lam(tmp_path, table):
+    state_dict = StateArrayX(alpha=DecayingStep(0.7, 10)) if table == 'array' else StateDictX(alpha=0.2)
+    learner = ReinforcementTicTacToeLearner(500, 0.1, RandomWinnerBlocker(player='O'), state_dict=state_dict, lam=0.5)
+    learner.learn()
+    path = str(tmp_path / 'learner.ckpt')
+    save_checkpoint(learner, path)
+
+    loaded = load_learner(path, n=500, table=table)
+    assert loaded.lam == 0.5
+    assert repr(loaded.state_dict.alpha) == repr(learner.state_dict.alpha)
+
+    # both carry on learning the same way
+    random.seed(4)
+    learner.learn()
+    random.seed(4)
+    loaded.learn()
+    for canonical_id in range(get_index().n_canonical):
+        assert entry(loaded, canonical_id) == pytest.approx(entry(learner, canonical_id))
+
+
+def test_sample_average_is_saved_as_none(tmp_path):
+    learner = ReinforcementTicTacToeLearner(10, 0.1, RandomWinnerBlocker(player='O'))
+    metadata = save_checkpoint(learner, str(tmp_path / 'learner.ckpt')).metadata
+    assert metadata['alpha'] is None and metadata['lam'] is None
+
+
+def test_unsaveable_schedule_is_refused(tmp_path):
+    learner = ReinforcementTicTacToeLearner(10, 0.1, RandomWinnerBlocker(player='O'),
+                                            state_dict=StateArrayX(alpha=lambda n: 1 / n))
+    path = tmp_path / 'learner.ckpt'
+    with pytest.raises(ValueError):
+        save_checkpoint(learner, str(path))
+    assert not path.exists()
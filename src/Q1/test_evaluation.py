@@ -0,0 +1,41 @@
+from Checkpoint import save_checkpoint
+from Evaluation import count_wld, merge_counts, parallel_play_n_games
+from Learners import ReinforcementTicTacToeLearner, StateArrayX
+from Players import RandomWinnerBlocker
+
+import random
+import pytest
+
+
+@pytest.fixture(scope='module')
+def learner():
+    random.seed(0)
+    learner = ReinforcementTicTacToeLearner(2000, 0.1, RandomWinnerBlocker(player='O'), state_dict=StateArrayX())
+    learner.learn()
+    return learner
+
+
+def test_counts_merge():
+    wld = [('w', True), ('l', False), ('w', True), ('d', False)]
+    assert count_wld(wld) == {True: {'w': 2, 'd': 0, 'l': 0}, False: {'w': 0, 'd': 1, 'l': 1}}
+    assert merge_counts([count_wld(wld[:1]), count_wld(wld[1:])]) == count_wld(wld)
+
+
+def test_workers_split_and_merge(learner):
+    wld = parallel_play_n_games(learner, 1001, workers=3, seed=5)
+    assert len(wld) == 1001
+
+    # the same seed gives the same games, counted in each worker or after
+    assert parallel_play_n_games(learner, 1001, workers=3, seed=5) == wld
+    assert parallel_play_n_games(learner, 1001, workers=3, seed=5, aggregate=True) == count_wld(wld)
+
+
+def test_checkpoint_and_opponent(learner, tmp_path):
+    path = str(tmp_path / 'learner.ckpt')
+    save_checkpoint(learner, path)
+
+    counts = parallel_play_n_games(path, 400, workers=2, opponent='RandomPlayer', aggregate=True)
+    assert sum(sum(c.values()) for c in counts.values()) == 400
+    # a learner trained against the blocker beats a random player
+    wins, losses = (counts[True][result] + counts[False][result] for result in 'wl')
+    assert wins > 2*losses
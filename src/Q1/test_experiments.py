@@ -0,0 +1,29 @@
+from Experiments import run_learner
+from Results import CODES
+
+import numpy as np
+import pytest
+
+
+CONFIG = {'epsilon': 0.1, 'opponent': 'RandomWinnerBlocker', 'games': 300, 'play_games': 100}
+
+
+@pytest.mark.parametrize('config', [CONFIG, {**CONFIG, 'lam': 0.5, 'alpha': 0.1}, {**CONFIG, 'batch_size': 32}])
+def test_run_learner_returns_result_codes(config):
+    results = run_learner(config, seed=0)
+
+    for name, games in (('learn', 300), ('play', 100)):
+        assert results[f'{name}_result'].dtype == np.int8 and len(results[f'{name}_result']) == games
+        assert results[f'{name}_played_first'].dtype == bool
+        assert set(results[f'{name}_result'].tolist()) <= set(CODES.values())
+        assert results[f'{name}_win_pct'] == 100 * np.mean(results[f'{name}_result'] == CODES['w'])
+
+
+def test_run_learner_refuses_lam_with_batch_size():
+    with pytest.raises(ValueError):
+        run_learner({**CONFIG, 'batch_size': 32, 'lam': 0.5}, seed=0)
+
+
+def test_run_learner_batch_size_takes_alpha():
+    results = [run_learner({**CONFIG, 'batch_size': 32, 'alpha': alpha}, seed=0) for alpha in (None, 0.5)]
+    assert not np.array_equal(results[0]['learn_result'], results[1]['learn_result'])
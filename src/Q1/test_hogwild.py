@@ -0,0 +1,35 @@
+from Hogwild import HogwildLearner, SharedStateArrayX
+from Learners import ConstantStep, StateArrayX
+from Players import RandomWinnerBlocker
+
+import numpy as np
+import pytest
+
+
+def test_state_dict_schedule_is_kept():
+    learner = HogwildLearner(400, 0.1, RandomWinnerBlocker(player='O'), workers=2,
+                             state_dict=StateArrayX(alpha=0.3))
+    assert repr(learner.alpha) == 'ConstantStep(0.3)'
+
+    learner.learn()
+    assert repr(learner.state_dict.alpha) == 'ConstantStep(0.3)'
+
+
+def test_conflicting_schedules_raise():
+    with pytest.raises(ValueError):
+        HogwildLearner(10, 0.1, RandomWinnerBlocker(player='O'), state_dict=StateArrayX(alpha=0.3), alpha=0.1)
+    learner = HogwildLearner(10, 0.1, RandomWinnerBlocker(player='O'), state_dict=StateArrayX(alpha=0.3),
+                             alpha=ConstantStep(0.3))
+    assert repr(learner.alpha) == 'ConstantStep(0.3)'
+
+
+@pytest.mark.parametrize('locks', [0, 4])
+def test_workers_learn_into_one_table(locks):
+    learner = HogwildLearner(600, 0.1, RandomWinnerBlocker(player='O'), workers=3, locks=locks, seed=1)
+    wld = learner.learn()
+
+    assert len(wld) == 600 and learner.games_played == 600
+    assert learner.state_dict.counts.sum() > 600
+    assert not isinstance(learner.state_dict, SharedStateArrayX)
+    # every worker's backups land in the table the learner keeps
+    assert np.any(learner.state_dict.values != StateArrayX().values)
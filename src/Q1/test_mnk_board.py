@@ -0,0 +1,92 @@
+from Learners import ReinforcementTicTacToeLearner
+from MNKBoard import MNKBoard, geometry, mnk_board
+from Players import RandomWinnerBlocker
+from TicTacToe import TicTacToe
+import MNKBoard as mnk
+
+import pickle
+import random
+import pytest
+
+
+@pytest.mark.parametrize('moves', [
+    [0, 4, 1, 5, 2],  # top row
+    [1, 0, 6, 2, 11],  # down right diagonal from 1
+    [3, 0, 6, 1, 9],  # down left diagonal from 3
+])
+def test_k_in_a_row_wins(moves):
+    board = MNKBoard(4, 4, 3)
+    player = 'X'
+    for move in moves:
+        assert not board.winner()
+        board.add_move(player, move)
+        player = 'O' if player == 'X' else 'X'
+
+    assert board.winner() == 'X' and board.terminal
+    assert board.winner(board.str_state()) == 'X'
+
+
+def test_k_short_of_a_line_does_not_win():
+    board = MNKBoard(5, 5, 4)
+    for x, o in ((0, 20), (1, 21), (2, 22)):
+        board.add_move('X', x)
+        assert board.wins_with('X', 3) == (x == 2)
+        board.add_move('O', o)
+    assert not board.winner() and not board.terminal
+    assert board.winning_moves('X') == [3] and board.winning_moves('O') == [23]
+
+
+def test_geometry_counts_lines_and_symmetries():
+    lines, _, symmetries = geometry(4, 4, 3)
+    # 8 each way along rows and columns, 4 on each diagonal direction
+    assert len(lines) == 24 and len(symmetries) == 8
+    assert len(geometry(3, 5, 3)[2]) == 4
+    with pytest.raises(ValueError):
+        geometry(3, 3, 4)
+
+
+def test_3x3_board_plays_as_tictactoe():
+    for _ in range(200):
+        board, ttt = MNKBoard(), TicTacToe()
+        player = random.choice('XO')
+        while not ttt.terminal:
+            move = random.choice(ttt.possible_moves())
+            board.add_move(player, move)
+            ttt.add_move(player, move)
+            player = 'O' if player == 'X' else 'X'
+            assert board.winner() == ttt.winner() and board.terminal == ttt.terminal
+            assert board.winning_moves(player) == ttt.winning_moves(player)
+
+
+def test_canonical_keys_are_kept_up_to_date(random_boards):
+    for board in random_boards(200, mnk_board(4, 4, 3)):
+        assert board.canonical_key() == board.canonical_key(board.str_state())
+        assert board.decode(board.code) == board.str_state()
+
+        player = 'O' if board.last_turn == 'X' else 'X'
+        moves, keys = board.afterstate_ids(player)
+        assert keys == [board.canonical_key(''.join(board.fake_move(player, move))) for move in moves]
+
+
+def test_mnk_board_classes_are_shared_and_pickle():
+    board_cls = mnk_board(4, 4, 3)
+    assert mnk_board(4, 4, 3) is board_cls
+    assert pickle.loads(pickle.dumps(board_cls)) is board_cls
+    assert getattr(mnk, 'MNKBoard5x5k4') is mnk_board(5, 5, 4)
+
+    board = board_cls()
+    board.add_move('X', 5)
+    copy = pickle.loads(pickle.dumps(board))
+    assert type(copy) is board_cls and copy.str_state() == board.str_state()
+
+
+def test_learner_keys_mnk_states_by_canonical_code():
+    board_cls = mnk_board(4, 4, 3)
+    learner = ReinforcementTicTacToeLearner(200, 0.1, RandomWinnerBlocker(player='O'), board_cls=board_cls)
+    learner.learn()
+
+    board = board_cls()
+    board.add_move('X', 0)
+    assert learner.board_key(board) == board.canonical_key(board.str_state())
+    assert all(isinstance(key, int) for key in learner.state_dict)
+    assert learner.state_dict.get(learner.board_key(board)) == learner.state_dict.get(board.str_state())
@@ -0,0 +1,64 @@
+from Learners import ReinforcementTicTacToeLearner
+from Players import RandomWinnerBlocker
+from Results import CODES, ResultLog, as_log, cumulative_counts, rolling_rates
+
+import random
+import numpy as np
+import pytest
+
+
+_rng = random.Random(0)
+WLD = [[_rng.choice('wdl'), _rng.random() < 0.5] for _ in range(1000)]
+
+
+def test_round_trip_in_memory():
+    log = ResultLog.from_wld(WLD)
+    assert log.results.dtype == np.int8 and log.played_first.dtype == bool
+    assert log.to_wld() == WLD and len(log) == len(WLD)
+    assert as_log(log) is log and as_log(WLD).to_wld() == WLD
+
+
+def test_round_trip_on_disk(tmp_path):
+    directory = str(tmp_path / 'log')
+    log = ResultLog(len(WLD), directory, flush_every=300)
+    for result, played_first in WLD[:700]:
+        log.append(result, played_first)
+
+    # readers see the games up to the last flush
+    assert len(ResultLog.open(directory)) == 600
+
+    codes = np.array([CODES[result] for result, _ in WLD[700:]], dtype=np.int8)
+    log.extend(codes, np.array([played_first for _, played_first in WLD[700:]]))
+    log.flush()
+
+    opened = ResultLog.open(directory)
+    assert opened.to_wld() == WLD
+    chunks = list(opened.chunks(chunk_size=400))
+    assert [len(results) for results, _ in chunks] == [400, 400, 200]
+    assert np.array_equal(np.concatenate([results for results, _ in chunks]), log.results)
+
+
+def test_full_log_raises():
+    log = ResultLog(1)
+    log.append('w', True)
+    with pytest.raises(IndexError):
+        log.append('w', True)
+
+
+def test_learner_records_the_same_results():
+    random.seed(1)
+    as_list = ReinforcementTicTacToeLearner(500, 0.1, RandomWinnerBlocker(player='O')).learn()
+    random.seed(1)
+    recorded = ReinforcementTicTacToeLearner(500, 0.1, RandomWinnerBlocker(player='O')).learn(recorder=ResultLog(500))
+    assert recorded.to_wld() == as_list
+
+
+def test_counts_and_rates():
+    log = ResultLog.from_wld(WLD)
+    counts = cumulative_counts(log.results)
+    assert counts[:, -1].tolist() == [sum(r == result for r, _ in WLD) for result in 'wdl']
+
+    rates = rolling_rates(log.results, 50)
+    assert np.allclose(rates.sum(axis=0), 1)
+    assert rates[0, 99] == np.mean([r == 'w' for r, _ in WLD[50:100]])
+    assert log.split(True).tolist() == [CODES[r] for r, first in WLD if first]
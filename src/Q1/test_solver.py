@@ -0,0 +1,66 @@
+from Players import RandomPlayer, RandomWinnerBlocker
+from Solver import UNREACHABLE, PerfectPlayer, Solution, get_solution
+from StateIndex import DIGITS, SYMBOLS, decode, get_index
+from TicTacToe import TicTacToe
+
+import random
+import numpy as np
+import pytest
+
+
+def minimax(state: str, mover: int, memo: dict) -> int:
+    """
+    Plain minimax over every move, no pruning or symmetry, valued as Solver values them
+    """
+    key = (state, mover)
+    if key not in memo:
+        cells = [DIGITS[s] for s in state]
+        empty = cells.count(0)
+        if TicTacToe._winner(state):
+            memo[key] = -(empty + 1)
+        elif not empty:
+            memo[key] = 0
+        else:
+            memo[key] = max(-minimax(state[:i] + SYMBOLS[mover] + state[i + 1:], 3 - mover, memo)
+                            for i in range(9) if state[i] == ' ')
+    return memo[key]
+
+
+def test_solver_matches_minimax():
+    index = get_index()
+    values = get_solution().values
+    memo = {}
+    checked = 0
+    for canonical_id, code in enumerate(index.canonical_codes.tolist()):
+        state = decode(code)
+        for mover in (1, 2):
+            value = values[canonical_id, mover - 1]
+            if value == UNREACHABLE:
+                continue
+            assert value == minimax(state, mover, memo), (state, SYMBOLS[mover])
+            checked += 1
+    assert checked > index.n_canonical
+
+
+def test_empty_board_is_a_draw():
+    solution = get_solution()
+    assert solution.value(' '*9, 'X') == solution.value(' '*9, 'O') == 0
+    assert solution.state_values('X')['        X'] == 0
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'solution.npy')
+    get_solution().save(path)
+    assert np.array_equal(Solution.load(path).values, get_solution().values)
+
+
+@pytest.mark.parametrize('opponent', [RandomPlayer, RandomWinnerBlocker, PerfectPlayer])
+def test_perfect_player_never_loses(opponent):
+    for _ in range(200):
+        board = TicTacToe()
+        players = {'O': PerfectPlayer(player='O'), 'X': opponent(player='X')}
+        turn = random.choice('XO')
+        while not board.terminal:
+            board = players[turn].move(board)
+            turn = 'O' if turn == 'X' else 'X'
+        assert board.winner() != 'X'
@@ -0,0 +1,45 @@
+from Learners import ReinforcementTicTacToeLearner, StateArrayX, StateDictX
+from Players import RandomWinnerBlocker
+from StateIndex import get_index
+
+import random
+import numpy as np
+import pytest
+
+
+def test_defaults_match_state_dict():
+    index, table, state_dict = get_index(), StateArrayX(), StateDictX()
+    for canonical_id in range(index.n_canonical):
+        assert table.get(canonical_id) == tuple(state_dict.get(index.key_of(canonical_id)))
+
+
+def test_keys_by_state_and_id(random_boards):
+    table = StateArrayX()
+    for board in random_boards(100):
+        for state in board.similar_states():
+            assert table.state_id(state) == get_index().canonical_id(board.str_state())
+    with pytest.raises(KeyError):
+        table.state_id('XXXXXXXXX')
+
+
+def test_learner_plays_the_same_games_with_state_array():
+    def run(**kwargs):
+        random.seed(1)
+        learner = ReinforcementTicTacToeLearner(1000, 0.1, RandomWinnerBlocker(player='O'), **kwargs)
+        return learner.learn(), learner.play_n_games(200)
+
+    assert run(state_dict=StateArrayX()) == run()
+
+
+@pytest.mark.parametrize('alpha', [None, 0.2])
+def test_back_up_many_matches_one_at_a_time(alpha):
+    old_ids = np.random.randint(0, 50, 500)
+    targets = np.random.random(500)
+
+    many, one = StateArrayX(alpha=alpha), StateArrayX(alpha=alpha)
+    many.back_up_many(old_ids, targets)
+    for state_id, target in zip(old_ids.tolist(), targets.tolist()):
+        one.back_up(state_id, target)
+
+    assert np.allclose(many.values, one.values)
+    assert np.array_equal(many.counts, one.counts)
@@ -0,0 +1,61 @@
+from StateIndex import NUM_CODES, StateIndex, decode, encode, get_index
+from TicTacToe import TicTacToe
+
+import numpy as np
+
+
+def reachable_states() -> set:
+    """
+    Every board of every game, with either player moving first, by brute force
+    """
+    seen = set()
+    frontier = [(' '*9, player) for player in 'XO']
+    while frontier:
+        state, player = frontier.pop()
+        if (state, player) in seen:
+            continue
+        seen.add((state, player))
+        if TicTacToe._winner(state) or ' ' not in state:
+            continue
+        other = 'O' if player == 'X' else 'X'
+        frontier.extend((state[:i] + player + state[i + 1:], other) for i in range(9) if state[i] == ' ')
+    return {state for state, _ in seen}
+
+
+def test_index_holds_every_reachable_board():
+    index = get_index()
+    states = reachable_states()
+    assert index.n_positions == len(states)
+
+    reachable = {decode(code) for code in range(NUM_CODES) if index.canonical_id(decode(code)) >= 0}
+    assert reachable == states
+    assert index.n_canonical == len({min(TicTacToe().similar_states(state)) for state in states})
+
+
+def test_canonical_keys_and_outcomes():
+    index = get_index()
+    for state in reachable_states():
+        assert index.canonical_key(state) == sorted(TicTacToe().similar_states(state))[0]
+        winner = TicTacToe._winner(state)
+        terminal = bool(winner) or ' ' not in state
+        assert index.outcome(state) == (winner, terminal)
+        assert index.winner(state) == winner
+        # no moves are left once the game is over
+        assert index.possible_moves(state) == ([] if terminal else TicTacToe().possible_moves(state))
+        assert decode(encode(state)) == state
+
+
+def test_unreachable_boards():
+    index = get_index()
+    assert index.canonical_id('XXXXXXXXX') == -1
+    assert index.canonical_id(12345) == -1
+
+
+def test_save_and_memory_map(tmp_path):
+    path = str(tmp_path / 'index.npy')
+    get_index().save(path)
+    loaded = StateIndex.load(path)
+
+    assert isinstance(loaded.table, np.memmap)
+    assert loaded.n_canonical == get_index().n_canonical
+    assert np.array_equal(loaded.canonical_codes, get_index().canonical_codes)
@@ -0,0 +1,85 @@
+from Learners import (ConstantStep, DecayingStep, ReinforcementTicTacToeLearner, StateArrayX, StateDictX,
+                      lambda_returns, step_schedule)
+from Players import RandomWinnerBlocker
+
+import random
+import numpy as np
+import pytest
+
+
+def test_step_schedule():
+    assert step_schedule(None) is None
+    assert repr(step_schedule(0.1)) == 'ConstantStep(0.1)'
+    schedule = DecayingStep()
+    assert step_schedule(schedule) is schedule
+
+
+def test_decaying_step():
+    assert [DecayingStep()(n) for n in (1, 2, 4)] == [1, 0.5, 0.25]
+    assert DecayingStep(0.5, 3)(1) == 1
+    assert DecayingStep(0.5, 3)(13) == pytest.approx(0.5)
+    assert ConstantStep(0.3)(100) == 0.3
+
+
+@pytest.mark.parametrize('alpha, expected', [(None, 0.5), (0.3, 0.65*0.7)])
+def test_sample_average_and_constant_step(alpha, expected):
+    # backups of 1 then 0, from the default 0.5
+    table = StateDictX(alpha=alpha)
+    table.back_up('XO       ', 1.0)
+    table.back_up('XO       ', 0.0)
+
+    value, count = table.get('XO       ')
+    assert count == 2
+    assert value == pytest.approx(expected)
+
+
+def test_lambda_zero_is_one_step():
+    keys = [(0, 1), (1, 2), (2, 3)]
+    new_values = [0.2, 0.4, 1.0]
+    assert lambda_returns(keys, new_values, 0) == new_values
+
+
+def test_lambda_one_is_monte_carlo():
+    keys = [(0, 1), (1, 2), (2, 3)]
+    assert lambda_returns(keys, [0.2, 0.4, 1.0], 1) == [1.0, 1.0, 1.0]
+
+
+def test_lambda_return_mixes_later_values():
+    keys = [(0, 1), (1, 2)]
+    assert lambda_returns(keys, [0.2, 1.0], 0.5) == pytest.approx([0.2 + 0.5*(1.0 - 0.2), 1.0])
+
+
+def test_trace_cut_where_pairs_do_not_chain():
+    # 1 -> 5 is an exploratory move, so the first backup does not see the end of the episode
+    keys = [(0, 1), (5, 6)]
+    assert lambda_returns(keys, [0.2, 1.0], 1) == [0.2, 1.0]
+
+
+@pytest.mark.parametrize('table', [StateDictX, StateArrayX])
+def test_update_episode_lambda_zero_matches_update(table):
+    def run(lam):
+        random.seed(2)
+        learner = ReinforcementTicTacToeLearner(300, 0.1, RandomWinnerBlocker(player='O'),
+                                                state_dict=table(), lam=lam)
+        return learner.learn(), learner.state_dict
+
+    wld, one_step = run(None)
+    lam_wld, lam_zero = run(0)
+
+    assert lam_wld == wld
+    if table is StateArrayX:
+        assert np.allclose(lam_zero.values, one_step.values)
+        assert np.array_equal(lam_zero.counts, one_step.counts)
+    else:
+        assert lam_zero.keys() == one_step.keys()
+        for key, (value, count) in one_step.items():
+            assert lam_zero[key][0] == pytest.approx(value) and lam_zero[key][1] == count
+
+
+def test_update_episode_moves_towards_the_end():
+    table = StateDictX()
+    episode = [('X        ', 'XO       '), ('XO       ', 'XOX      ')]
+    table[table.state_key('XOX      ')] = [1.0, 1]
+
+    table.update_episode(episode, lam=1)
+    assert table.get_reward('X        ') == pytest.approx(1.0)
@@ -0,0 +1,44 @@
+from Players import RandomWinner, RandomWinnerBlocker
+from TicTacToe import TicTacToe
+
+import copy
+import random
+
+
+def test_winner_is_tracked_move_by_move():
+    for _ in range(500):
+        board = TicTacToe()
+        player = random.choice('XO')
+        while not board.terminal:
+            for move in board.possible_moves():
+                after = ''.join(board.fake_move(player, move))
+                assert board.wins_with(player, move) == (TicTacToe._winner(after) == player)
+
+            board.add_move(player, random.choice(board.possible_moves()))
+            player = 'O' if player == 'X' else 'X'
+            assert board.winner() == TicTacToe._winner(board.str_state())
+            assert board.terminal == (bool(board.winner()) or board.game_over())
+
+
+def scanned_move(board: TicTacToe, player: str, block: bool) -> int:
+    """
+    First winning (then blocking) cell found by scanning fake moves, as the Players did before wins_with
+    """
+    other = 'O' if player == 'X' else 'X'
+    for symbol in (player, other) if block else (player,):
+        for move in board.possible_moves():
+            if TicTacToe._winner(''.join(board.fake_move(symbol, move, verify=False))) == symbol:
+                return move
+    return None
+
+
+def test_players_win_and_block_as_before(random_boards):
+    for board in random_boards(500):
+        if board.last_turn == 'O':
+            continue
+        for player_cls, block in ((RandomWinner, False), (RandomWinnerBlocker, True)):
+            expected = scanned_move(board, 'O', block)
+            if expected is None:
+                continue
+            played = player_cls(player='O').move(copy.deepcopy(board))
+            assert played.state[expected] == 'O' and played.moves == board.moves + 1
@@ -0,0 +1,71 @@
+from Arena import MatchResult, Policy
+from Players import RandomPlayer, RandomWinner, RandomWinnerBlocker
+from Tournament import Pairing, Tournament, bradley_terry
+
+import numpy as np
+import pytest
+
+
+def policies(*players) -> list:
+    return [Policy(player.__name__, player) for player in players]
+
+
+def test_bradley_terry_recovers_strengths():
+    theta = np.array([-1.0, 0.0, 0.4, 1.5])
+    theta -= theta.mean()
+    games = np.full((4, 4), 1000.0) - np.diag(np.full(4, 1000.0))
+    p = 1 / (1 + np.exp(theta[np.newaxis, :] - theta[:, np.newaxis]))
+
+    assert np.allclose(bradley_terry(games * p, games), theta, atol=1e-6)
+
+
+def test_pairing_scores_for_a():
+    a, b = policies(RandomPlayer, RandomWinner)
+    pairing = Pairing(a, b)
+    for result in (MatchResult(a.name, b.name, 'w', 5), MatchResult(b.name, a.name, 'w', 5),
+                   MatchResult(b.name, a.name, 'd', 9)):
+        pairing.add(result)
+
+    assert pairing.games == 3
+    assert pairing.mean == pytest.approx(1.5 / 3)
+    assert pairing.wld == {True: {'w': 1, 'd': 0, 'l': 0}, False: {'w': 0, 'd': 1, 'l': 1}}
+
+
+@pytest.mark.parametrize('results, settled', [('w', 'decisive'), ('d', 'even'), ('wl', 'capped')])
+def test_settling(results, settled):
+    tournament = Tournament(policies(RandomPlayer, RandomWinner), min_games=40, max_games=60)
+    pairing, = tournament.pairings.values()
+
+    for game in range(60):
+        pairing.add(MatchResult(pairing.a.name, pairing.b.name, results[game % len(results)], 9))
+        tournament._settle(pairing)
+        if pairing.settled:
+            break
+
+    assert pairing.settled == settled
+    assert pairing.games == (60 if settled == 'capped' else 40)
+
+
+def test_names_must_be_unique():
+    with pytest.raises(ValueError):
+        Tournament([Policy('a', RandomPlayer), Policy('a', RandomWinner)])
+
+
+def test_run_orders_ratings():
+    tournament = Tournament(policies(RandomPlayer, RandomWinner, RandomWinnerBlocker),
+                            min_games=40, max_games=400, check_every=40, concurrency=64)
+    ratings = tournament.run()
+
+    assert not tournament.open_pairings()
+    assert all(pairing.games <= 400 for pairing in tournament.pairings.values())
+    assert tournament.games_played + tournament.games_saved == 400 * 3
+    assert sum(row['games'] for row in ratings.values()) == 2 * tournament.games_played
+
+    elo = {name: row['elo'] for name, row in ratings.items()}
+    assert elo['RandomWinnerBlocker'] > elo['RandomWinner'] > elo['RandomPlayer']
+    assert sum(elo.values()) == pytest.approx(0, abs=1e-6)
+    assert all(row['low'] < row['elo'] < row['high'] for row in ratings.values())
+
+    anchored = tournament.ratings(anchor='RandomPlayer')
+    assert anchored['RandomPlayer']['elo'] == 0
+    assert anchored['RandomWinnerBlocker']['elo'] == pytest.approx(elo['RandomWinnerBlocker'] - elo['RandomPlayer'])
@@ -0,0 +1,60 @@
+from Learners import ReinforcementTicTacToeLearner, StateArrayX, StateDictX
+from Players import RandomWinnerBlocker
+from Training import ConvergenceDriver, value_change, value_snapshot
+
+import random
+import numpy as np
+import pytest
+
+
+def make_learner(table) -> ReinforcementTicTacToeLearner:
+    return ReinforcementTicTacToeLearner(7, 0.1, RandomWinnerBlocker(player='O'), state_dict=table())
+
+
+@pytest.mark.parametrize('table', [StateDictX, StateArrayX])
+def test_value_change(table):
+    learner = make_learner(table)
+    before = value_snapshot(learner.state_dict)
+    assert value_change(before, learner.state_dict) == 0.0
+
+    learner.learn()
+    assert value_change(before, learner.state_dict) > 0
+    assert value_change(value_snapshot(learner.state_dict), learner.state_dict) == 0.0
+
+
+def test_curves_match_across_tables():
+    def run(table):
+        random.seed(3)
+        return ConvergenceDriver(make_learner(table), window=200, max_games=2000).learn()
+
+    curve, array_curve = run(StateDictX), run(StateArrayX)
+    for name in ('games', 'w', 'd', 'l', 'new_states', 'states_seen'):
+        assert np.array_equal(curve[name], array_curve[name])
+    assert np.allclose(curve['value_change'], array_curve['value_change'])
+    assert curve['stopped_at'] == array_curve['stopped_at']
+
+
+def test_stops_at_max_games():
+    learner = make_learner(StateArrayX)
+    curve = ConvergenceDriver(learner, window=300, max_games=1000, value_tol=-1).learn()
+
+    assert not curve['converged']
+    assert curve['stopped_at'] == 1000
+    assert curve['games'].tolist() == [300, 600, 900, 1000]
+    assert learner.games_played == 1000
+    # n is put back
+    assert learner.n == 7
+
+
+def test_converges_through_epsilons():
+    learner = make_learner(StateArrayX)
+    driver = ConvergenceDriver(learner, window=100, epsilons=[0.3, 0.1], value_tol=1, new_states_tol=10_000,
+                               win_rate_z=100, patience=1)
+    curve = driver.learn()
+
+    # the first window of each stage has no win rate to compare against
+    assert curve['converged']
+    assert curve['stopped_at'] == 400
+    assert curve['epsilon_changes'].tolist() == [200]
+    assert curve['epsilon'].tolist() == [0.3, 0.3, 0.1, 0.1]
+    assert learner.epsilon == 0.1
@@ -0,0 +1,44 @@
+from Learners import LearnerPlayer, ReinforcementTicTacToeLearner, StateArrayX
+from Players import RandomWinnerBlocker
+from StateIndex import get_index
+from TicTacToe import TicTacToe
+
+import random
+
+
+def test_zobrist_key_is_symmetry_canonical(random_boards):
+    for board in random_boards(200):
+        assert board.zobrist_key() == TicTacToe.zobrist_hash(board.str_state())
+        for state in board.similar_states():
+            assert TicTacToe.zobrist_hash(state) == board.zobrist_key()
+
+
+def test_afterstate_key_matches_the_move(random_boards):
+    for board in random_boards(200):
+        player = 'O' if board.last_turn == 'X' else 'X'
+        for move in board.possible_moves():
+            assert board.afterstate_key(player, move) == TicTacToe.zobrist_hash(board.fake_move(player, move))
+
+
+def test_zobrist_keys_are_distinct():
+    index = get_index()
+    assert len(index.zobrist_ids) == index.n_canonical
+
+
+def run(n: int = 1000, **kwargs):
+    random.seed(1)
+    learner = ReinforcementTicTacToeLearner(n, 0.1, RandomWinnerBlocker(player='O'), **kwargs)
+    return learner, learner.learn(), learner.play_n_games(200)
+
+
+def test_zobrist_learner_plays_the_same_games():
+    assert run(zobrist=True)[1:] == run()[1:]
+
+
+def test_zobrist_learner_with_state_array():
+    learner, *games = run(zobrist=True, state_dict=StateArrayX())
+    expected, *expected_games = run(state_dict=StateArrayX())
+
+    assert games == expected_games
+    assert (learner.state_dict.values == expected.state_dict.values).all()
+    LearnerPlayer(learner, 'O').move(TicTacToe())
@@ -0,0 +1,53 @@
+from Learners import GreedyLearner, GreedyUCBLearner
+
+import numpy as np
+
+
+def run_bandit(config: dict, seed: int) -> dict:
+    """
+    Average one learner over many bandit problems, for use with sweep.run_sweep.
+    Testbeds are built as in e.ipynb (stationary) and f.ipynb (random walk, when stdev is given).
+
+    config keys:
+    - rounds, num_arms, num_tests
+    - epsilon, initial_value, alpha (optional)
+    - c: use GreedyUCBLearner when given
+    - stdev: step size of the random walk of the means, stationary when not given
+
+    :param config: config of the run
+    :param seed: seed of the run
+    :return: rewards and regret averaged over the tests, as arrays of length rounds
+    """
+    rounds, num_arms = config['rounds'], config['num_arms']
+
+    kwargs = {'rounds': rounds, 'num_arms': num_arms, 'epsilon': config['epsilon'],
+              'initial_value': config.get('initial_value', 0), 'alpha': config.get('alpha')}
+    if config.get('c') is not None:
+        learner_class = GreedyUCBLearner
+        kwargs['c'] = config['c']
+    else:
+        learner_class = GreedyLearner
+
+    rewards = np.zeros(rounds)
+    regret = np.zeros(rounds)
+
+    for _ in range(config['num_tests']):
+        if config.get('stdev'):
+            normals = np.random.normal(
+                size=(rounds, num_arms), scale=config['stdev'])
+            normals[0] = np.zeros(num_arms)
+            testbed_means = np.cumsum(normals, axis=0)
+        else:
+            means = np.random.normal(size=num_arms)
+            testbed_means = np.repeat(means[np.newaxis, :], rounds, axis=0)
+        testbed = np.random.normal(loc=testbed_means, size=(rounds, num_arms))
+
+        learner = learner_class(
+            testbed=testbed, testbed_means=testbed_means, **kwargs)
+        learner.learn()
+        rewards += learner.rewards
+        regret += learner.regret
+
+    return {'rewards': rewards / config['num_tests'],
+            'regret': regret / config['num_tests'],
+            'total_regret': float(regret.sum() / config['num_tests'])}
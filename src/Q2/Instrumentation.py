@@ -0,0 +1,36 @@
+from shared import profiling
+
+import Learners
+from Learners import BatchGreedyLearner
+
+
+# methods profiled on a learner, where they exist
+LEARNER_STAGES = ('choose_action', 'greedy_action', 'non_greedy_action', 'update')
+
+
+def profile_learner(learner, profiler: profiling.Profiler = None) -> profiling.Profiler:
+    """
+    Profiler of the learner, its reward source and recorder. Nothing is patched until it is enabled.
+
+    >>> profiler = profile_learner(learner)
+    >>> with profiler:
+    ...     learner.learn()
+    >>> profiler.save('profile.json')
+
+    :param learner: Learner or BatchGreedyLearner
+    :param profiler: Profiler to add to, defaults to a new one
+    """
+    profiler = profiling.Profiler() if profiler is None else profiler
+    cls = type(learner)
+
+    if isinstance(learner, BatchGreedyLearner):
+        # every run plays every round
+        profiler.instrument(cls, 'learn', units=lambda self: self.runs * self.rounds, unit='rounds')
+    else:
+        profiler.instrument(cls, 'learn', units=lambda self: self.rounds, unit='rounds')
+        profiler.instrument(type(learner.source), 'next_chunk', stage='source')
+        profiler.instrument(type(learner.recorder), 'record', stage='recorder')
+
+    profiler.instrument(cls, *[name for name in LEARNER_STAGES if hasattr(cls, name)])
+    profiler.instrument(Learners, 'ucb_scores')
+    return profiler
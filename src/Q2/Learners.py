@@ -1,14 +1,48 @@
 import numpy as np
 from abc import ABC, abstractmethod
+from Rewards import ArraySource, Recorder, RewardSource
 
 
 np.random.seed(3)
 
 
-class Learner(ABC):
+def ucb_scores(Q: np.ndarray, N: np.ndarray, t: int, c: float) -> np.ndarray:
+    """
+    Upper confidence bound of every arm, Q + c * sqrt(log(t) / N), in one array expression.
+    Arms never chosen are infinitely optimistic so each arm is tried once before the bonus is used,
+    and log(t) is taken once for all arms, as 0 when t is 0.
+
+    :param Q: value estimates, any shape with arms along the last axis
+    :param N: number of times each arm was chosen, same shape as Q
+    :param t: current round
+    :param c: degree of exploration
+    :return: scores, same shape as Q
+    """
+    log_t = np.log(t) if t > 0 else 0.0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        UB = c * np.sqrt(log_t / N)
 
-    def __init__(self, rounds: int, num_arms: int, epsilon: float, testbed: np.ndarray, testbed_means: np.ndarray) -> None:
+    return np.where(N > 0, Q + UB, np.inf)
+
+
+class Learner(ABC):
 
+    def __init__(self, rounds: int, num_arms: int, epsilon: float, testbed: np.ndarray = None,
+                 testbed_means: np.ndarray = None, source: RewardSource = None, recorder=None) -> None:
+        """
+        Rewards come from either the testbed arrays or a RewardSource.
+        Without a recorder every round is kept in the actions, rewards and regret arrays,
+        with one (e.g. DecimatingRecorder) only the recorder holds results.
+
+        :param rounds: number of rounds to learn over
+        :param num_arms: number of arms
+        :param epsilon: probability of a random action
+        :param testbed: (rounds, num_arms) rewards
+        :param testbed_means: (rounds, num_arms) true means
+        :param source: RewardSource to draw rewards from instead of the testbed
+        :param recorder: object with record(t, action, reward, regret)
+        """
         self.rounds = rounds
         self.num_arms = num_arms
         self.epsilon = epsilon
@@ -16,12 +50,24 @@ class Learner(ABC):
         self.Q = np.zeros(num_arms)
         self.N = np.zeros(num_arms)
 
-        self.actions = np.zeros(rounds)
-        self.rewards = np.zeros(rounds)
-        self.regret = np.zeros(rounds)
+        if source is None:
+            if testbed is None or testbed_means is None:
+                raise ValueError(
+                    'Either testbed and testbed_means or source must be given')
+            source = ArraySource(testbed, testbed_means)
 
         self.testbed = testbed
         self.testbed_means = testbed_means  # Used for calculating regret
+        self.source = source
+
+        if recorder is None:
+            recorder = Recorder(rounds)
+            self.actions = recorder.actions
+            self.rewards = recorder.rewards
+            self.regret = recorder.regret
+        else:
+            self.actions = self.rewards = self.regret = None
+        self.recorder = recorder
 
         self.t: int = None
 
@@ -66,16 +112,21 @@ class GreedyLearner(Learner):
 
     def learn(self):
 
-        for t in range(self.rounds):
-            self.t = t
-            action = self.choose_action()
-            reward = self.testbed[t][action]
+        t = 0
+        for means, rewards, best in self.source.chunks(self.rounds):
+            for i in range(len(rewards)):
+                self.t = t
+                action = self.choose_action()
+                reward = rewards[i][action]
+
+                self.update(action, reward)
+                # regret only needs the means of the chosen and optimal arm
+                self.recorder.record(t, action, reward,
+                                     best[i] - means[i][action])
+                t += 1
 
-            self.update(action, reward)
-            self.actions[t] = action
-            self.rewards[t] = reward
-            self.regret[t] = np.max(self.testbed_means[t]) - \
-                self.testbed_means[t][action]
+        if hasattr(self.recorder, 'flush'):
+            self.recorder.flush(t - 1)
 
 
 class GreedyUCBLearner(GreedyLearner):
@@ -85,17 +136,94 @@ class GreedyUCBLearner(GreedyLearner):
         self.c = c
 
     def greedy_action(self):
-        Q_v = []
+        return np.argmax(ucb_scores(self.Q, self.N, self.t, self.c))
+
+
+class BatchGreedyLearner:
+    """
+    GreedyLearner (or GreedyUCBLearner when c is given) run on many independent bandit problems at once.
+
+    Q and N are (runs, num_arms) arrays, every round picks an action for each run with one argmax along the arms,
+    and actions, rewards and regret are filled as (runs, rounds) arrays.
+    """
+
+    def __init__(self, initial_value, runs: int, rounds: int, num_arms: int, epsilon: float,
+                 testbed: np.ndarray, testbed_means: np.ndarray, alpha=None, c=None) -> None:
+        """
+        :param initial_value: initial value estimate of each arm
+        :param runs: number of independent bandit problems
+        :param rounds: number of rounds of each problem
+        :param num_arms: number of arms
+        :param epsilon: probability of a random action
+        :param testbed: (runs, rounds, num_arms) rewards
+        :param testbed_means: (runs, rounds, num_arms) true means, or (runs, num_arms) for stationary problems
+        :param alpha: constant step size, sample average when not given
+        :param c: degree of exploration of the UCB bonus, no bonus when not given
+        """
+        self.runs = runs
+        self.rounds = rounds
+        self.num_arms = num_arms
+        self.epsilon = epsilon
+        self.alpha = alpha
+        self.c = c
 
-        for i in range(self.num_arms):
-            # Check if we have ever chosen action i before.
-            #  If not, then N[i] is 0 and we can't divide by zero
+        self.Q = np.ones((runs, num_arms)) * initial_value
+        self.N = np.zeros((runs, num_arms))
 
-            if self.N[i] != 0:
-                UB = self.c * np.sqrt(np.log(self.t)/self.N[i])
-                Q_v.append(self.Q[i] + UB)
-            else:
-                Q_v.append(self.Q[i])
+        self.actions = np.zeros((runs, rounds), dtype=int)
+        self.rewards = np.zeros((runs, rounds))
+        self.regret = np.zeros((runs, rounds))
+
+        self.testbed = testbed
+        self.testbed_means = testbed_means  # Used for calculating regret
+
+        self._rows = np.arange(runs)
+        self.t: int = None
 
-        A = np.argmax(Q_v)
-        return A
+    def update(self, actions, rewards):
+
+        self.N[self._rows, actions] += 1
+        Q = self.Q[self._rows, actions]
+
+        if self.alpha:
+            # Update rule for constant step size
+            self.Q[self._rows, actions] = Q + self.alpha*(rewards - Q)
+        else:
+            # Update rule for sample average step size
+            self.Q[self._rows, actions] = Q + \
+                (rewards - Q)/self.N[self._rows, actions]
+
+    def greedy_action(self):
+        if self.c is None:
+            return np.argmax(self.Q, axis=1)
+
+        return np.argmax(ucb_scores(self.Q, self.N, self.t, self.c), axis=1)
+
+    def non_greedy_action(self):
+        return np.random.choice(self.num_arms, size=self.runs)
+
+    def choose_action(self):
+        explore = np.random.uniform(size=self.runs) < self.epsilon
+        return np.where(explore, self.non_greedy_action(), self.greedy_action())
+
+    def learn(self):
+
+        stationary = self.testbed_means.ndim == 2
+        if stationary:
+            best = np.max(self.testbed_means, axis=1)
+
+        for t in range(self.rounds):
+            self.t = t
+            actions = self.choose_action()
+            rewards = self.testbed[self._rows, t, actions]
+
+            self.update(actions, rewards)
+            self.actions[:, t] = actions
+            self.rewards[:, t] = rewards
+
+            if stationary:
+                self.regret[:, t] = best - \
+                    self.testbed_means[self._rows, actions]
+            else:
+                self.regret[:, t] = np.max(self.testbed_means[:, t], axis=1) - \
+                    self.testbed_means[self._rows, t, actions]
@@ -0,0 +1,208 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Iterator, Tuple
+
+
+class RewardSource(ABC):
+    """
+    Source of bandit rewards, generated lazily a chunk of rounds at a time.
+
+    Children define next_chunk, which returns the true means and the rewards of every arm for the next rounds.
+    """
+
+    def __init__(self, num_arms: int, chunk_size: int = 1024, rng=None) -> None:
+        """
+        :param num_arms: number of arms
+        :param chunk_size: number of rounds generated at once
+        :param rng: np.random.Generator, defaults to the global np.random
+        """
+        self.num_arms = num_arms
+        self.chunk_size = chunk_size
+        self.rng = np.random if rng is None else rng
+
+    @abstractmethod
+    def next_chunk(self, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param size: number of rounds
+        :return: (size, num_arms) true means, (size, num_arms) rewards
+        """
+        pass
+
+    def best_means(self, means: np.ndarray) -> np.ndarray:
+        """
+        Mean of the optimal arm in each round of a chunk
+        """
+        return np.max(means, axis=1)
+
+    def chunks(self, rounds: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Generate rounds rounds, chunk_size at a time
+
+        :param rounds: total number of rounds
+        :return: iterator of (means, rewards, best mean) for each chunk
+        """
+        for start in range(0, rounds, self.chunk_size):
+            means, rewards = self.next_chunk(
+                min(self.chunk_size, rounds - start))
+            yield means, rewards, self.best_means(means)
+
+
+class ArraySource(RewardSource):
+    """
+    Rewards read from materialised testbed arrays, as passed to Learner
+    """
+
+    def __init__(self, testbed: np.ndarray, testbed_means: np.ndarray, chunk_size: int = 1024) -> None:
+        """
+        :param testbed: (rounds, num_arms) rewards
+        :param testbed_means: (rounds, num_arms) true means
+        """
+        super().__init__(testbed.shape[1], chunk_size)
+        self.testbed = testbed
+        self.testbed_means = testbed_means
+        self.t = 0
+
+    def chunks(self, rounds):
+        # replay from the first round each time
+        self.t = 0
+        yield from super().chunks(rounds)
+
+    def next_chunk(self, size):
+        means = self.testbed_means[self.t:self.t + size]
+        rewards = self.testbed[self.t:self.t + size]
+        self.t += size
+        return means, rewards
+
+
+class ReplaySource(ArraySource):
+    """
+    Rewards replayed from .npy files, which are memory mapped so only the chunk in use is read
+    """
+
+    def __init__(self, testbed_path: str, means_path: str, chunk_size: int = 1024) -> None:
+        """
+        :param testbed_path: .npy file of (rounds, num_arms) rewards
+        :param means_path: .npy file of (rounds, num_arms) true means
+        """
+        super().__init__(np.load(testbed_path, mmap_mode='r'),
+                         np.load(means_path, mmap_mode='r'), chunk_size)
+
+
+class StationarySource(RewardSource):
+    """
+    Arms with fixed means, rewards are normal around the mean with standard deviation stdev
+    """
+
+    def __init__(self, num_arms: int, means: np.ndarray = None, stdev: float = 1, **kwargs) -> None:
+        """
+        :param means: mean of each arm, drawn from a standard normal when not given
+        :param stdev: standard deviation of the rewards
+        """
+        super().__init__(num_arms, **kwargs)
+        self.means = self.rng.normal(
+            size=num_arms) if means is None else np.asarray(means)
+        self.best = np.max(self.means)
+        self.stdev = stdev
+
+    def next_chunk(self, size):
+        means = np.broadcast_to(self.means, (size, self.num_arms))
+        rewards = self.rng.normal(
+            loc=means, scale=self.stdev, size=(size, self.num_arms))
+        return means, rewards
+
+    def best_means(self, means):
+        return np.broadcast_to(self.best, len(means))
+
+
+class RandomWalkSource(RewardSource):
+    """
+    Non stationary arms as in f.ipynb, all means start equal and take independent normal steps each round
+    """
+
+    def __init__(self, num_arms: int, step_stdev: float = 0.01, initial_means: np.ndarray = None,
+                 stdev: float = 1, **kwargs) -> None:
+        """
+        :param step_stdev: standard deviation of each step of the means
+        :param initial_means: means in the first round, zero when not given
+        :param stdev: standard deviation of the rewards
+        """
+        super().__init__(num_arms, **kwargs)
+        self.step_stdev = step_stdev
+        self.stdev = stdev
+        self.last = np.zeros(num_arms) if initial_means is None \
+            else np.asarray(initial_means, dtype=float)
+        self.started = False
+
+    def next_chunk(self, size):
+        steps = self.rng.normal(size=(size, self.num_arms),
+                                scale=self.step_stdev)
+        if not self.started:
+            # first round starts at the initial means
+            steps[0] = 0
+            self.started = True
+
+        means = self.last + np.cumsum(steps, axis=0)
+        self.last = means[-1]
+        rewards = self.rng.normal(loc=means, scale=self.stdev)
+        return means, rewards
+
+
+class Recorder:
+    """
+    Records the action, reward and regret of every round in full arrays, as Learner did
+    """
+
+    def __init__(self, rounds: int) -> None:
+        self.actions = np.zeros(rounds)
+        self.rewards = np.zeros(rounds)
+        self.regret = np.zeros(rounds)
+
+    def record(self, t: int, action: int, reward: float, regret: float) -> None:
+        self.actions[t] = action
+        self.rewards[t] = reward
+        self.regret[t] = regret
+
+
+class DecimatingRecorder:
+    """
+    Records the mean reward and regret over every block of `every` rounds, so memory is rounds / every.
+
+    rounds holds the last round of each block, and cumulative_regret the total regret up to it.
+    """
+
+    def __init__(self, every: int = 100) -> None:
+        self.every = every
+
+        self.rounds = []
+        self.rewards = []
+        self.regret = []
+        self.cumulative_regret = []
+
+        self._reward_sum = 0.0
+        self._regret_sum = 0.0
+        self._total_regret = 0.0
+        self._n = 0
+
+    def record(self, t: int, action: int, reward: float, regret: float) -> None:
+        self._reward_sum += reward
+        self._regret_sum += regret
+        self._n += 1
+
+        if self._n == self.every:
+            self.flush(t)
+
+    def flush(self, t: int) -> None:
+        """
+        Close the current block, e.g. for a partial block at the end of learning
+        """
+        if not self._n:
+            return
+
+        self._total_regret += self._regret_sum
+        self.rounds.append(t)
+        self.rewards.append(float(self._reward_sum / self._n))
+        self.regret.append(float(self._regret_sum / self._n))
+        self.cumulative_regret.append(float(self._total_regret))
+
+        self._reward_sum = self._regret_sum = 0.0
+        self._n = 0
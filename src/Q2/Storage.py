@@ -0,0 +1,150 @@
+import json
+import os
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from Rewards import ReplaySource, RewardSource
+
+
+TESTBED_FILE = 'testbed.npy'
+MEANS_FILE = 'means.npy'
+PROGRESS_FILE = 'progress.json'
+RESULTS = {'actions': np.int64, 'rewards': np.float64, 'regret': np.float64}
+
+
+def write_testbed(directory: str, source: RewardSource, rounds: int) -> Tuple[str, str]:
+    """
+    Write rounds rounds of a reward source to testbed.npy and means.npy, a chunk at a time,
+    so testbeds larger than memory can be built.
+
+    :param directory: directory to write to
+    :param source: source of the rewards
+    :param rounds: number of rounds
+    :return: paths of the testbed and means files
+    """
+    os.makedirs(directory, exist_ok=True)
+    testbed_path = os.path.join(directory, TESTBED_FILE)
+    means_path = os.path.join(directory, MEANS_FILE)
+
+    shape = (rounds, source.num_arms)
+    testbed = open_memmap(testbed_path, mode='w+',
+                          dtype=np.float64, shape=shape)
+    means = open_memmap(means_path, mode='w+', dtype=np.float64, shape=shape)
+
+    t = 0
+    for chunk_means, chunk_rewards, _ in source.chunks(rounds):
+        testbed[t:t + len(chunk_rewards)] = chunk_rewards
+        means[t:t + len(chunk_means)] = chunk_means
+        t += len(chunk_rewards)
+
+    testbed.flush()
+    means.flush()
+    return testbed_path, means_path
+
+
+def save_testbed(directory: str, testbed: np.ndarray, testbed_means: np.ndarray) -> Tuple[str, str]:
+    """
+    Save materialised testbed arrays, as passed to Learner
+
+    :return: paths of the testbed and means files
+    """
+    os.makedirs(directory, exist_ok=True)
+    testbed_path = os.path.join(directory, TESTBED_FILE)
+    means_path = os.path.join(directory, MEANS_FILE)
+
+    np.save(testbed_path, testbed)
+    np.save(means_path, testbed_means)
+    return testbed_path, means_path
+
+
+def open_testbed(directory: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Memory map a saved testbed, read only so any number of processes can share the pages
+
+    :return: testbed, testbed_means
+    """
+    return (np.load(os.path.join(directory, TESTBED_FILE), mmap_mode='r'),
+            np.load(os.path.join(directory, MEANS_FILE), mmap_mode='r'))
+
+
+def testbed_source(directory: str, chunk_size: int = 1024) -> ReplaySource:
+    """
+    Reward source replaying a saved testbed
+    """
+    return ReplaySource(os.path.join(directory, TESTBED_FILE),
+                        os.path.join(directory, MEANS_FILE), chunk_size)
+
+
+class MemmapRecorder:
+    """
+    Learner recorder writing actions, rewards and regret straight to .npy files.
+
+    The files are preallocated for all rounds and memory mapped, every flush_every rounds they are flushed
+    and progress.json is updated with the number of rounds written, so open_results can read a run
+    while it is still learning.
+    """
+
+    def __init__(self, directory: str, rounds: int, flush_every: int = 10_000) -> None:
+        """
+        :param directory: directory to write to
+        :param rounds: number of rounds that will be recorded
+        :param flush_every: number of rounds between flushes
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.rounds = rounds
+        self.flush_every = flush_every
+        self.written = 0
+
+        for name, dtype in RESULTS.items():
+            setattr(self, name, open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+',
+                                            dtype=dtype, shape=(rounds,)))
+        self._write_progress()
+
+    def _write_progress(self) -> None:
+        path = os.path.join(self.directory, PROGRESS_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'rounds': self.rounds, 'written': self.written}, f)
+        os.replace(path + '.tmp', path)
+
+    def record(self, t: int, action: int, reward: float, regret: float) -> None:
+        self.actions[t] = action
+        self.rewards[t] = reward
+        self.regret[t] = regret
+
+        if (t + 1) % self.flush_every == 0:
+            self.flush(t)
+
+    def flush(self, t: int) -> None:
+        """
+        Flush everything up to and including round t
+        """
+        for name in RESULTS:
+            getattr(self, name).flush()
+        self.written = t + 1
+        self._write_progress()
+
+
+def open_results(directory: str) -> Dict[str, np.ndarray]:
+    """
+    Memory map the results written by a MemmapRecorder, cut to the rounds flushed so far
+
+    :return: name -> array, for actions, rewards and regret
+    """
+    with open(os.path.join(directory, PROGRESS_FILE)) as f:
+        written = json.load(f)['written']
+
+    return {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')[:written]
+            for name in RESULTS}
+
+
+def iter_chunks(array: np.ndarray, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+    """
+    Read a (memory mapped) array chunk_size rows at a time, for analysis of results larger than memory
+
+    >>> total_regret = sum(chunk.sum() for chunk in iter_chunks(open_results(path)['regret']))
+    """
+    for start in range(0, len(array), chunk_size):
+        yield np.asarray(array[start:start + chunk_size])
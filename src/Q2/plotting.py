@@ -0,0 +1,62 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from typing import Dict, Iterable, Iterator, Tuple
+
+from shared import streamplot
+
+from Storage import iter_chunks, open_results
+
+
+def result_chunks(directory: str, chunk_size: int = 1_000_000) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Rewards and regret written by a MemmapRecorder, chunk_size rounds at a time
+
+    :return: iterator of (rewards, regret)
+    """
+    results = open_results(directory)
+    return zip(iter_chunks(results['rewards'], chunk_size), iter_chunks(results['regret'], chunk_size))
+
+
+def plot_rewards_regret(curves: Dict[str, Iterable[Tuple[np.ndarray, np.ndarray]]],
+                        budget: int = 2000) -> Tuple[plt.Figure, plt.Axes]:
+    """
+    Plot the average reward and average cumulative regret of each learner, consuming the results
+    a chunk of rounds at a time and min/max decimating each line to budget buckets.
+
+    >>> plot_rewards_regret({'UCB c = 2': result_chunks(path)})
+    >>> plot_rewards_regret({'Greedy': [(scores[0], regret[0])]})
+
+    :param curves: label -> iterable of (rewards, regret) chunks, each (rounds,) for one run
+        or (runs, rounds) to be averaged over runs
+    :param budget: number of buckets each line is reduced to
+
+    :return: figure, axes
+    """
+    fig, axs = plt.subplots(1, 2, figsize=(10, 5))
+    ax, ax2 = axs
+
+    for label, chunks in curves.items():
+        rewards_line = streamplot.MinMaxDecimator(budget)
+        regret_line = streamplot.MinMaxDecimator(budget)
+        total_regret = 0.0
+
+        for rewards, regret in chunks:
+            rewards, regret = np.atleast_2d(rewards), np.atleast_2d(regret)
+            rewards_line.update(rewards.mean(axis=0))
+
+            cumulative = total_regret + np.cumsum(regret.mean(axis=0))
+            regret_line.update(cumulative)
+            if len(cumulative):
+                total_regret = cumulative[-1]
+
+        streamplot.plot_decimated(ax, [rewards_line], [label])
+        streamplot.plot_decimated(ax2, [regret_line], [label])
+
+    ax.set_ylabel('Average Reward')
+    ax2.set_ylabel('Average Cumulative Regret')
+    ax.set_xlabel('Rounds')
+    ax2.set_xlabel('Rounds')
+
+    plt.legend()
+
+    return fig, axs
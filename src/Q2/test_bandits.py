@@ -0,0 +1,52 @@
+from Learners import BatchGreedyLearner, GreedyLearner, GreedyUCBLearner
+
+import numpy as np
+import pytest
+
+
+def make_testbeds(runs: int, rounds: int, num_arms: int, stationary: bool = True):
+    rng = np.random.default_rng(0)
+    if stationary:
+        means = rng.normal(size=(runs, num_arms))
+        testbed_means = np.repeat(means[:, np.newaxis, :], rounds, axis=1)
+    else:
+        steps = rng.normal(size=(runs, rounds, num_arms), scale=0.1)
+        steps[:, 0] = 0
+        testbed_means = np.cumsum(steps, axis=1)
+    return rng.normal(loc=testbed_means), testbed_means
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'alpha': 0.1}, {'c': 2}])
+@pytest.mark.parametrize('stationary', [True, False])
+def test_batch_matches_one_run_at_a_time(kwargs, stationary):
+    """
+    Without exploration the learners are deterministic, so each run of the batch is a GreedyLearner run
+    """
+    runs, rounds, num_arms = 6, 200, 5
+    testbed, testbed_means = make_testbeds(runs, rounds, num_arms, stationary)
+
+    batch_means = testbed_means if not stationary else testbed_means[:, 0]
+    batch = BatchGreedyLearner(1.0, runs, rounds, num_arms, 0, testbed, batch_means, **kwargs)
+    batch.learn()
+
+    learner_class = GreedyUCBLearner if 'c' in kwargs else GreedyLearner
+    args = (kwargs['c'],) if 'c' in kwargs else ()
+    for run in range(runs):
+        learner = learner_class(*args, 1.0, rounds, num_arms, 0, testbed=testbed[run],
+                                testbed_means=testbed_means[run], alpha=kwargs.get('alpha'))
+        learner.learn()
+        assert np.array_equal(batch.actions[run], learner.actions)
+        assert np.allclose(batch.rewards[run], learner.rewards)
+        assert np.allclose(batch.regret[run], learner.regret)
+
+
+def test_batch_explores_at_epsilon():
+    runs, rounds, num_arms = 500, 50, 10
+    testbed, testbed_means = make_testbeds(runs, rounds, num_arms)
+    batch = BatchGreedyLearner(0, runs, rounds, num_arms, 1.0, testbed, testbed_means[:, 0])
+    batch.learn()
+
+    # every action random, so each arm is taken about equally often
+    counts = np.bincount(batch.actions.ravel(), minlength=num_arms) / batch.actions.size
+    assert np.allclose(counts, 1 / num_arms, atol=0.01)
+    assert np.all(batch.regret >= 0)
@@ -0,0 +1,67 @@
+from Learners import GreedyLearner
+from Rewards import ArraySource, DecimatingRecorder, RandomWalkSource, Recorder, StationarySource
+
+import numpy as np
+import pytest
+
+
+def collect(source, rounds: int):
+    chunks = list(source.chunks(rounds))
+    return tuple(np.concatenate([chunk[i] for chunk in chunks]) for i in range(3))
+
+
+def test_array_source_replays_the_testbed():
+    testbed, testbed_means = np.random.normal(size=(2500, 4)), np.random.normal(size=(2500, 4))
+    source = ArraySource(testbed, testbed_means, chunk_size=1000)
+    for _ in range(2):
+        means, rewards, best = collect(source, 2500)
+        assert np.array_equal(means, testbed_means) and np.array_equal(rewards, testbed)
+        assert np.array_equal(best, testbed_means.max(axis=1))
+
+
+def test_stationary_source():
+    source = StationarySource(5, means=[0, 1, 2, 3, 4], stdev=0.5, chunk_size=300, rng=np.random.default_rng(0))
+    means, rewards, best = collect(source, 1000)
+    assert means.shape == rewards.shape == (1000, 5) and (best == 4).all()
+    assert np.allclose(rewards.mean(axis=0), [0, 1, 2, 3, 4], atol=0.1)
+    assert rewards.std(axis=0) == pytest.approx(0.5, abs=0.05)
+
+
+def test_random_walk_source_starts_at_its_initial_means():
+    source = RandomWalkSource(3, step_stdev=0.1, initial_means=[1, 2, 3], chunk_size=64, rng=np.random.default_rng(0))
+    means, _, best = collect(source, 1000)
+    assert np.array_equal(means[0], [1, 2, 3])
+    # chunks join up, steps are the same size across chunk boundaries
+    steps = np.diff(means, axis=0)
+    assert steps.std() == pytest.approx(0.1, rel=0.1)
+    assert np.array_equal(best, means.max(axis=1))
+
+
+def test_decimating_recorder_keeps_block_means():
+    rewards, regret = np.random.random(1050), np.random.random(1050)
+    full, decimated = Recorder(1050), DecimatingRecorder(every=100)
+    for t in range(1050):
+        full.record(t, 0, rewards[t], regret[t])
+        decimated.record(t, 0, rewards[t], regret[t])
+    decimated.flush(1049)
+
+    assert decimated.rounds == list(range(99, 1050, 100)) + [1049]
+    assert np.allclose(decimated.rewards[:10], rewards[:1000].reshape(10, 100).mean(axis=1))
+    assert decimated.regret[-1] == pytest.approx(regret[1000:].mean())
+    assert decimated.cumulative_regret[-1] == pytest.approx(regret.sum())
+
+
+def test_learner_draws_from_a_source():
+    rounds = 3000
+    testbed_means = np.repeat(np.random.normal(size=(1, 10)), rounds, axis=0)
+    testbed = np.random.normal(loc=testbed_means)
+
+    np.random.seed(1)
+    from_arrays = GreedyLearner(0, rounds, 10, 0.1, testbed=testbed, testbed_means=testbed_means)
+    from_arrays.learn()
+    np.random.seed(1)
+    from_source = GreedyLearner(0, rounds, 10, 0.1, source=ArraySource(testbed, testbed_means, chunk_size=128))
+    from_source.learn()
+
+    assert np.array_equal(from_arrays.actions, from_source.actions)
+    assert np.array_equal(from_arrays.regret, from_source.regret)
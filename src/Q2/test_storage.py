@@ -0,0 +1,56 @@
+from Learners import GreedyLearner
+from Rewards import StationarySource
+from Storage import MemmapRecorder, iter_chunks, open_results, open_testbed, write_testbed
+# renamed, as pytest would collect a function starting with test
+from Storage import testbed_source as replay_source
+
+import numpy as np
+
+
+def test_written_testbed_is_replayed(tmp_path):
+    source = StationarySource(4, chunk_size=100, rng=np.random.default_rng(0))
+    write_testbed(str(tmp_path), source, 1000)
+    testbed, testbed_means = open_testbed(str(tmp_path))
+
+    assert isinstance(testbed, np.memmap) and testbed.shape == testbed_means.shape == (1000, 4)
+    assert np.array_equal(testbed_means[0], source.means)
+
+    replayed = replay_source(str(tmp_path), chunk_size=300)
+    rewards = np.concatenate([chunk[1] for chunk in replayed.chunks(1000)])
+    assert np.array_equal(rewards, testbed)
+
+
+def test_recorder_results_can_be_read_while_written(tmp_path):
+    rounds = 2500
+    recorder = MemmapRecorder(str(tmp_path), rounds, flush_every=1000)
+    for t in range(1500):
+        recorder.record(t, t % 3, float(t), 1.0)
+
+    partial = open_results(str(tmp_path))
+    assert len(partial['regret']) == 1000
+
+    for t in range(1500, rounds):
+        recorder.record(t, t % 3, float(t), 1.0)
+    recorder.flush(rounds - 1)
+
+    results = open_results(str(tmp_path))
+    assert np.array_equal(results['actions'], np.arange(rounds) % 3)
+    assert sum(chunk.sum() for chunk in iter_chunks(results['rewards'], chunk_size=700)) == sum(range(rounds))
+
+
+def test_learner_records_to_disk(tmp_path):
+    rounds = 3000
+    write_testbed(str(tmp_path / 'testbed'), StationarySource(10, rng=np.random.default_rng(0)), rounds)
+    testbed, testbed_means = open_testbed(str(tmp_path / 'testbed'))
+
+    np.random.seed(1)
+    in_memory = GreedyLearner(0, rounds, 10, 0.1, testbed=testbed, testbed_means=testbed_means)
+    in_memory.learn()
+    np.random.seed(1)
+    on_disk = GreedyLearner(0, rounds, 10, 0.1, source=replay_source(str(tmp_path / 'testbed')),
+                            recorder=MemmapRecorder(str(tmp_path / 'results'), rounds))
+    on_disk.learn()
+
+    results = open_results(str(tmp_path / 'results'))
+    assert np.array_equal(results['actions'], in_memory.actions)
+    assert np.allclose(results['regret'], in_memory.regret)
@@ -0,0 +1,40 @@
+from Learners import GreedyUCBLearner, ucb_scores
+
+import warnings
+import numpy as np
+
+
+def test_unpulled_arms_are_infinite():
+    scores = ucb_scores(np.array([0.5, 1.0, -0.2]), np.array([0, 3, 0]), t=10, c=2)
+    assert np.isinf(scores[0]) and np.isinf(scores[2])
+    assert scores[1] == 1.0 + 2*np.sqrt(np.log(10) / 3)
+
+
+def test_round_zero_has_no_bonus():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        scores = ucb_scores(np.array([0.5, 1.0]), np.array([1, 2]), t=0, c=2)
+        assert np.array_equal(scores, [0.5, 1.0])
+
+        first = ucb_scores(np.zeros(3), np.zeros(3), t=0, c=2)
+        assert np.isinf(first).all()
+
+
+def test_matches_scalar_formula():
+    rng = np.random.default_rng(0)
+    Q, N = rng.normal(size=(4, 6)), rng.integers(0, 5, size=(4, 6))
+    scores = ucb_scores(Q, N, t=7, c=1.5)
+    for i in range(4):
+        for a in range(6):
+            expected = np.inf if N[i, a] == 0 else Q[i, a] + 1.5*np.sqrt(np.log(7) / N[i, a])
+            assert scores[i, a] == expected
+
+
+def test_learner_tries_every_arm_first():
+    rounds, num_arms = 50, 8
+    testbed_means = np.repeat(np.random.normal(size=(1, num_arms)), rounds, axis=0)
+    testbed = np.random.normal(loc=testbed_means)
+
+    learner = GreedyUCBLearner(2, 0, rounds, num_arms, 0, testbed=testbed, testbed_means=testbed_means)
+    learner.learn()
+    assert sorted(learner.actions[:num_arms].tolist()) == list(range(num_arms))
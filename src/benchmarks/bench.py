@@ -0,0 +1,100 @@
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+import numpy as np
+
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_question(name: str) -> None:
+    """
+    Make the modules of src/<name> importable, each question runs in its own process
+    as Q1 and Q2 both have a Learners module
+    """
+    sys.path.insert(0, os.path.join(SRC, name))
+
+
+def seed(value: int = 0) -> None:
+    random.seed(value)
+    np.random.seed(value)
+
+
+def measure(setup: Callable, fn: Callable, ops: int = 1, repeat: int = 5, memory: bool = True) -> dict:
+    """
+    Time fn, best of repeat runs, each after a fresh setup with the same seeds.
+    Peak memory is taken with tracemalloc in one further run, so it does not slow the timed runs.
+
+    :param setup: returns the argument passed to fn, not timed
+    :param fn: code to time
+    :param ops: number of operations (calls, games, rounds) one run of fn does
+    :param repeat: number of timed runs
+    :param memory: also measure peak memory
+    :return: seconds, seconds_per_op, ops_per_second and peak_memory_bytes
+    """
+    times = []
+    for _ in range(repeat):
+        seed()
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    result = {'ops': ops, 'seconds': best, 'seconds_per_op': best / ops, 'ops_per_second': ops / best}
+
+    if memory:
+        seed()
+        arg = setup()
+        tracemalloc.start()
+        fn(arg)
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def run(benchmarks: Dict[str, Callable[[], dict]], only: str = None) -> Dict[str, dict]:
+    """
+    Run each benchmark whose name contains only, printing progress to stderr
+    """
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if only is not None and only not in name:
+            continue
+        results[name] = benchmark()
+        print(f"{name}: {results[name]['ops_per_second']:,.0f} ops/s", file=sys.stderr)
+    return results
+
+
+def compare(baseline: Dict[str, dict], results: Dict[str, dict], threshold: float = 0.1) -> Dict[str, dict]:
+    """
+    Compare seconds per op against a baseline
+
+    :param threshold: relative slow down counted as a regression
+    :return: name -> baseline and new seconds_per_op, their ratio and whether it regressed,
+        for the benchmarks in both
+    """
+    comparison = {}
+    for name in sorted(set(baseline) & set(results)):
+        old, new = baseline[name]['seconds_per_op'], results[name]['seconds_per_op']
+        comparison[name] = {'baseline': old, 'new': new, 'ratio': new / old,
+                            'regression': new > old * (1 + threshold)}
+    return comparison
+
+
+def dump(results: dict, path: str = None) -> None:
+    """
+    Write results as JSON to path, or stdout
+    """
+    if path is None:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        return
+
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
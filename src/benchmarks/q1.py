@@ -0,0 +1,194 @@
+"""
+Q1 benchmarks, run through run.py or on their own:
+
+    python src/benchmarks/q1.py [--scale 0.1] [--only learn] [--out q1.json]
+"""
+import argparse
+import random
+from functools import partial
+
+from bench import dump, measure, run, use_question
+
+use_question('Q1')
+
+from BatchLearner import BatchTicTacToeLearner  # noqa: E402
+from BitBoard import BitTicTacToe  # noqa: E402
+from Learners import ReinforcementTicTacToeLearner, StateArrayX, StateDictX  # noqa: E402
+from MNKBoard import MNKBoard  # noqa: E402
+from Players import RandomPlayer, RandomWinner, RandomWinnerBlocker  # noqa: E402
+from StateIndex import get_index  # noqa: E402
+from TicTacToe import TicTacToe  # noqa: E402
+
+
+BOARDS = {'TicTacToe': TicTacToe, 'BitTicTacToe': BitTicTacToe, 'MNKBoard': MNKBoard}
+OPPONENTS = (RandomPlayer, RandomWinner, RandomWinnerBlocker)
+
+
+def sample_boards(board_cls: type, n: int):
+    """
+    Boards part way through n random games, always with a move left to make
+    """
+    boards = []
+    while len(boards) < n:
+        board = board_cls()
+        player = random.choice(['X', 'O'])
+        for _ in range(random.randint(0, 7)):
+            if board.winner() or board.game_over():
+                break
+            board.add_move(player, random.choice(board.possible_moves()))
+            player = 'O' if player == 'X' else 'X'
+
+        if board.winner() or board.game_over():
+            continue
+        boards.append(board)
+    return boards
+
+
+def states(n: int):
+    return [board.str_state() for board in sample_boards(TicTacToe, n)]
+
+
+def transitions(n: int):
+    """
+    Pairs of states a move apart
+    """
+    pairs = []
+    for board in sample_boards(TicTacToe, n):
+        old = board.str_state()
+        player = 'O' if board.last_turn == 'X' else 'X'
+        pairs.append((old, ''.join(board.fake_move(player, random.choice(board.possible_moves())))))
+    return pairs
+
+
+def micro(n: int) -> dict:
+    """
+    Board primitives and canonicalisation, each over n sample states
+    """
+    benchmarks = {}
+    get_index()
+
+    for name, board_cls in BOARDS.items():
+        def over_states(method, board_cls=board_cls):
+            def fn(sample):
+                board = board_cls()
+                for state in sample:
+                    getattr(board, method)(state)
+
+            return lambda: measure(lambda: [b.str_state() for b in sample_boards(board_cls, n)], fn, ops=n,
+                                   memory=False)
+
+        for method in ('winner', 'similar_states', 'possible_moves'):
+            benchmarks[f'{name}.{method}'] = over_states(method)
+
+        def play_games():
+            games = [list(range(9)) for _ in range(n)]
+            for moves in games:
+                random.shuffle(moves)
+            return games
+
+        def add_moves(games, board_cls=board_cls):
+            for moves in games:
+                board = board_cls()
+                player = 'X'
+                for move in moves:
+                    board.add_move(player, move)
+                    if board.winner():
+                        break
+                    player = 'O' if player == 'X' else 'X'
+
+        benchmarks[f'{name}.add_move'] = partial(measure, play_games, add_moves, ops=n, memory=False)
+
+    index = get_index()
+    benchmarks['StateIndex.canonical_id'] = lambda: measure(
+        partial(states, n), lambda sample: [index.canonical_id(s) for s in sample], ops=n, memory=False)
+    benchmarks['get_state_key'] = lambda: measure(
+        partial(states, n), lambda sample: [ReinforcementTicTacToeLearner.get_state_key(s) for s in sample],
+        ops=n, memory=False)
+    benchmarks['TicTacToe.zobrist_hash'] = lambda: measure(
+        partial(states, n), lambda sample: [TicTacToe.zobrist_hash(s) for s in sample], ops=n, memory=False)
+    benchmarks['MNKBoard.canonical_key'] = lambda: measure(
+        partial(states, n), lambda sample: [MNKBoard().canonical_key(s) for s in sample], ops=n, memory=False)
+
+    def update(table_cls):
+        def setup():
+            return table_cls(), transitions(n)
+
+        def fn(arg):
+            table, pairs = arg
+            for old, new in pairs:
+                table.update(old, new)
+
+        return lambda: measure(setup, fn, ops=n)
+
+    benchmarks['StateDictX.update'] = update(StateDictX)
+    benchmarks['StateArrayX.update'] = update(StateArrayX)
+
+    def greedy(table_cls, zobrist=False):
+        def setup():
+            learner = ReinforcementTicTacToeLearner(0, 0, RandomPlayer(player='O'), state_dict=table_cls(),
+                                                    zobrist=zobrist)
+            # the learner plays X, so only boards where it is X to move
+            boards = [board for board in sample_boards(TicTacToe, 2*n) if board.last_turn != 'X'][:n]
+            return learner, boards
+
+        def fn(arg):
+            learner, boards = arg
+            for board in boards:
+                learner.greedy_move(board)
+
+        return lambda: measure(setup, fn, ops=n)
+
+    benchmarks['greedy_move.StateDictX'] = greedy(StateDictX)
+    benchmarks['greedy_move.StateArrayX'] = greedy(StateArrayX)
+    benchmarks['greedy_move.zobrist'] = greedy(StateDictX, zobrist=True)
+    return benchmarks
+
+
+def macro(games: int) -> dict:
+    """
+    games/sec of learn against each opponent, and of greedy play afterwards
+    """
+    benchmarks = {}
+    for opponent in OPPONENTS:
+        name = opponent.__name__
+
+        def learner(opponent=opponent, **kwargs):
+            return ReinforcementTicTacToeLearner(games, 0.1, opponent(player='O'), **kwargs)
+
+        benchmarks[f'learn.{name}'] = partial(measure, learner, lambda l: l.learn(), ops=games, repeat=3)
+        benchmarks[f'learn.{name}.BitTicTacToe'] = partial(
+            measure, partial(learner, board_cls=BitTicTacToe), lambda l: l.learn(), ops=games, repeat=3)
+        benchmarks[f'learn.{name}.StateArrayX'] = partial(
+            measure, lambda learner=learner: learner(state_dict=StateArrayX()), lambda l: l.learn(), ops=games,
+            repeat=3)
+
+        def trained(opponent=opponent):
+            trained_learner = learner(opponent)
+            trained_learner.learn()
+            return trained_learner
+
+        benchmarks[f'play_n_games.{name}'] = partial(
+            measure, trained, lambda l: l.play_n_games(games), ops=games, repeat=3)
+
+        benchmarks[f'batch_learn.{name}'] = partial(
+            measure, lambda opponent=opponent: BatchTicTacToeLearner(10*games, 0.1, opponent(player='O'), seed=0),
+            lambda l: l.learn(), ops=10*games, repeat=3)
+
+    return benchmarks
+
+
+def main(args=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply the size of every benchmark')
+    parser.add_argument('--only', help='run the benchmarks whose name contains this')
+    parser.add_argument('--out', help='file to write the results to, defaults to stdout')
+    args = parser.parse_args(args)
+
+    benchmarks = {**micro(max(1, int(2000*args.scale))), **macro(max(1, int(2000*args.scale)))}
+    results = run(benchmarks, args.only)
+    dump(results, args.out)
+    return results
+
+
+if __name__ == '__main__':
+    main()
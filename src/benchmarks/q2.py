@@ -0,0 +1,79 @@
+"""
+Q2 benchmarks, run through run.py or on their own:
+
+    python src/benchmarks/q2.py [--scale 0.1] [--only UCB] [--out q2.json]
+"""
+import argparse
+
+import numpy as np
+
+from bench import dump, measure, run, use_question
+
+use_question('Q2')
+
+from Learners import BatchGreedyLearner, GreedyLearner, GreedyUCBLearner, ucb_scores  # noqa: E402
+from Rewards import DecimatingRecorder, StationarySource  # noqa: E402
+
+
+ARMS = (2, 10, 100)
+RUNS = 100
+
+
+def testbed(rounds: int, num_arms: int):
+    means = np.random.normal(size=num_arms)
+    return (np.random.normal(loc=means, size=(rounds, num_arms)),
+            np.repeat(means[np.newaxis, :], rounds, axis=0))
+
+
+def learners(rounds: int) -> dict:
+    """
+    rounds/sec of each learner at each number of arms
+    """
+    benchmarks = {}
+    for num_arms in ARMS:
+        def setup(learner_cls, *args, num_arms=num_arms, **kwargs):
+            bed, means = testbed(rounds, num_arms)
+            return learner_cls(*args, rounds, num_arms, 0.1, testbed=bed, testbed_means=means, **kwargs)
+
+        benchmarks[f'GreedyLearner.{num_arms}'] = lambda setup=setup: measure(
+            lambda: setup(GreedyLearner, 0), lambda learner: learner.learn(), ops=rounds)
+        benchmarks[f'GreedyLearner.alpha.{num_arms}'] = lambda setup=setup: measure(
+            lambda: setup(GreedyLearner, 0, alpha=0.1), lambda learner: learner.learn(), ops=rounds)
+        benchmarks[f'GreedyUCBLearner.{num_arms}'] = lambda setup=setup: measure(
+            lambda: setup(GreedyUCBLearner, 2, 0), lambda learner: learner.learn(), ops=rounds)
+
+        def source(num_arms=num_arms):
+            return GreedyUCBLearner(2, 0, rounds, num_arms, 0.1, source=StationarySource(num_arms),
+                                    recorder=DecimatingRecorder())
+
+        benchmarks[f'GreedyUCBLearner.source.{num_arms}'] = lambda source=source: measure(
+            source, lambda learner: learner.learn(), ops=rounds)
+
+        def batch(num_arms=num_arms):
+            means = np.random.normal(size=(RUNS, 1, num_arms))
+            bed = np.random.normal(loc=means, size=(RUNS, rounds // RUNS, num_arms))
+            return BatchGreedyLearner(0, RUNS, rounds // RUNS, num_arms, 0.1, bed, means[:, 0], c=2)
+
+        benchmarks[f'BatchGreedyLearner.ucb.{num_arms}'] = lambda batch=batch: measure(
+            batch, lambda learner: learner.learn(), ops=RUNS * (rounds // RUNS))
+
+    benchmarks['ucb_scores'] = lambda: measure(
+        lambda: (np.random.normal(size=10), np.random.randint(0, 100, size=10).astype(float)),
+        lambda arg: [ucb_scores(*arg, t, 2) for t in range(rounds)], ops=rounds, memory=False)
+    return benchmarks
+
+
+def main(args=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply the size of every benchmark')
+    parser.add_argument('--only', help='run the benchmarks whose name contains this')
+    parser.add_argument('--out', help='file to write the results to, defaults to stdout')
+    args = parser.parse_args(args)
+
+    results = run(learners(max(RUNS, int(20_000*args.scale))), args.only)
+    dump(results, args.out)
+    return results
+
+
+if __name__ == '__main__':
+    main()
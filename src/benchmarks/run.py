@@ -0,0 +1,93 @@
+"""
+Run the Q1 and Q2 benchmarks, each in its own process, and compare against a saved baseline.
+
+    python src/benchmarks/run.py --out baseline.json
+    python src/benchmarks/run.py --out new.json --baseline baseline.json --threshold 0.1
+
+Exits with status 1 if any benchmark is more than threshold slower per op than the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+
+from bench import compare
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SUITES = ('q1', 'q2')
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(suite: str, scale: float, only: str = None) -> dict:
+    """
+    Run one suite in a fresh interpreter, its results are read back from stdout
+    """
+    command = [sys.executable, os.path.join(HERE, f'{suite}.py'), '--scale', str(scale)]
+    if only is not None:
+        command += ['--only', only]
+
+    output = subprocess.run(command, cwd=HERE, stdout=subprocess.PIPE, text=True, check=True).stdout
+    return {f'{suite}.{name}': result for name, result in json.loads(output).items()}
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suites', nargs='+', default=list(SUITES), choices=SUITES)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply the size of every benchmark')
+    parser.add_argument('--only', help='run the benchmarks whose name contains this')
+    parser.add_argument('--out', help='file to write the results to')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slow down per op counted as a regression')
+    args = parser.parse_args(args)
+
+    results = {}
+    for suite in args.suites:
+        results.update(run_suite(suite, args.scale, args.only))
+
+    report = {
+        'meta': {'commit': git_commit(), 'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'scale': args.scale},
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline['meta']['scale'] != args.scale:
+            print(f"Baseline was run at scale {baseline['meta']['scale']}, not {args.scale}", file=sys.stderr)
+
+        report['comparison'] = compare(baseline['results'], results, args.threshold)
+        for name, row in report['comparison'].items():
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(f"{name:50s} {row['ratio']:6.2f}x {flag}", file=sys.stderr)
+            if row['regression']:
+                regressions.append(name)
+
+    if args.out is not None:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if regressions:
+        print(f'{len(regressions)} regressions over {args.threshold:.0%}: {", ".join(regressions)}',
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
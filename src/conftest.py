@@ -0,0 +1,37 @@
+"""
+Q1 and Q2 are flat directories of modules, some with the same name (Learners, Experiments, plotting, ...),
+each imported from its own directory. When both are tested in one run, the modules of those names are swapped
+in sys.modules before each test module is collected and each test is run, so every test sees its own question's.
+"""
+import os
+import sys
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+# question directory -> its modules that are swapped out
+_swapped = {}
+
+
+def _use_question(path) -> None:
+    question = str(path.parent)
+    if os.path.dirname(question) != SRC:
+        return
+
+    for name, module in list(sys.modules.items()):
+        module_path = getattr(module, '__file__', None)
+        if module_path is None:
+            continue
+        directory = os.path.dirname(os.path.abspath(module_path))
+        if os.path.dirname(directory) == SRC and directory != question \
+                and os.path.exists(os.path.join(question, os.path.basename(module_path))):
+            _swapped.setdefault(directory, {})[name] = sys.modules.pop(name)
+    sys.modules.update(_swapped.pop(question, {}))
+
+
+def pytest_collectstart(collector):
+    path = getattr(collector, 'path', None)
+    if path is not None and path.is_file():
+        _use_question(path)
+
+
+def pytest_runtest_setup(item):
+    _use_question(item.path)
@@ -0,0 +1,173 @@
+import json
+import time
+from collections import defaultdict
+from typing import Callable, Dict
+
+import numpy as np
+
+
+class Profiler:
+    """
+    Opt in call counts and timings for the hot paths of the learners.
+
+    Methods are only wrapped while the profiler is enabled, and put back as they were when it is disabled,
+    so an unprofiled run executes exactly the original code. Times are inclusive of nested profiled calls.
+
+    >>> profiler = Profiler()
+    >>> profiler.instrument(TicTacToe, 'add_move', 'winner')
+    >>> with profiler:
+    ...     learner.learn()
+    >>> profiler.save('profile.json')
+    """
+
+    def __init__(self) -> None:
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.units: Dict[str, int] = defaultdict(int)
+        self.elapsed = 0.0
+
+        self._targets = {}
+        self._caches = {}
+        self._gauges = {}
+        self._patched = []
+        self._start = None
+
+    def instrument(self, owner, *names: str, stage: str = None, units: Callable = None,
+                   unit: str = None) -> 'Profiler':
+        """
+        Profile methods of a class (or functions of a module), from the next enable
+
+        :param owner: class or module the names are looked up on, and patched on
+        :param names: names of the methods
+        :param stage: prefix of the report entries, defaults to the name of owner
+        :param units: callable of the call arguments giving the amount of work done, e.g. games
+        :param unit: name of the units, throughput is reported as units per second
+        """
+        stage = stage or owner.__name__
+        for name in names:
+            self._targets[(owner, name)] = (f'{stage}.{name}', units, unit)
+        return self
+
+    def watch_cache(self, name: str, fn: Callable) -> 'Profiler':
+        """
+        Report the hits and misses of an lru_cache while enabled
+        """
+        self._caches[name] = [fn, None, np.zeros(2, dtype=np.int64)]
+        return self
+
+    def gauge(self, name: str, fn: Callable) -> 'Profiler':
+        """
+        Report the value of fn() when enabled and at report time, e.g. the size of a table
+        """
+        self._gauges[name] = [fn, None]
+        return self
+
+    def _wrap(self, fn: Callable, key: str, units: Callable, unit: str) -> Callable:
+        calls, seconds, totals = self.calls, self.seconds, self.units
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds[key] += perf_counter() - start
+                calls[key] += 1
+                if unit is not None:
+                    totals[unit] += units(*args, **kwargs) if units is not None else 1
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def enable(self) -> None:
+        if self._start is not None:
+            return
+
+        for (owner, name), (key, units, unit) in self._targets.items():
+            own = vars(owner).get(name)
+            raw = own
+            if raw is None:
+                # inherited, look it up where it is defined
+                for cls in getattr(owner, '__mro__', ())[1:]:
+                    if name in vars(cls):
+                        raw = vars(cls)[name]
+                        break
+
+            if isinstance(raw, staticmethod):
+                patched = staticmethod(self._wrap(raw.__func__, key, units, unit))
+            elif isinstance(raw, classmethod):
+                patched = classmethod(self._wrap(raw.__func__, key, units, unit))
+            elif isinstance(raw, property):
+                patched = property(self._wrap(raw.fget, key, units, unit), raw.fset, raw.fdel, raw.__doc__)
+            else:
+                patched = self._wrap(getattr(owner, name), key, units, unit)
+
+            setattr(owner, name, patched)
+            self._patched.append((owner, name, own))
+
+        for cache in self._caches.values():
+            info = cache[0].cache_info()
+            cache[1] = (info.hits, info.misses)
+        for gauge in self._gauges.values():
+            gauge[1] = gauge[0]()
+
+        self._start = time.perf_counter()
+
+    def disable(self) -> None:
+        if self._start is None:
+            return
+
+        self.elapsed += time.perf_counter() - self._start
+        self._start = None
+
+        for owner, name, own in reversed(self._patched):
+            if own is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, own)
+        self._patched = []
+
+        for cache in self._caches.values():
+            info = cache[0].cache_info()
+            cache[2] += (info.hits - cache[1][0], info.misses - cache[1][1])
+
+    def __enter__(self) -> 'Profiler':
+        self.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disable()
+
+    def report(self, **extra) -> dict:
+        """
+        Machine readable summary, stable between runs so two reports can be diffed
+
+        :param extra: anything else to record, e.g. the version or config
+        """
+        stages = {key: {'calls': self.calls[key],
+                        'seconds': self.seconds[key],
+                        'us_per_call': 1e6 * self.seconds[key] / self.calls[key]}
+                  for key in sorted(self.calls)}
+
+        caches = {}
+        for name, (fn, _, (hits, misses)) in self._caches.items():
+            caches[name] = {'hits': int(hits), 'misses': int(misses),
+                            'hit_rate': float(hits / (hits + misses)) if hits + misses else None,
+                            'size': fn.cache_info().currsize}
+
+        gauges = {name: {'start': start, 'end': fn()} for name, (fn, start) in self._gauges.items()}
+
+        throughput = {unit: {'count': count, 'per_second': count / self.elapsed if self.elapsed else None}
+                      for unit, count in self.units.items()}
+
+        return {'elapsed': self.elapsed, 'stages': stages, 'caches': caches, 'gauges': gauges,
+                'throughput': throughput, **extra}
+
+    def save(self, path: str, **extra) -> dict:
+        """
+        Write the report as JSON
+        """
+        report = self.report(**extra)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        return report
@@ -0,0 +1,22 @@
+"""
+The modules shared between the questions (sweep, streamplot and profiling) live here in src.
+Q1/shared.py and Q2/shared.py are links to this file, so each question imports them the same way:
+
+>>> from shared import sweep
+
+src is appended to sys.path once, after the question's own directory, so it never shadows the
+question's modules. It is found through the real path of this file, which is src whichever link it was
+imported by.
+"""
+import os
+import sys
+
+SRC = os.path.dirname(os.path.realpath(__file__))
+if SRC not in sys.path:
+    sys.path.append(SRC)
+
+import profiling  # noqa: E402
+import streamplot  # noqa: E402
+import sweep  # noqa: E402
+
+__all__ = ['profiling', 'streamplot', 'sweep']
@@ -0,0 +1,163 @@
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+class MinMaxDecimator:
+    """
+    Reduces a line fed a chunk at a time to at most 2 * budget points, whatever its length.
+
+    Points are grouped into budget buckets of equal width, and only the minimum and maximum of each bucket
+    are kept, so spikes survive where striding would drop them. When the buckets fill up, neighbours are
+    merged and the width doubles, so memory stays bounded by the budget.
+    """
+
+    def __init__(self, budget: int = 2000) -> None:
+        """
+        :param budget: number of buckets, roughly the width of the plot in pixels
+        """
+        # even, so the buckets always merge in pairs
+        self.budget = budget + budget % 2
+        self.width = 1
+        self.n = 0
+
+        # x and y of the min and max of each full bucket
+        self.lo_x = np.zeros(0, dtype=np.int64)
+        self.lo_y = np.zeros(0)
+        self.hi_x = np.zeros(0, dtype=np.int64)
+        self.hi_y = np.zeros(0)
+
+        self._tail = np.zeros(0)
+
+    def _append(self, y: np.ndarray, start: int) -> None:
+        """
+        Bucket y, which starts at x = start on a bucket boundary and holds a whole number of buckets
+        """
+        buckets = y.reshape(-1, self.width)
+        offsets = start + self.width*np.arange(len(buckets))
+
+        lo = np.argmin(buckets, axis=1)
+        hi = np.argmax(buckets, axis=1)
+        rows = np.arange(len(buckets))
+
+        self.lo_x = np.concatenate([self.lo_x, offsets + lo])
+        self.lo_y = np.concatenate([self.lo_y, buckets[rows, lo]])
+        self.hi_x = np.concatenate([self.hi_x, offsets + hi])
+        self.hi_y = np.concatenate([self.hi_y, buckets[rows, hi]])
+
+    def _merge(self) -> None:
+        """
+        Merge neighbouring buckets, doubling the width
+        """
+        def pair(x, y, pick):
+            x, y = x.reshape(-1, 2), y.reshape(-1, 2)
+            i = pick(y, axis=1)
+            rows = np.arange(len(y))
+            return x[rows, i], y[rows, i]
+
+        self.lo_x, self.lo_y = pair(self.lo_x, self.lo_y, np.argmin)
+        self.hi_x, self.hi_y = pair(self.hi_x, self.hi_y, np.argmax)
+        self.width *= 2
+
+    def update(self, y: np.ndarray) -> 'MinMaxDecimator':
+        """
+        Add the next points of the line
+
+        :param y: values at x = n, n + 1, ...
+        """
+        y = np.concatenate([self._tail, np.asarray(y, dtype=np.float64).ravel()])
+        start = self.n - len(self._tail)
+        self.n = start + len(y)
+
+        while True:
+            full = min(len(y) // self.width, self.budget - len(self.lo_y))
+            if full:
+                self._append(y[:full*self.width], start)
+                y, start = y[full*self.width:], start + full*self.width
+
+            if len(y) < self.width:
+                break
+
+            # out of buckets, the rest is bucketed at twice the width
+            self._merge()
+
+        self._tail = y
+        return self
+
+    def points(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The decimated line, in x order, including the points not yet in a full bucket
+
+        :return: x, y
+        """
+        # the partial bucket keeps its min, max and last point
+        tail = self._tail
+        tail_x = self.n - len(tail) + np.unique([np.argmin(tail), np.argmax(tail), len(tail) - 1]) \
+            if len(tail) else np.zeros(0, dtype=np.int64)
+        x = np.concatenate([self.lo_x, self.hi_x, tail_x])
+        y = np.concatenate([self.lo_y, self.hi_y, tail[tail_x - (self.n - len(tail))]])
+
+        x, first = np.unique(x, return_index=True)
+        return x, y[first]
+
+
+def decimate(y: np.ndarray, budget: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Min/max decimation of a whole line
+
+    :return: x, y with at most 2 * budget + 3 points
+    """
+    return MinMaxDecimator(budget).update(y).points()
+
+
+class RunningCounts:
+    """
+    Cumulative and rolling counts of integer codes fed a chunk at a time,
+    holding only the last window codes between chunks.
+    """
+
+    def __init__(self, n_codes: int, window: int = None) -> None:
+        """
+        :param n_codes: codes are 0 ... n_codes - 1
+        :param window: length of the rolling window, no rolling rates when not given
+        """
+        self.n_codes = n_codes
+        self.window = window
+        self.totals = np.zeros(n_codes, dtype=np.int64)
+        self.n = 0
+        self._recent = np.zeros(0, dtype=np.int64)
+
+    def update(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param codes: next codes
+        :return: (n_codes, len(codes)) cumulative counts, and rolling rates (None without a window)
+        """
+        codes = np.asarray(codes)
+        one_hot = codes[None, :] == np.arange(self.n_codes)[:, None]
+        cumulative = self.totals[:, None] + np.cumsum(one_hot, axis=1)
+
+        rates = None
+        if self.window is not None:
+            # counts over the codes kept from earlier chunks and this chunk, from 0
+            k = len(self._recent)
+            recent = np.concatenate([self._recent, codes])
+            counts = np.zeros((self.n_codes, len(recent) + 1), dtype=np.int64)
+            counts[:, 1:] = np.cumsum(recent[None, :] == np.arange(self.n_codes)[:, None], axis=1)
+
+            end = np.arange(k + 1, len(recent) + 1)
+            rates = (counts[:, end] - counts[:, np.maximum(end - self.window, 0)]) / \
+                np.minimum(np.arange(self.n + 1, self.n + len(codes) + 1), self.window)
+            self._recent = recent[-self.window:]
+
+        if len(codes):
+            self.totals = cumulative[:, -1]
+        self.n += len(codes)
+        return cumulative, rates
+
+
+def plot_decimated(ax, decimators: Iterable[MinMaxDecimator], labels: Iterable[str], **kwargs) -> None:
+    """
+    Plot each decimated line on ax
+    """
+    for decimator, label in zip(decimators, labels):
+        ax.plot(*decimator.points(), label=label, **kwargs)
@@ -0,0 +1,212 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+
+def grid(**axes: Iterable) -> List[dict]:
+    """
+    Every combination of the values of each axis
+
+    >>> grid(epsilon=[0.01, 0.1], c=[1, 2])
+    [{'epsilon': 0.01, 'c': 1}, {'epsilon': 0.01, 'c': 2}, {'epsilon': 0.1, 'c': 1}, {'epsilon': 0.1, 'c': 2}]
+
+    :param axes: values to take for each config key
+    :return: list of configs
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def random_search(n: int, seed: int = 0, **axes) -> List[dict]:
+    """
+    Sample n configs.
+    An axis given as a list is sampled uniformly from, a (low, high) tuple is sampled uniformly between,
+    a callable is called with the generator, anything else is kept fixed.
+
+    :param n: number of configs
+    :param seed: seed of the sampler
+    :param axes: distribution of each config key
+    :return: list of configs
+    """
+    rng = np.random.default_rng(seed)
+
+    def sample(axis):
+        if isinstance(axis, list):
+            return axis[rng.integers(len(axis))]
+        if isinstance(axis, tuple):
+            return float(rng.uniform(*axis))
+        if callable(axis):
+            return axis(rng)
+        return axis
+
+    return [{name: sample(axis) for name, axis in axes.items()} for _ in range(n)]
+
+
+def config_key(config: dict) -> str:
+    """
+    Stable key of a config, the same across processes and sessions
+    """
+    encoded = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+def config_seed(config: dict, base_seed: int = 0) -> int:
+    """
+    Seed of a config, depends only on the config and base_seed so a resumed sweep reuses it
+    """
+    return int(config_key({'config': config, 'seed': base_seed}), 16) % 2**32
+
+
+class ResultStore:
+    """
+    Columnar store of sweep results in a directory.
+
+    index.jsonl has one line per finished config with its key, config, seed and scalar results.
+    Array results are saved as <name>/<key>.npy, and are written before the index line
+    so a config only counts as finished once everything it returned is on disk.
+    Configs that raised are recorded in failures.jsonl instead, and are run again on resume.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, 'index.jsonl')
+        self.failures_path = os.path.join(path, 'failures.jsonl')
+
+    def rows(self) -> List[dict]:
+        return self._read(self.index_path)
+
+    def failures(self) -> List[dict]:
+        """
+        Configs that raised, with their seed and the error, one row per failed attempt
+        """
+        return self._read(self.failures_path)
+
+    @staticmethod
+    def _read(path: str) -> List[dict]:
+        if not os.path.exists(path):
+            return []
+
+        rows = []
+        with open(path) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # last line of a sweep that was killed mid write
+                    pass
+        return rows
+
+    def finished(self) -> set:
+        return {row['key'] for row in self.rows()}
+
+    def append(self, config: dict, seed: int, results: Dict[str, object]) -> None:
+        """
+        Write the results of one config
+
+        :param config: config that was run
+        :param seed: seed it was run with
+        :param results: name -> scalar or array
+        """
+        key = config_key(config)
+        row = {'key': key, 'config': config, 'seed': seed, 'arrays': []}
+
+        for name, value in results.items():
+            if np.ndim(value) == 0:
+                row[name] = value.item() if isinstance(
+                    value, np.generic) else value
+            else:
+                os.makedirs(os.path.join(self.path, name), exist_ok=True)
+                np.save(os.path.join(self.path, name,
+                        f'{key}.npy'), np.asarray(value))
+                row['arrays'].append(name)
+
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(row, default=str) + '\n')
+
+    def append_failure(self, config: dict, seed: int, error: BaseException) -> None:
+        """
+        Record a config that raised, with its seed and traceback
+        """
+        row = {'key': config_key(config), 'config': config, 'seed': seed, 'error': repr(error),
+               'traceback': ''.join(traceback.format_exception(error))}
+        with open(self.failures_path, 'a') as f:
+            f.write(json.dumps(row, default=str) + '\n')
+
+    def column(self, name: str, mmap: bool = False) -> list:
+        """
+        Values of one result (or config key) for every finished config, in the order they finished.
+        Arrays are stacked when they all have the same shape.
+
+        :param name: result or config key
+        :param mmap: memory map array results rather than reading them
+        """
+        values = []
+        for row in self.rows():
+            if name in row['arrays']:
+                values.append(np.load(os.path.join(self.path, name, f"{row['key']}.npy"),
+                                      mmap_mode='r' if mmap else None))
+            elif name in row:
+                values.append(row[name])
+            else:
+                values.append(row['config'].get(name))
+
+        if values and all(isinstance(v, np.ndarray) for v in values) \
+                and len({v.shape for v in values}) == 1 and not mmap:
+            return np.stack(values)
+        return values
+
+
+def _run_one(fn: Callable, config: dict, seed: int) -> dict:
+    random.seed(seed)
+    np.random.seed(seed)
+    return fn(config, seed)
+
+
+def run_sweep(fn: Callable[[dict, int], dict], configs: List[dict], store: ResultStore,
+              base_seed: int = 0, max_workers: int = None) -> ResultStore:
+    """
+    Run fn on every config across a process pool, writing results to store as they finish.
+    Configs already in the store are skipped, so a sweep that was killed can be rerun as is.
+    A config that raises is recorded in store.failures() and the sweep carries on with the rest.
+
+    fn must be importable by the workers (defined at module level) and take (config, seed),
+    returning a dict of scalars and arrays.
+    Each worker seeds random and np.random with the config's seed before calling fn.
+
+    :param fn: function to run for each config
+    :param configs: list of configs, e.g. from grid or random_search
+    :param store: ResultStore to write to
+    :param base_seed: seed the config seeds are derived from
+    :param max_workers: number of processes, defaults to the number of cores
+    :return: store
+    """
+    finished = store.finished()
+    todo = [config for config in configs if config_key(config) not in finished]
+
+    if not todo:
+        return store
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for config in todo:
+            seed = config_seed(config, base_seed)
+            futures[pool.submit(_run_one, fn, config, seed)] = (config, seed)
+
+        for future in as_completed(futures):
+            config, seed = futures[future]
+            try:
+                results = future.result()
+            except Exception as error:
+                store.append_failure(config, seed, error)
+                continue
+            store.append(config, seed, results)
+
+    return store
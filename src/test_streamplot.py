@@ -0,0 +1,46 @@
+from streamplot import MinMaxDecimator, RunningCounts, decimate
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('chunk', [None, 1, 777, 10_000])
+def test_decimation_keeps_extremes_within_budget(chunk):
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=50_000))
+    y[12_345] = 1e6
+    y[40_000] = -1e6
+
+    if chunk is None:
+        x, points = decimate(y, budget=100)
+    else:
+        decimator = MinMaxDecimator(budget=100)
+        for start in range(0, len(y), chunk):
+            decimator.update(y[start:start + chunk])
+        x, points = decimator.points()
+
+    assert len(x) <= 2*100 + 3
+    assert np.all(np.diff(x) > 0) and np.array_equal(points, y[x])
+    assert {12_345, 40_000, len(y) - 1} <= set(x.tolist())
+
+
+def test_short_lines_are_kept_whole():
+    y = np.arange(10.0)
+    x, points = decimate(y, budget=100)
+    assert np.array_equal(x, np.arange(10)) and np.array_equal(points, y)
+
+
+@pytest.mark.parametrize('window', [None, 1, 50, 5000])
+def test_running_counts_match_whole_line(window):
+    codes = np.random.default_rng(0).integers(0, 3, size=3000)
+    counts = RunningCounts(3, window)
+    chunks = [counts.update(codes[start:start + 256]) for start in range(0, len(codes), 256)]
+
+    cumulative = np.concatenate([c for c, _ in chunks], axis=1)
+    assert np.array_equal(cumulative, np.cumsum(codes[None, :] == np.arange(3)[:, None], axis=1))
+
+    if window is not None:
+        rates = np.concatenate([r for _, r in chunks], axis=1)
+        for t in (0, 10, 999, 2999):
+            recent = codes[max(0, t + 1 - window):t + 1]
+            assert np.allclose(rates[:, t], [np.mean(recent == code) for code in range(3)])
@@ -0,0 +1,39 @@
+from sweep import ResultStore, config_key, config_seed, grid, random_search, run_sweep
+
+import numpy as np
+
+
+def square(config: dict, seed: int) -> dict:
+    if config['x'] == 3:
+        raise RuntimeError('three')
+    return {'square': config['x']**2, 'draws': np.random.random(4)}
+
+
+def test_grid_and_random_search():
+    assert grid(a=[1, 2], b='xy') == [{'a': 1, 'b': 'x'}, {'a': 1, 'b': 'y'}, {'a': 2, 'b': 'x'}, {'a': 2, 'b': 'y'}]
+    configs = random_search(20, seed=1, a=[1, 2], b=(0, 1), c='fixed')
+    assert configs == random_search(20, seed=1, a=[1, 2], b=(0, 1), c='fixed')
+    assert all(c['a'] in (1, 2) and 0 <= c['b'] <= 1 and c['c'] == 'fixed' for c in configs)
+
+
+def test_config_keys_ignore_order():
+    assert config_key({'a': 1, 'b': 2}) == config_key({'b': 2, 'a': 1})
+    assert config_seed({'a': 1}) != config_seed({'a': 1}, base_seed=1)
+
+
+def test_sweep_records_failures_and_carries_on(tmp_path):
+    configs = grid(x=range(5))
+    store = run_sweep(square, configs, ResultStore(str(tmp_path)), max_workers=2)
+
+    rows = {row['config']['x']: row for row in store.rows()}
+    assert sorted(rows) == [0, 1, 2, 4]
+    assert all(row['square'] == x**2 for x, row in rows.items())
+    assert store.column('draws').shape == (4, 4)
+
+    failure, = store.failures()
+    assert failure['config'] == {'x': 3} and failure['seed'] == config_seed({'x': 3})
+    assert 'three' in failure['error'] and 'RuntimeError' in failure['traceback']
+
+    # resuming runs only the failed config again
+    run_sweep(square, configs, store, max_workers=1)
+    assert len(store.rows()) == 4 and len(store.failures()) == 2